@@ -1,11 +1,17 @@
 """Flask API for badminton court availability."""
+import atexit
 import logging
 import os
-import threading
-import time
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, send_file
 from flask_cors import CORS
+from database import ScrapeJob
 from scraper_manager import ScraperManager
+from jobs import enqueue_scrape, job_dict
+from scrape_orchestrator import facility_host
+from worker import ScrapeWorker
+from scrape_scheduler import SCRAPE_SCHEDULER, AdaptiveScheduler, flush_demand
+from scrapers.date_range import as_date
+from scrapers.artifacts import list_artifacts, artifact_path
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,6 +22,9 @@ EXCLUDE_SCRAPE_FACILITIES = [
     os.getenv('EXCLUDE_SCRAPE_FACILITIES', 'Linton Village College').split(',')
     if name.strip()
 ]
+RUN_WORKER_IN_WEB = os.getenv('RUN_WORKER_IN_WEB', 'false').lower() == 'true'
+# Debug captures can show the logged-in account, so they are only served with this token
+DEBUG_ARTIFACTS_TOKEN = os.getenv('DEBUG_ARTIFACTS_TOKEN')
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend
@@ -24,30 +33,39 @@ CORS(app)  # Enable CORS for frontend
 scraper_manager = ScraperManager()
 
 
-def _run_scheduled_scrapes():
-    """Background thread: scrape all facilities except EXCLUDE_SCRAPE_FACILITIES. Uses its own ScraperManager."""
-    excluded = set(
-        name.strip() for name in
-        os.getenv('EXCLUDE_SCRAPE_FACILITIES', 'Linton Village College').split(',')
-        if name.strip()
-    )
-    delay_sec = int(os.getenv('SCRAPE_DELAY_BETWEEN_FACILITIES_SECONDS', '120'))
-    sm = ScraperManager()
+@atexit.register
+def _flush_demand_on_exit():
+    """Write availability requests still buffered in memory (see scrape_scheduler.DemandBuffer)."""
     try:
-        facilities = [f for f in sm.get_facilities_list() if f not in excluded]
-        logger.info(f"Scheduled scrape started for: {facilities} (delay between facilities: {delay_sec}s)")
-        for i, name in enumerate(facilities):
-            if i > 0 and delay_sec > 0:
-                logger.info(f"Waiting {delay_sec}s before next facility (avoid over-hitting sites)...")
-                time.sleep(delay_sec)
-            try:
-                result = sm.scrape_facility(name)
-                logger.info(f"Scheduled scrape {name}: success={result.get('success')}")
-            except Exception as e:
-                logger.error(f"Scheduled scrape {name} failed: {e}")
-    finally:
-        sm.close()
-    logger.info("Scheduled scrape run finished.")
+        flush_demand(scraper_manager.session)
+    except Exception as e:
+        logger.warning(f"Could not flush availability demand: {e}")
+
+# Single-service deployments (no separate worker process) can run the worker inside the web process.
+# Not in a sandboxed scrape's child: under `python app.py` the spawn start method re-imports this
+# module there as __mp_main__, and the child must not start claiming jobs itself.
+if RUN_WORKER_IN_WEB and __name__ != '__mp_main__':
+    ScrapeWorker().start()
+
+
+def _enqueue_scheduled_scrapes(facilities):
+    """Queue a scrape job per facility; returns [(job, created)].
+
+    Each job scrapes the facility's due dates, or with SCRAPE_SCHEDULER=adaptive only the
+    facilities and dates in the scheduler's plan are queued. The worker (worker.py) runs them.
+    """
+    session = scraper_manager.session
+    if SCRAPE_SCHEDULER == 'adaptive':
+        plan = AdaptiveScheduler(session).plan(facilities, dict(scraper_manager.scrapers))
+        return [enqueue_scrape(session, p['facility'], p['start_date'], p['end_date'], host=_host(p['facility']))
+                for p in plan]
+    return [enqueue_scrape(session, name, due_only=True, host=_host(name)) for name in facilities]
+
+
+def _host(facility_name):
+    """Booking-site host of a facility (jobs on one host don't run at the same time on any worker)."""
+    scraper_class = scraper_manager.scrapers.get(facility_name)
+    return facility_host(scraper_class) if scraper_class else None
 
 
 @app.route('/health', methods=['GET'])
@@ -99,7 +117,7 @@ def get_facilities():
 
 @app.route('/api/scrape-all', methods=['POST'])
 def trigger_scrape_all():
-    """Trigger scrapes for all facilities except EXCLUDE_SCRAPE_FACILITIES (e.g. broken scrapers). Runs in background; returns 202."""
+    """Queue scrapes for all facilities except EXCLUDE_SCRAPE_FACILITIES (e.g. broken scrapers); returns 202 with job IDs."""
     excluded = set(EXCLUDE_SCRAPE_FACILITIES)
     facilities = [f for f in scraper_manager.get_facilities_list() if f not in excluded]
     if not facilities:
@@ -108,30 +126,54 @@ def trigger_scrape_all():
             'message': 'No facilities to scrape (all excluded or none configured)',
             'excluded': list(excluded)
         }), 200
-    thread = threading.Thread(target=_run_scheduled_scrapes, daemon=True)
-    thread.start()
+    try:
+        queued = _enqueue_scheduled_scrapes(facilities)
+    except Exception as e:
+        logger.error(f"Error queueing scrapes: {e}")
+        scraper_manager.session.rollback()
+        return jsonify({
+            'error': str(e)
+        }), 500
     return jsonify({
         'status': 'accepted',
-        'message': 'Scrapes started in background',
+        'message': 'Scrapes queued for the worker',
         'facilities': facilities,
-        'excluded': list(excluded)
+        'excluded': list(excluded),
+        'jobs': [dict(job_dict(job), deduplicated=not created) for job, created in queued]
     }), 202
 
 
 @app.route('/api/scrape', methods=['POST'])
 def trigger_scrape():
-    """Manually trigger a scrape for a facility."""
+    """Queue a scrape for a facility (optionally only start_date..end_date, YYYY-MM-DD); returns 202 with the job ID.
+
+    If the facility already has a job queued or running, that job is returned instead of a new one.
+    """
     data = request.get_json() or {}
     facility_name = data.get('facility') or request.args.get('facility')
+    start_date = data.get('start_date') or request.args.get('start_date')
+    end_date = data.get('end_date') or request.args.get('end_date')
     
     if not facility_name:
         return jsonify({
             'error': 'facility parameter is required'
         }), 400
+    try:
+        start_date, end_date = as_date(start_date), as_date(end_date)
+    except ValueError:
+        return jsonify({
+            'error': 'start_date and end_date must be YYYY-MM-DD'
+        }), 400
+    
+    if facility_name not in scraper_manager.scrapers:
+        return jsonify({
+            'error': f'No scraper found for {facility_name}'
+        }), 404
     
     try:
-        result = scraper_manager.scrape_facility(facility_name)
-        return jsonify(result), 200 if result['success'] else 500
+        job, created = enqueue_scrape(scraper_manager.session, facility_name, start_date, end_date,
+                                      host=_host(facility_name))
+        return jsonify(dict(job_dict(job), deduplicated=not created)), 202
         
     except Exception as e:
         logger.error(f"Error triggering scrape: {e}")
@@ -144,6 +186,46 @@ def trigger_scrape():
         }), 500
 
 
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status (and result summary once finished) of a scrape job."""
+    job = scraper_manager.session.get(ScrapeJob, job_id)
+    if not job:
+        return jsonify({
+            'error': 'Job not found'
+        }), 404
+    return jsonify(job_dict(job)), 200
+
+
+def _debug_token_ok():
+    return bool(DEBUG_ARTIFACTS_TOKEN) and request.headers.get('X-Debug-Token') == DEBUG_ARTIFACTS_TOKEN
+
+
+@app.route('/api/debug/artifacts', methods=['GET'])
+def get_debug_artifacts():
+    """Stored scraper debug captures (see scrapers/artifacts.py), newest run first."""
+    if not _debug_token_ok():
+        return jsonify({
+            'error': 'Not found'
+        }), 404
+    runs = list_artifacts()
+    return jsonify({
+        'count': len(runs),
+        'runs': runs
+    }), 200
+
+
+@app.route('/api/debug/artifacts/<run>/<name>', methods=['GET'])
+def get_debug_artifact(run, name):
+    """One stored debug file (screenshot, HTML snapshot or trace)."""
+    path = artifact_path(run, name) if _debug_token_ok() else None
+    if not path:
+        return jsonify({
+            'error': 'Not found'
+        }), 404
+    return send_file(path, as_attachment=name.endswith('.zip'))
+
+
 @app.route('/api/facility/<facility_name>/stats', methods=['GET'])
 def get_facility_stats(facility_name):
     """Get scraping statistics for a facility."""
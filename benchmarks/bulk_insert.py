@@ -0,0 +1,107 @@
+"""Benchmark: storing 10k and 100k scraped slots with scrapers/storage.py.
+
+For each size this times four ways of storing:
+- the old way, one ORM CourtAvailability per slot added with session.add, as a baseline;
+- the bulk writer into an empty table (COPY on Postgres, executemany on SQLite);
+- the same slots again, so nothing changed and only the diff runs;
+- a scrape where 10% of the slots changed availability.
+
+    python benchmarks/bulk_insert.py [sizes ...]              # temporary SQLite database
+    python benchmarks/bulk_insert.py --url postgresql://...   # a Postgres database (e.g. a scratch one)
+
+The slots are written under a facility id no real facility has and deleted afterwards.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy import create_engine
+from database import Base, CourtAvailability, get_session
+from scrapers.date_range import ScrapeRange
+from scrapers.storage import store_availability
+
+BENCH_FACILITY_ID = -1
+COURTS = 8
+HOURS = range(7, 22)
+
+
+def make_slots(count, flip_every=0):
+    """`count` slots over enough days to hold them; every `flip_every`-th slot is flipped to booked."""
+    slots, day = [], date(2026, 3, 2)
+    while len(slots) < count:
+        for hour in HOURS:
+            for court in range(1, COURTS + 1):
+                slots.append({'date': day.isoformat(), 'day_name': day.strftime('%A'),
+                              'start_time': f'{hour:02d}:00', 'end_time': f'{hour + 1:02d}:00',
+                              'court_number': f'Court {court}',
+                              'is_available': not (flip_every and len(slots) % flip_every == 0)})
+        day += timedelta(days=1)
+    return slots[:count]
+
+
+def clear(session):
+    session.query(CourtAvailability).filter_by(facility_id=BENCH_FACILITY_ID).delete()
+    session.commit()
+
+
+def orm_add(session, slots):
+    """The pre-bulk storage: one ORM object and utcnow() per slot."""
+    for slot in slots:
+        session.add(CourtAvailability(facility_id=BENCH_FACILITY_ID, date=slot['date'], day_name=slot['day_name'],
+                                      start_time=slot['start_time'], end_time=slot['end_time'],
+                                      court_number=slot['court_number'], is_available=slot['is_available'],
+                                      scraped_at=datetime.utcnow()))
+    session.commit()
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+def quiet_store(session, slots):
+    # The window covers every generated date, so the range is never partial and rows() keeps them all
+    with open(os.devnull, 'w') as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            store_availability(session, BENCH_FACILITY_ID, ScrapeRange(1), slots)
+        finally:
+            sys.stdout = stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('sizes', nargs='*', type=int, default=[10000, 100000], help='Slot counts (default 10000 100000)')
+    parser.add_argument('--url', help='Database URL (default: a temporary SQLite file)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(args.url or f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        session = get_session(engine)
+        print(f"Database: {engine.dialect.name} ({engine.dialect.driver})")
+        print(f"{'slots':>8} {'orm add':>9} {'bulk':>9} {'unchanged':>10} {'10% changed':>12} {'bulk slots/s':>13}")
+        try:
+            for size in args.sizes:
+                slots = make_slots(size)
+                clear(session)
+                orm_seconds = timed(orm_add, session, slots)
+                clear(session)
+                bulk_seconds = timed(quiet_store, session, slots)
+                same_seconds = timed(quiet_store, session, slots)
+                changed_seconds = timed(quiet_store, session, make_slots(size, flip_every=10))
+                print(f"{size:>8} {orm_seconds:>8.2f}s {bulk_seconds:>8.2f}s {same_seconds:>9.2f}s "
+                      f"{changed_seconds:>11.2f}s {size / bulk_seconds:>13.0f}")
+        finally:
+            clear(session)
+            session.close()
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
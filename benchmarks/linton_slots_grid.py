@@ -0,0 +1,50 @@
+"""Benchmark: parse a full-week Linton #slotsGrid table with parse_slots_grid.
+
+The grid is built here in the same shape as the live page (7 day columns, 30-minute rows from
+07:00 to 22:00, a submit button per cell), so no browser or network is needed.
+
+    python benchmarks/linton_slots_grid.py [iterations]
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapers.linton_village_college import parse_slots_grid
+
+BUTTON_CLASSES = ['btn-resource-success', 'btn-resource-default', 'btn-resource-warning']
+
+
+def build_week_grid(start=None, days=7):
+    start = start or datetime.now().date()
+    dates = [start + timedelta(days=d) for d in range(days)]
+    header = ''.join(
+        f'<th class="mastertableheader"><span class="availabilityday">{d.strftime("%a %d %b")}</span></th>'
+        for d in dates
+    )
+    rows = []
+    for half_hour in range(7 * 2, 22 * 2):
+        time_text = f"{half_hour // 2:02d}:{30 * (half_hour % 2):02d}"
+        cells = ''.join(
+            f'<td class="itemavailable"><input type="submit" class="btn {BUTTON_CLASSES[(half_hour + i) % 3]}" '
+            f'data-qa-id="Date={d.strftime("%d/%m/%Y")} {time_text}:00" value="Book"></td>'
+            for i, d in enumerate(dates)
+        )
+        rows.append(f'<tr><td class="masterTableLeftHeader">{time_text}</td>{cells}</tr>')
+    return (f'<table id="slotsGrid"><thead><tr><th class="mastertableheader">Time</th>{header}</tr></thead>'
+            f'<tbody>{"".join(rows)}</tbody></table>')
+
+
+def main(iterations=50):
+    html = build_week_grid()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        records = parse_slots_grid(html)
+    per_parse_ms = (time.perf_counter() - started) * 1000 / iterations
+    print(f"parse_slots_grid: {len(records)} slots from {len(html) // 1024} KB, "
+          f"{per_parse_ms:.1f} ms per parse ({iterations} iterations)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,92 @@
+"""Benchmark: every timetable parser over the saved fixtures in benchmarks/fixtures/.
+
+No browser or network: each parser is a pure function of captured text, HTML or JSON. For each
+facility format this prints slots parsed per second, the peak memory one parse allocates
+(tracemalloc), and how much slower a 4x larger input is. That ratio should stay near 4; well
+above it means a regex or dedup has gone quadratic.
+
+    python benchmarks/parsers.py [iterations]
+
+The fixtures have the shape of the live sites' cards and responses. To benchmark a real page,
+save its slot card texts or JSON response in the same format and point FORMATS at the file.
+"""
+import os
+import sys
+import json
+import time
+import tracemalloc
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapers.legend import parse_slot_cards, parse_timetable_payload
+from scrapers.gladstone import parse_availability_payload, parse_court_cards
+from scrapers.linton_village_college import parse_slots_grid
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+FIXTURE_DAY = date(2026, 3, 2)
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read() if name.endswith('.html') else json.load(f)
+
+
+def _cards_scaled(cards, times):
+    return dict(cards, texts=cards['texts'] * times)
+
+
+def _grid_scaled(html, times):
+    head, rest = html.split('<tbody>', 1)
+    rows, tail = rest.split('</tbody>', 1)
+    return f"{head}<tbody>{rows * times}</tbody>{tail}"
+
+
+# (format, fixture, parse(fixture) -> rows, scale(fixture, times) -> a `times` larger input)
+FORMATS = [
+    ('Legend slot cards (Hill Roads, Trumpington)', 'legend_slot_cards.json',
+     lambda c: parse_slot_cards(c['texts'], c['date'], c['day_name']), _cards_scaled),
+    ('Legend timetable JSON', 'legend_timetable.json',
+     parse_timetable_payload, lambda payload, times: [payload] * times),
+    ('GladstoneGo availability JSON (One Leisure)', 'gladstone_availability.json',
+     parse_availability_payload, lambda payload, times: [payload] * times),
+    ('GladstoneGo court cards (One Leisure)', 'gladstone_cards.json',
+     lambda c: parse_court_cards(c['texts'], c['date'], c['day_name'], target_date=FIXTURE_DAY), _cards_scaled),
+    ('Linton #slotsGrid HTML', 'linton_slots_grid.html',
+     lambda html: parse_slots_grid(html, year=FIXTURE_DAY.year), _grid_scaled),
+]
+
+
+def time_parse(parse, fixture, iterations):
+    """Seconds per parse (best of 3 batches) and the rows of the last parse."""
+    best = None
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            rows = parse(fixture)
+        elapsed = (time.perf_counter() - started) / iterations
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rows
+
+
+def peak_allocation(parse, fixture):
+    """Peak bytes allocated while parsing once."""
+    tracemalloc.start()
+    try:
+        parse(fixture)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(iterations=20):
+    print(f"{'format':<46} {'slots':>6} {'ms/parse':>9} {'slots/s':>10} {'peak KB':>8} {'4x time':>8}")
+    for label, name, parse, scale in FORMATS:
+        fixture = load_fixture(name)
+        seconds, rows = time_parse(parse, fixture, iterations)
+        scaled_seconds, _ = time_parse(parse, scale(fixture, 4), max(1, iterations // 4))
+        print(f"{label:<46} {len(rows):>6} {seconds * 1000:>9.2f} {len(rows) / seconds:>10.0f} "
+              f"{peak_allocation(parse, fixture) / 1024:>8.0f} {scaled_seconds / seconds:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
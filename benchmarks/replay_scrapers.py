@@ -0,0 +1,79 @@
+"""Benchmark: run the scrapers end to end against their HAR recordings (see scrapers/har.py).
+
+Each run replays recordings/<facility>.har in a fresh temporary SQLite database, so every run
+takes the same path through the site (fresh login, no saved state) and nothing touches the
+network or the real database. Reports wall time per facility and the p50/p95 of each timed step
+(login, navigation, each date, storage) across runs.
+
+    python benchmarks/replay_scrapers.py [--runs N] [facility ...]    # replay (default: all recorded)
+    python benchmarks/replay_scrapers.py --record [facility ...]      # make the recordings (live sites)
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+from collections import defaultdict
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('facilities', nargs='*', help='Facility names (default: all with a recording)')
+    parser.add_argument('--runs', type=int, default=3, help='Replays per facility (default 3)')
+    parser.add_argument('--record', action='store_true', help='Record each facility once from the live site')
+    args = parser.parse_args()
+
+    # Read when the scraper modules are imported, so set before importing them
+    os.environ['SCRAPER_HAR_MODE'] = 'record' if args.record else 'replay'
+    os.environ.pop('DATABASE_URL', None)
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from scrapers.har import har_path
+    from scraper_manager import ScraperManager
+    from scrape_history import percentile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DB_PATH'] = os.path.join(tmp, 'setup.db')
+        sm = ScraperManager()
+        try:
+            scraper_classes = dict(sm.scrapers)
+        finally:
+            sm.close()
+        names = args.facilities or [name for name in scraper_classes
+                                    if args.record or os.path.exists(har_path(name))]
+        if not names:
+            print("No recordings yet; make them with --record")
+            return
+        runs = 1 if args.record else args.runs
+
+        for name in names:
+            if name not in scraper_classes:
+                print(f"Unknown facility: {name}")
+                continue
+            walls, slots, errors = [], [], []
+            step_seconds = defaultdict(list)
+            for run in range(runs):
+                os.environ['DB_PATH'] = os.path.join(tmp, f'run-{run}.db')
+                scraper = scraper_classes[name](headless=True)
+                started = time.perf_counter()
+                try:
+                    scraper.scrape()
+                except Exception as e:
+                    errors.append(str(e))
+                walls.append(time.perf_counter() - started)
+                for step in scraper.run_log.steps:
+                    step_seconds[(step['kind'], step['name'])].append(step['seconds'])
+                    if step['kind'] == 'storage' and step['slots'] is not None:
+                        slots.append(step['slots'])
+
+            print(f"\n{name}: {runs} run(s), wall p50 {percentile(walls, 50)}s, p95 {percentile(walls, 95)}s, "
+                  f"slots stored {sorted(set(slots)) or 'none'}")
+            for error in errors:
+                print(f"  error: {error}")
+            rows = sorted(step_seconds.items(), key=lambda item: -(percentile(item[1], 95) or 0))
+            for (kind, step_name), seconds in rows:
+                print(f"  {kind:<11} {step_name:<16} n={len(seconds):<3} "
+                      f"p50 {percentile(seconds, 50)}s  p95 {percentile(seconds, 95)}s")
+
+
+if __name__ == '__main__':
+    main()
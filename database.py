@@ -1,6 +1,6 @@
 """Database models and setup for court availability storage."""
 import os
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Float, Text, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -25,6 +25,9 @@ class Facility(Base):
 class CourtAvailability(Base):
     """Represents available court time slots."""
     __tablename__ = 'court_availability'
+    # One row per slot; scrapers write only what changed (scrapers/storage.py)
+    __table_args__ = (UniqueConstraint('facility_id', 'date', 'court_number', 'start_time',
+                                       name='uq_court_availability_slot'),)
     
     id = Column(Integer, primary_key=True)
     facility_id = Column(Integer, nullable=False)
@@ -34,7 +37,105 @@ class CourtAvailability(Base):
     start_time = Column(String, nullable=False)  # e.g., "18:00"
     end_time = Column(String, nullable=False)  # e.g., "20:00"
     is_available = Column(Boolean, default=True)
-    scraped_at = Column(DateTime, default=datetime.utcnow)
+    scraped_at = Column(DateTime, default=datetime.utcnow)  # When the slot was stored or last changed
+
+
+class ScraperState(Base):
+    """Per-site state kept between scrapes (e.g. a logged-in browser session)."""
+    __tablename__ = 'scraper_state'
+    __table_args__ = (UniqueConstraint('site', 'kind'),)
+    
+    id = Column(Integer, primary_key=True)
+    site = Column(String, nullable=False)  # e.g. "hillsroad.legendonlineservices.co.uk"
+    kind = Column(String, nullable=False)  # e.g. "login_session"
+    payload = Column(Text)  # JSON
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class SlotChange(Base):
+    """Slots that changed at one facility/date/hour between two scrapes of that date."""
+    __tablename__ = 'slot_changes'
+    
+    id = Column(Integer, primary_key=True)
+    facility_id = Column(Integer, nullable=False)
+    date = Column(String, nullable=False)  # Slot date, e.g. "2024-01-15"
+    hour = Column(Integer, nullable=False)  # Hour of the slots' start time (0-23)
+    days_ahead = Column(Integer, nullable=False)  # Date minus scrape day (0 = today)
+    slots = Column(Integer, default=0)  # Slots seen in either scrape
+    changed = Column(Integer, default=0)  # Slots added, removed or flipped available/booked
+    interval_seconds = Column(Integer, nullable=False)  # Time since the previous scrape of this date
+    observed_at = Column(DateTime, default=datetime.utcnow)
+
+
+class AvailabilityDemand(Base):
+    """How often users asked for a facility's availability, per day asked and date asked about."""
+    __tablename__ = 'availability_demand'
+    __table_args__ = (UniqueConstraint('facility_id', 'date', 'day'),)
+    
+    id = Column(Integer, primary_key=True)
+    facility_id = Column(Integer, nullable=False)
+    date = Column(String, nullable=False)  # Date asked about, or "" for no date filter
+    day = Column(String, nullable=False)  # Day the requests were made (YYYY-MM-DD)
+    hits = Column(Integer, default=0)
+
+
+class ScrapeJob(Base):
+    """A queued scrape of one facility, run by the worker process (worker.py)."""
+    __tablename__ = 'scrape_jobs'
+    
+    id = Column(Integer, primary_key=True)
+    facility_name = Column(String, nullable=False)
+    # Set to facility_name while queued or running and cleared when done; unique, so a facility
+    # never has two jobs waiting or in flight
+    active_facility = Column(String, unique=True)
+    start_date = Column(String)  # Optional date range (YYYY-MM-DD)
+    end_date = Column(String)
+    due_only = Column(Boolean, default=False)  # Scrape only the dates the freshness tiers say are due
+    host = Column(String)  # Booking-site host; only one job per host runs at a time, across all workers
+    required_tag = Column(String)  # Only workers carrying this tag may run it (e.g. "home-ip")
+    status = Column(String, nullable=False, default='queued')  # queued, running, succeeded, skipped, failed
+    worker = Column(String)  # Host:pid of the worker that claimed it
+    attempts = Column(Integer, default=0)  # Claims so far (a lease that expires is claimed again)
+    lease_expires_at = Column(DateTime)  # Running job's lease; the worker's heartbeat keeps extending it
+    heartbeat_at = Column(DateTime)
+    result = Column(Text)  # JSON summary of the scrape result
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+
+class ScrapeRun(Base):
+    """One scrape of a facility (see scrape_history.py): how long it took and how it ended."""
+    __tablename__ = 'scrape_runs'
+    
+    id = Column(Integer, primary_key=True)
+    facility_id = Column(Integer, nullable=False, index=True)
+    start_date = Column(String)  # Date range asked for (YYYY-MM-DD), if any
+    end_date = Column(String)
+    outcome = Column(String, nullable=False)  # success, stopped_early (deadline) or failed
+    dates = Column(Integer, default=0)  # Dates whose rows were replaced
+    slots = Column(Integer)  # Rows stored
+    duration_seconds = Column(Float)
+    peak_rss_mb = Column(Float)  # Browser process tree's peak memory (scrapers/memory.py)
+    error = Column(Text)
+    started_at = Column(DateTime, default=datetime.utcnow, index=True)
+    finished_at = Column(DateTime)
+
+
+class ScrapeStep(Base):
+    """One timed step of a ScrapeRun: login, navigation, a date, or storage."""
+    __tablename__ = 'scrape_steps'
+    
+    id = Column(Integer, primary_key=True)
+    run_id = Column(Integer, nullable=False, index=True)
+    kind = Column(String, nullable=False)  # login, navigation, date, storage
+    name = Column(String, nullable=False)  # e.g. "saved login", "timetable", "day (api)"
+    date = Column(String)  # For date steps, the date read (YYYY-MM-DD)
+    seconds = Column(Float)
+    ok = Column(Boolean, default=True)
+    slots = Column(Integer)  # Slots read (date steps) or stored (storage)
+    error = Column(Text)
 
 
 def init_db(db_path=None):
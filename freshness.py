@@ -0,0 +1,104 @@
+"""Freshness tiers: how often each part of a facility's booking window needs re-scraping.
+
+Near-term slots change far more often than slots a week or two away, so dates are grouped into
+tiers by how many days ahead they are, each with its own maximum age. The time each date was last
+scraped is kept per facility (scraper_state, kind 'date_freshness'); a scheduled run only scrapes
+the span of dates that are due.
+"""
+import os
+import re
+import logging
+from datetime import datetime, timedelta
+
+from scrapers.state import load_state, save_state
+
+logger = logging.getLogger(__name__)
+
+# "first-last:max age" per tier, days counted from today (0 = today); "7-" means day 7 onwards.
+# Ages take s/m/h/d suffixes. Set to empty to scrape whole windows on every scheduled run.
+DEFAULT_FRESHNESS_TIERS = '0-1:1h,2-6:6h,7-:1d'
+SCRAPE_FRESHNESS_TIERS = os.getenv('SCRAPE_FRESHNESS_TIERS', DEFAULT_FRESHNESS_TIERS)
+# A date this close to its max age counts as due, so a cron run a little early doesn't skip it
+SCRAPE_FRESHNESS_SLACK_SECONDS = int(os.getenv('SCRAPE_FRESHNESS_SLACK_SECONDS', '600'))
+
+TIER_PATTERN = re.compile(r'^(\d+)-(\d*):(\d+)([smhd]?)$')
+UNIT_SECONDS = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_tiers(spec):
+    """[(first day, last day or None, max age seconds)] from e.g. '0-1:1h,2-6:6h,7-:1d'."""
+    tiers = []
+    for part in (spec or '').split(','):
+        part = part.strip().replace(' ', '')
+        if not part:
+            continue
+        m = TIER_PATTERN.match(part)
+        if not m:
+            raise ValueError(f"Bad freshness tier {part!r} (expected e.g. '0-1:1h' or '7-:1d')")
+        first, last = int(m.group(1)), int(m.group(2)) if m.group(2) else None
+        tiers.append((first, last, int(m.group(3)) * UNIT_SECONDS[m.group(4)]))
+    return tiers
+
+
+def max_age_seconds(tiers, day_offset):
+    """Max age for a date `day_offset` days from today, or None if no tier covers it."""
+    for first, last, max_age in tiers:
+        if day_offset >= first and (last is None or day_offset <= last):
+            return max_age
+    return None
+
+
+class DateFreshness:
+    """When each date of one facility's booking window was last scraped, and which dates are due."""
+
+    KIND = 'date_freshness'
+
+    def __init__(self, db_session, facility_name, tiers=None):
+        self.db_session = db_session
+        self.facility_name = facility_name
+        self.tiers = parse_tiers(SCRAPE_FRESHNESS_TIERS) if tiers is None else tiers
+        payload, _ = load_state(db_session, facility_name, self.KIND)
+        self.scraped_at = {day: datetime.fromisoformat(when) for day, when in (payload or {}).items()}
+
+    def record(self, dates, when=None):
+        """Mark `dates` as scraped at `when` (default now) and drop dates already in the past."""
+        when = when or datetime.utcnow()
+        for day in dates:
+            self.scraped_at[day.strftime('%Y-%m-%d')] = when
+        today = datetime.now().date().strftime('%Y-%m-%d')
+        self.scraped_at = {day: at for day, at in self.scraped_at.items() if day >= today}
+        save_state(self.db_session, self.facility_name, self.KIND,
+                   {day: at.isoformat() for day, at in self.scraped_at.items()})
+
+    def age_seconds(self, day, now=None):
+        """Seconds since `day` (a date) was last scraped, or None if it never was."""
+        scraped_at = self.scraped_at.get(day.strftime('%Y-%m-%d'))
+        if scraped_at is None:
+            return None
+        return ((now or datetime.utcnow()) - scraped_at).total_seconds()
+
+    def due_dates(self, window_days, now=None):
+        """Dates of the window (today onwards) never scraped or older than their tier allows."""
+        now = now or datetime.utcnow()
+        today = datetime.now().date()
+        due = []
+        for offset in range(window_days):
+            max_age = max_age_seconds(self.tiers, offset)
+            if max_age is None:
+                continue
+            day = today + timedelta(days=offset)
+            scraped_at = self.scraped_at.get(day.strftime('%Y-%m-%d'))
+            if scraped_at is None or (now - scraped_at).total_seconds() >= max_age - SCRAPE_FRESHNESS_SLACK_SECONDS:
+                due.append(day)
+        return due
+
+    def due_range(self, window_days, now=None):
+        """(first, last) due date, or None if everything is fresh.
+
+        A scrape covers one contiguous span (the login and navigation cost more than extra days),
+        so fresh dates between two due ones are scraped again too.
+        """
+        due = self.due_dates(window_days, now)
+        if not due:
+            return None
+        return due[0], due[-1]
@@ -0,0 +1,235 @@
+"""Database-backed scrape job queue, shared by any number of worker nodes.
+
+The web app only enqueues jobs (and answers status queries); worker.py claims and runs them. A
+facility has at most one job queued or running: enqueueing again returns that job, widening its
+date range if it hasn't started yet.
+
+A claimed job is held under a lease that the worker's heartbeat keeps extending. If a worker
+dies, its lease runs out and the job goes back to the queue for another node (up to
+SCRAPE_JOB_MAX_ATTEMPTS claims). Claims take the row with SELECT ... FOR UPDATE SKIP LOCKED on
+Postgres, so concurrent workers never wait on or double-claim a row; SQLite has no row locks but
+serialises writes, and the claim is a conditional UPDATE that only one worker can win there.
+
+Jobs can be pinned to workers carrying a tag (SCRAPE_FACILITY_TAGS, e.g. a site that blocks
+cloud IPs pinned to a worker on a home connection), and only one job per booking host runs at a
+time across all workers, with SCRAPE_DELAY_BETWEEN_FACILITIES_SECONDS between them. The claiming
+UPDATE itself checks that no live job runs on the host and none finished there within the delay, so
+the spacing holds across nodes and a worker never holds a lease while waiting out the delay.
+Row locks alone don't make that safe on Postgres: two workers could lock different jobs for the
+same host, and under READ COMMITTED neither sees the other's uncommitted claim. So on Postgres a
+claim also takes a per-host advisory lock for its transaction. A worker that finds the lock taken
+skips that host this time.
+"""
+import os
+import json
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func, or_, and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+
+from database import ScrapeJob
+
+logger = logging.getLogger(__name__)
+
+SCRAPE_LEASE_SECONDS = int(os.getenv('SCRAPE_LEASE_SECONDS', '120'))
+SCRAPE_JOB_MAX_ATTEMPTS = int(os.getenv('SCRAPE_JOB_MAX_ATTEMPTS', '3'))
+# Minimum gap between the end of one scrape of a booking host and the claim of the next
+SCRAPE_HOST_DELAY_SECONDS = int(os.getenv('SCRAPE_DELAY_BETWEEN_FACILITIES_SECONDS', '120'))
+HOST_LOCK_SPACE = 41  # First key of pg_try_advisory_xact_lock(space, hashtext(host)), apart from other locks
+
+
+def _parse_facility_tags(spec):
+    """{facility: tag} from 'Linton Village College=home-ip,Other Facility=uk'."""
+    tags = {}
+    for part in (spec or '').split(','):
+        name, _, tag = part.partition('=')
+        if name.strip() and tag.strip():
+            tags[name.strip()] = tag.strip()
+    return tags
+
+
+# Facilities only workers with the given tag (SCRAPE_WORKER_TAGS) may scrape
+SCRAPE_FACILITY_TAGS = _parse_facility_tags(os.getenv('SCRAPE_FACILITY_TAGS', ''))
+
+
+def _date_str(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def _widen(job, start_date, end_date, due_only):
+    """Make a queued job cover the new request too (an explicit request outranks due-only)."""
+    if due_only:
+        return  # The queued job already scrapes at least what's due
+    if job.due_only:
+        job.start_date, job.end_date = start_date, end_date
+    else:
+        job.start_date = None if job.start_date is None or start_date is None else min(job.start_date, start_date)
+        job.end_date = None if job.end_date is None or end_date is None else max(job.end_date, end_date)
+    job.due_only = False
+
+
+def enqueue_scrape(session, facility_name, start_date=None, end_date=None, due_only=False, host=None):
+    """Queue a scrape of the facility; returns (job, created). An active job is reused, not duplicated."""
+    start_date, end_date = _date_str(start_date), _date_str(end_date)
+    expire_leases(session)
+    job = ScrapeJob(facility_name=facility_name, active_facility=facility_name, start_date=start_date,
+                    end_date=end_date, due_only=due_only, host=host,
+                    required_tag=SCRAPE_FACILITY_TAGS.get(facility_name), status='queued')
+    session.add(job)
+    try:
+        session.commit()
+        logger.info(f"Queued scrape job {job.id} for {facility_name}")
+        return job, True
+    except IntegrityError:
+        session.rollback()
+    existing = session.query(ScrapeJob).filter_by(active_facility=facility_name).first()
+    if existing is None:
+        return enqueue_scrape(session, facility_name, start_date, end_date, due_only, host)  # It just finished
+    if existing.status == 'queued':
+        _widen(existing, start_date, end_date, due_only)
+        session.commit()
+    logger.info(f"Scrape of {facility_name} already {existing.status} as job {existing.id}")
+    return existing, False
+
+
+def _host_free(now):
+    """No live job is running on the job's host, and none ran there within the politeness delay."""
+    other = aliased(ScrapeJob)  # Not correlated with the job being claimed or updated
+    running = and_(other.status == 'running', other.lease_expires_at >= now)
+    # Skipped jobs (fresh data, rate limits) never opened the site
+    recent = and_(other.status.in_(('succeeded', 'failed')),
+                  other.finished_at > now - timedelta(seconds=SCRAPE_HOST_DELAY_SECONDS))
+    busy_hosts = select(other.host).where(other.host.isnot(None), or_(running, recent))
+    return or_(ScrapeJob.host.is_(None), ScrapeJob.host.notin_(busy_hosts))
+
+
+def _claimable(now, tags, skip_hosts=()):
+    """Queued jobs this worker may run: tag allowed, and the host free (see _host_free)."""
+    conditions = [
+        ScrapeJob.status == 'queued',
+        or_(ScrapeJob.required_tag.is_(None), ScrapeJob.required_tag.in_(list(tags))),
+        _host_free(now),
+    ]
+    if skip_hosts:
+        conditions.append(or_(ScrapeJob.host.is_(None), ScrapeJob.host.notin_(list(skip_hosts))))
+    return and_(*conditions)
+
+
+def _lock_host(session, host):
+    """Postgres: take the host's claim lock until the transaction ends; False if another worker has it."""
+    return bool(session.execute(
+        select(func.pg_try_advisory_xact_lock(HOST_LOCK_SPACE, func.hashtext(host)))
+    ).scalar())
+
+
+def claim_next_job(session, worker_id, tags=()):
+    """Lease the oldest job this worker may run and return it (None if there is none)."""
+    expire_leases(session)
+    postgres = session.get_bind().dialect.name == 'postgresql'
+    skip_hosts = set()
+    while True:
+        now = datetime.utcnow()
+        query = session.query(ScrapeJob).filter(_claimable(now, tags, skip_hosts)).order_by(ScrapeJob.id)
+        if postgres:
+            query = query.with_for_update(skip_locked=True)
+        job = query.first()
+        if job is None:
+            session.rollback()  # End the read transaction
+            return None
+        if postgres and job.host and not _lock_host(session, job.host):
+            skip_hosts.add(job.host)  # Another worker is claiming on this host right now
+            session.rollback()
+            continue
+        # Row-locked on Postgres; on SQLite only one worker's conditional update can match. The host
+        # check is repeated here: on Postgres this statement runs after the host lock was taken, so it
+        # sees any claim another worker committed; on SQLite it runs under the write lock.
+        claimed = session.query(ScrapeJob).filter(
+            ScrapeJob.id == job.id, ScrapeJob.status == 'queued', _host_free(now)
+        ).update({
+            'status': 'running', 'worker': worker_id, 'started_at': now, 'heartbeat_at': now,
+            'lease_expires_at': now + timedelta(seconds=SCRAPE_LEASE_SECONDS),
+            'attempts': func.coalesce(ScrapeJob.attempts, 0) + 1,
+        }, synchronize_session=False)
+        session.commit()  # Also releases the host lock
+        if claimed:
+            session.refresh(job)
+            return job
+
+
+def renew_lease(session, job_id, worker_id):
+    """Heartbeat: extend the lease; False if this worker no longer holds the job."""
+    now = datetime.utcnow()
+    renewed = session.query(ScrapeJob).filter_by(id=job_id, worker=worker_id, status='running').update({
+        'heartbeat_at': now, 'lease_expires_at': now + timedelta(seconds=SCRAPE_LEASE_SECONDS),
+    }, synchronize_session=False)
+    session.commit()
+    return bool(renewed)
+
+
+def finish_job(session, job_id, worker_id, result=None, error=None):
+    """Record the outcome and free the facility, unless the lease was lost to another worker."""
+    job = session.get(ScrapeJob, job_id)
+    if job is None:
+        return
+    if job.status != 'running' or job.worker != worker_id:
+        logger.warning(f"Job {job_id} is no longer held by {worker_id} ({job.status}, {job.worker}); "
+                       f"not recording this run's outcome")
+        return
+    outcome = result or {}
+    error = error or outcome.get('error')
+    if error is None and outcome.get('success'):
+        job.status = 'succeeded'
+    elif error is None and outcome.get('cached'):
+        job.status = 'skipped'  # Rate limits or fresh data: nothing was scraped
+    else:
+        job.status = 'failed'
+    summary = {k: v for k, v in outcome.items() if k != 'data'}
+    job.result = json.dumps(summary, default=str) if result is not None else None
+    job.error = error
+    job.finished_at = datetime.utcnow()
+    job.lease_expires_at = None
+    job.active_facility = None
+    session.commit()
+
+
+def expire_leases(session):
+    """Put running jobs whose lease ran out back in the queue (or fail them after too many tries)."""
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=SCRAPE_LEASE_SECONDS)
+    expired = and_(ScrapeJob.status == 'running', or_(
+        ScrapeJob.lease_expires_at < now,
+        and_(ScrapeJob.lease_expires_at.is_(None), ScrapeJob.started_at < stale),  # Claimed without a lease
+    ))
+    failed = session.query(ScrapeJob).filter(expired, ScrapeJob.attempts >= SCRAPE_JOB_MAX_ATTEMPTS).update({
+        'status': 'failed', 'error': f'Worker stopped responding ({SCRAPE_JOB_MAX_ATTEMPTS} attempts)',
+        'finished_at': now, 'lease_expires_at': None, 'active_facility': None,
+    }, synchronize_session=False)
+    requeued = session.query(ScrapeJob).filter(expired).update({
+        'status': 'queued', 'worker': None, 'lease_expires_at': None,
+    }, synchronize_session=False)
+    session.commit()
+    if failed or requeued:
+        logger.warning(f"Expired scrape job leases: {requeued} requeued, {failed} failed")
+
+
+def job_dict(job):
+    """JSON-friendly view of a job for the API."""
+    return {
+        'job_id': job.id,
+        'facility': job.facility_name,
+        'status': job.status,
+        'start_date': job.start_date,
+        'end_date': job.end_date,
+        'due_only': bool(job.due_only),
+        'required_tag': job.required_tag,
+        'worker': job.worker,
+        'attempts': job.attempts or 0,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'heartbeat_at': job.heartbeat_at.isoformat() if job.heartbeat_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'result': json.loads(job.result) if job.result else None,
+        'error': job.error,
+    }
@@ -36,6 +36,62 @@ def migrate():
             else:
                 print(f"Column '{col_name}' already exists")
         
+        # Lease columns on the scrape job queue (table created by init_db before they existed)
+        if 'scrape_jobs' in inspector.get_table_names():
+            job_columns = [col['name'] for col in inspector.get_columns('scrape_jobs')]
+            for col_name, col_type in {
+                'host': 'VARCHAR',
+                'required_tag': 'VARCHAR',
+                'attempts': 'INTEGER DEFAULT 0',
+                'lease_expires_at': 'TIMESTAMP',
+                'heartbeat_at': 'TIMESTAMP',
+            }.items():
+                if col_name not in job_columns:
+                    print(f"Adding column scrape_jobs.'{col_name}'...")
+                    try:
+                        session.execute(text(f"ALTER TABLE scrape_jobs ADD COLUMN {col_name} {col_type}"))
+                        session.commit()
+                        print(f"  ✓ Added {col_name}")
+                    except Exception as e:
+                        print(f"  ✗ Error adding {col_name}: {e}")
+                        session.rollback()
+        
+        # Browser memory peak on the run history (table created by init_db before it existed)
+        if 'scrape_runs' in inspector.get_table_names():
+            run_columns = [col['name'] for col in inspector.get_columns('scrape_runs')]
+            if 'peak_rss_mb' not in run_columns:
+                print("Adding column scrape_runs.'peak_rss_mb'...")
+                try:
+                    session.execute(text("ALTER TABLE scrape_runs ADD COLUMN peak_rss_mb FLOAT"))
+                    session.commit()
+                    print("  ✓ Added peak_rss_mb")
+                except Exception as e:
+                    print(f"  ✗ Error adding peak_rss_mb: {e}")
+                    session.rollback()
+        
+        # One row per slot (facility, date, court, start), now that scrapers upsert instead of
+        # deleting and re-inserting. Name single-court rows' court and drop duplicates first.
+        if 'court_availability' in inspector.get_table_names():
+            indexes = [ix['name'] for ix in inspector.get_indexes('court_availability')]
+            indexes += [uq['name'] for uq in inspector.get_unique_constraints('court_availability')]
+            if 'uq_court_availability_slot' not in indexes:
+                print("Adding unique index court_availability.'uq_court_availability_slot'...")
+                try:
+                    session.execute(text("UPDATE court_availability SET court_number = 'Court 1' WHERE court_number IS NULL"))
+                    deleted = session.execute(text(
+                        "DELETE FROM court_availability WHERE id NOT IN ("
+                        "SELECT MAX(id) FROM court_availability GROUP BY facility_id, date, court_number, start_time)"
+                    )).rowcount
+                    session.execute(text(
+                        "CREATE UNIQUE INDEX uq_court_availability_slot "
+                        "ON court_availability (facility_id, date, court_number, start_time)"
+                    ))
+                    session.commit()
+                    print(f"  ✓ Added uq_court_availability_slot ({deleted} duplicate row(s) removed)")
+                except Exception as e:
+                    print(f"  ✗ Error adding uq_court_availability_slot: {e}")
+                    session.rollback()
+        
         # Verify by querying
         test_facility = session.query(Facility).first()
         if test_facility:
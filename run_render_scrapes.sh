@@ -1,31 +1,40 @@
 #!/bin/bash
-# Trigger all three facility scrapes on Render.
-# Each scrape runs on the server and can take 5–15+ minutes; the request does not return until it finishes.
-# So you may see no new output for 10–20 minutes — that is normal. Timeout is 20 min per scrape.
+# Queue scrapes of all three facilities on Render and wait for the worker to finish them.
+# Each request returns a job ID at once; the scrape itself (5–15+ min) runs in the worker,
+# so this script polls /api/jobs/<id> until every job is done.
 set -e
 BASE="https://badminton-court-finder.onrender.com"
-TIMEOUT=1200
+POLL_SECONDS=30
 
-echo "=== Badminton Court Finder: triggering scrapes on Render ==="
-echo "Each request waits for the scrape to finish on the server (5–15+ min each). Don't close the terminal."
+echo "=== Badminton Court Finder: queueing scrapes on Render ==="
+JOBS=()
+for FACILITY in "Hill Roads Sport and Tennis Centre" "One Leisure St Ives" "Linton Village College"; do
+  echo "Queueing $FACILITY..."
+  RESPONSE=$(curl -s -X POST "$BASE/api/scrape" \
+    -H "Content-Type: application/json" \
+    -d "{\"facility\":\"$FACILITY\"}")
+  JOB_ID=$(echo "$RESPONSE" | python3 -c 'import json, sys; print(json.load(sys.stdin).get("job_id", ""))' 2>/dev/null || true)
+  if [ -z "$JOB_ID" ]; then
+    echo "  Could not queue: $RESPONSE"
+    continue
+  fi
+  echo "  Job $JOB_ID"
+  JOBS+=("$JOB_ID")
+done
 echo ""
 
-echo "[1/3] Hill Roads Sport and Tennis Centre — triggering (timeout ${TIMEOUT}s)..."
-curl -s --max-time "$TIMEOUT" -X POST "$BASE/api/scrape" \
-  -H "Content-Type: application/json" \
-  -d '{"facility":"Hill Roads Sport and Tennis Centre"}' | python3 -m json.tool 2>/dev/null || cat
-echo ""
-
-echo "[2/3] One Leisure St Ives — triggering (timeout ${TIMEOUT}s)..."
-curl -s --max-time "$TIMEOUT" -X POST "$BASE/api/scrape" \
-  -H "Content-Type: application/json" \
-  -d '{"facility":"One Leisure St Ives"}' | python3 -m json.tool 2>/dev/null || cat
-echo ""
-
-echo "[3/3] Linton Village College — triggering (timeout ${TIMEOUT}s)..."
-curl -s --max-time "$TIMEOUT" -X POST "$BASE/api/scrape" \
-  -H "Content-Type: application/json" \
-  -d '{"facility":"Linton Village College"}' | python3 -m json.tool 2>/dev/null || cat
-echo ""
+for JOB_ID in "${JOBS[@]}"; do
+  while true; do
+    JOB=$(curl -s "$BASE/api/jobs/$JOB_ID")
+    STATUS=$(echo "$JOB" | python3 -c 'import json, sys; print(json.load(sys.stdin).get("status", ""))' 2>/dev/null || true)
+    if [ "$STATUS" != "queued" ] && [ "$STATUS" != "running" ]; then
+      echo "Job $JOB_ID: $STATUS"
+      echo "$JOB" | python3 -m json.tool 2>/dev/null || echo "$JOB"
+      break
+    fi
+    echo "Job $JOB_ID: $STATUS..."
+    sleep "$POLL_SECONDS"
+  done
+done
 
 echo "Done. Refresh your live site to see last updated and availability."
@@ -0,0 +1,144 @@
+"""Run one scrape in a child process, so a leaking or hung Chromium can't take the worker (or API) with it.
+
+The child starts its own session (os.setsid), so Chromium and its helpers share the child's process
+group and can be killed together. While waiting for the result, the parent samples the memory (PSS)
+of the child's whole process tree every second. If the tree goes over SCRAPE_SANDBOX_MEMORY_MB, the
+parent kills the group. The default of 384 MB leaves room for the API on a 512 MB instance. CPU time
+is capped per process by an rlimit (SCRAPE_SANDBOX_CPU_SECONDS). The data segment can be capped the
+same way (SCRAPE_SANDBOX_PROCESS_MEMORY_MB), but that is off by default. The result comes back over a
+pipe. If none arrives within SCRAPE_SANDBOX_WALL_SECONDS, the whole group is killed.
+Set SCRAPE_SANDBOX=false to scrape in-process (e.g. on systems without fork/setsid).
+
+The group is killed after every scrape, so a sandboxed scrape never starts the in-process shared
+browser (SHARED_BROWSER). Run `python -m scrapers.browser` and set BROWSER_CDP_ENDPOINT instead.
+The child is started with 'spawn', which re-imports the parent's __main__ as __mp_main__. Scripts
+that might sandbox scrapes keep their side effects out of that import (see app.py).
+"""
+import os
+import time
+import signal
+import logging
+import multiprocessing
+from datetime import datetime
+
+from scraper_manager import ScraperManager
+from scrapers.browser import SHARED_BROWSER, BROWSER_CDP_ENDPOINT
+from scrapers.memory import tree_pss_bytes
+
+logger = logging.getLogger(__name__)
+
+SCRAPE_SANDBOX = os.getenv('SCRAPE_SANDBOX', 'true').lower() == 'true' and hasattr(os, 'setsid')
+SCRAPE_SANDBOX_MEMORY_MB = int(os.getenv('SCRAPE_SANDBOX_MEMORY_MB', '384'))  # Whole tree, PSS; 0 = no limit
+SCRAPE_SANDBOX_PROCESS_MEMORY_MB = int(os.getenv('SCRAPE_SANDBOX_PROCESS_MEMORY_MB', '0'))  # RLIMIT_DATA; 0 = none
+MEMORY_SAMPLE_SECONDS = 1
+SCRAPE_SANDBOX_CPU_SECONDS = int(os.getenv('SCRAPE_SANDBOX_CPU_SECONDS', '600'))  # 0 = no limit
+# Hard kill: the scrape deadline plus time to store what was read (no deadline: 30 minutes)
+SCRAPE_SANDBOX_WALL_SECONDS = int(os.getenv('SCRAPE_SANDBOX_WALL_SECONDS') or (
+    ScraperManager.SCRAPE_DEADLINE_SECONDS + 120 if ScraperManager.SCRAPE_DEADLINE_SECONDS else 1800))
+
+if SCRAPE_SANDBOX and SHARED_BROWSER and not BROWSER_CDP_ENDPOINT:
+    logger.warning("SHARED_BROWSER is ignored for sandboxed scrapes without BROWSER_CDP_ENDPOINT: "
+                   "run `python -m scrapers.browser` and set BROWSER_CDP_ENDPOINT, or each scrape launches its own")
+
+SIGNAL_REASONS = {signal.SIGXCPU: 'CPU time limit', signal.SIGKILL: 'killed', signal.SIGSEGV: 'crashed'}
+
+
+def run_scrape(manager_factory, name, date_range=None, due_only=True):
+    """The scrape result dict: a date range if given, else the due dates (or the whole window)."""
+    sm = manager_factory()
+    try:
+        if date_range:
+            return sm.scrape_facility(name, start_date=date_range[0], end_date=date_range[1])
+        if due_only:
+            return sm.scrape_due(name)
+        return sm.scrape_facility(name)
+    finally:
+        sm.close()
+
+
+def _limit(resource_module, limit, soft, hard=None):
+    if soft > 0:
+        resource_module.setrlimit(limit, (soft, hard or soft))
+
+
+def _child(conn, manager_factory, name, date_range, due_only, process_memory_mb, cpu_seconds):
+    os.setsid()  # Own process group: Chromium and its helpers die with us
+    os.environ['SCRAPE_SANDBOX_CHILD'] = '1'  # Tells scrapers/browser.py not to start a shared browser here
+    import resource
+    _limit(resource, resource.RLIMIT_DATA, process_memory_mb * 1024 * 1024)
+    _limit(resource, resource.RLIMIT_CPU, cpu_seconds, cpu_seconds + 5)  # SIGXCPU first, SIGKILL at the hard limit
+    try:
+        result = run_scrape(manager_factory, name, date_range, due_only)
+    except BaseException as e:  # MemoryError included: report it rather than die silently
+        result = {'success': False, 'error': f"{type(e).__name__}: {e}"}
+    conn.send(result)
+    conn.close()
+
+
+def _kill_group(pid):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run_scrape_sandboxed(manager_factory, name, date_range=None, due_only=True, wall_seconds=None,
+                         memory_mb=None, cpu_seconds=None):
+    """run_scrape in a capped child process; a killed or crashed child gives a failed result.
+
+    `memory_mb` caps the child's whole process tree (PSS, checked by the parent).
+    """
+    started_at = datetime.utcnow()
+    wall_seconds = wall_seconds or SCRAPE_SANDBOX_WALL_SECONDS
+    memory_mb = SCRAPE_SANDBOX_MEMORY_MB if memory_mb is None else memory_mb
+    ctx = multiprocessing.get_context('spawn')  # No inherited threads, locks or DB connections
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(
+        target=_child, name=f'scrape-{name}',
+        args=(sender, manager_factory, name, date_range, due_only,
+              SCRAPE_SANDBOX_PROCESS_MEMORY_MB,
+              SCRAPE_SANDBOX_CPU_SECONDS if cpu_seconds is None else cpu_seconds),
+    )
+    process.start()
+    sender.close()  # So recv() sees EOF if the child dies without sending
+    result, timed_out, peak_mb, over_memory = None, False, 0.0, False
+    deadline = time.monotonic() + wall_seconds
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            if receiver.poll(min(MEMORY_SAMPLE_SECONDS, remaining)):
+                result = receiver.recv()
+                break
+            if memory_mb:
+                peak_mb = max(peak_mb, tree_pss_bytes(process.pid) / (1024 * 1024))
+                if peak_mb > memory_mb:
+                    over_memory = True
+                    break
+    except EOFError:
+        pass
+    finally:
+        receiver.close()
+        _kill_group(process.pid)  # Kills a hung scrape, and any browser process left behind
+        process.join(timeout=10)
+
+    if result is None:
+        if over_memory:
+            reason = f"used {peak_mb:.0f} MB, over the {memory_mb} MB limit, and was killed"
+        elif timed_out:
+            reason = f"gave no result within {wall_seconds}s and was killed"
+        elif process.exitcode < 0:
+            sig = -process.exitcode
+            reason = f"died: {SIGNAL_REASONS.get(sig, signal.Signals(sig).name)} (signal {sig})"
+        else:
+            reason = f"exited with code {process.exitcode}"
+        logger.error(f"Sandboxed scrape of {name} failed: {reason}")
+        result = {'success': False, 'error': f"Scrape process {reason}"}
+        sm = manager_factory()
+        try:
+            sm.record_lost_scrape(name, started_at, result['error'], date_range)
+        finally:
+            sm.close()
+    return result
@@ -0,0 +1,113 @@
+"""Scrape run history: every scrape's steps (scrapers/run_log.py) saved as ScrapeRun/ScrapeStep rows.
+
+/api/facility/<name>/stats shows p50/p95 durations of whole runs and of each step from them,
+overall and per day, so the booking-site step that eats browser time stands out and the effect of
+a scraper change shows up in the trend.
+"""
+import os
+import math
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+from database import ScrapeRun, ScrapeStep
+
+SCRAPE_HISTORY_DAYS = int(os.getenv('SCRAPE_HISTORY_DAYS', '30'))
+RECENT_RUNS = 5
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of `values` (None if empty)."""
+    ordered = sorted(v for v in values if v is not None)
+    if not ordered:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return round(ordered[rank - 1], 2)
+
+
+def record_run(session, facility_id, started_at, outcome, steps, start_date=None, end_date=None,
+               dates=0, error=None, peak_rss_mb=None):
+    """Save one run and its steps (dicts from RunLog.steps); returns the ScrapeRun."""
+    finished_at = datetime.utcnow()
+    stored = [s['slots'] for s in steps if s['kind'] == 'storage' and s['slots'] is not None]
+    run = ScrapeRun(
+        facility_id=facility_id,
+        start_date=str(start_date) if start_date else None,
+        end_date=str(end_date) if end_date else None,
+        outcome=outcome, dates=dates, slots=sum(stored) if stored else None,
+        duration_seconds=round((finished_at - started_at).total_seconds(), 2), peak_rss_mb=peak_rss_mb,
+        error=error[:2000] if error else None, started_at=started_at, finished_at=finished_at,
+    )
+    session.add(run)
+    session.flush()
+    for s in steps:
+        session.add(ScrapeStep(run_id=run.id, kind=s['kind'], name=s['name'], date=s['date'],
+                               seconds=s['seconds'], ok=s['ok'], slots=s['slots'], error=s['error']))
+    session.commit()
+    return run
+
+
+def _stats(values):
+    return {'p50': percentile(values, 50), 'p95': percentile(values, 95)}
+
+
+def run_stats(session, facility_id, days=SCRAPE_HISTORY_DAYS):
+    """Run and step durations over the last `days`: totals, p50/p95 per step, and a per-day trend."""
+    since = datetime.utcnow() - timedelta(days=days)
+    runs = session.query(ScrapeRun).filter(
+        ScrapeRun.facility_id == facility_id, ScrapeRun.started_at >= since
+    ).order_by(ScrapeRun.started_at).all()
+    run_day = {run.id: run.started_at.date().isoformat() for run in runs}
+    steps = session.query(
+        ScrapeStep.run_id, ScrapeStep.kind, ScrapeStep.name, ScrapeStep.seconds, ScrapeStep.ok
+    ).filter(ScrapeStep.run_id.in_(list(run_day))).all() if runs else []
+
+    by_step = defaultdict(list)
+    failures = Counter()
+    by_day_kind = defaultdict(list)
+    for run_id, kind, name, seconds, ok in steps:
+        by_step[(kind, name)].append(seconds)
+        if not ok:
+            failures[(kind, name)] += 1
+        by_day_kind[(run_day[run_id], kind)].append(seconds)
+    by_day = defaultdict(list)
+    for run in runs:
+        by_day[run_day[run.id]].append(run.duration_seconds)
+
+    step_rows = [
+        {'kind': kind, 'name': name, 'count': len(values), 'failures': failures[(kind, name)], **_stats(values)}
+        for (kind, name), values in by_step.items()
+    ]
+    step_rows.sort(key=lambda row: row['p95'] or 0, reverse=True)
+    kinds = sorted({kind for kind, _ in by_step})
+    return {
+        'days': days,
+        'runs': len(runs),
+        'outcomes': dict(Counter(run.outcome for run in runs)),
+        'duration_seconds': _stats([run.duration_seconds for run in runs]),
+        'peak_rss_mb': _stats([run.peak_rss_mb for run in runs]),
+        'steps': step_rows,
+        'trend': [{
+            'day': day,
+            'runs': len(durations),
+            'duration_seconds': _stats(durations),
+            'steps_p50': {kind: percentile(by_day_kind[(day, kind)], 50)
+                          for kind in kinds if by_day_kind[(day, kind)]},
+        } for day, durations in sorted(by_day.items())],
+        'recent': [{
+            'started_at': run.started_at.isoformat(),
+            'outcome': run.outcome,
+            'duration_seconds': run.duration_seconds,
+            'peak_rss_mb': run.peak_rss_mb,
+            'dates': run.dates,
+            'slots': run.slots,
+            'error': run.error,
+        } for run in reversed(runs[-RECENT_RUNS:])],
+    }
+
+
+def purge_run_history(session):
+    """Drop runs (and their steps) older than SCRAPE_HISTORY_DAYS."""
+    cutoff = datetime.utcnow() - timedelta(days=SCRAPE_HISTORY_DAYS)
+    old_run_ids = session.query(ScrapeRun.id).filter(ScrapeRun.started_at < cutoff).scalar_subquery()
+    session.query(ScrapeStep).filter(ScrapeStep.run_id.in_(old_run_ids)).delete(synchronize_session=False)
+    session.query(ScrapeRun).filter(ScrapeRun.started_at < cutoff).delete(synchronize_session=False)
@@ -0,0 +1,114 @@
+"""Scrape-all orchestrator: bounded worker pool with per-host politeness."""
+import os
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+from sandbox import SCRAPE_SANDBOX, run_scrape, run_scrape_sandboxed
+
+logger = logging.getLogger(__name__)
+
+
+def facility_host(scraper_class):
+    """Return the booking-site host a scraper talks to (used to group politeness limits)."""
+    url = getattr(scraper_class, 'LOGIN_URL', None) or getattr(scraper_class, 'BASE_URL', None) or ''
+    return urlparse(url).netloc.lower() or scraper_class.__name__
+
+
+class HostLimiter:
+    """One scrape at a time per host, with a minimum gap between scrapes of the same host.
+
+    Different hosts never wait on each other; only back-to-back hits on one site are spaced out.
+    This only covers one process (ScrapeOrchestrator.run); queued jobs get the same spacing across
+    all workers from the claim query (jobs.py).
+    """
+
+    def __init__(self, min_interval_seconds=0):
+        self.min_interval_seconds = min_interval_seconds
+        self._lock = threading.Lock()
+        self._host_locks = {}
+        self._last_finished = {}
+
+    def _host_lock(self, host):
+        with self._lock:
+            if host not in self._host_locks:
+                self._host_locks[host] = threading.Lock()
+            return self._host_locks[host]
+
+    def acquire(self, host):
+        """Block until this host is free and its politeness delay has passed."""
+        self._host_lock(host).acquire()
+        last = self._last_finished.get(host)
+        if last is not None and self.min_interval_seconds > 0:
+            wait = self.min_interval_seconds - (time.monotonic() - last)
+            if wait > 0:
+                logger.info(f"Waiting {wait:.0f}s before hitting {host} again (politeness delay)...")
+                time.sleep(wait)
+
+    def release(self, host):
+        self._last_finished[host] = time.monotonic()
+        self._host_lock(host).release()
+
+
+class ScrapeOrchestrator:
+    """Runs scrape_due (or a planned date range) for many facilities concurrently, limited per host.
+
+    Each worker uses its own ScraperManager (and so its own DB session), because sessions
+    are not thread-safe. A full refresh takes roughly as long as the slowest host. With
+    SCRAPE_SANDBOX each scrape runs in a capped child process (see sandbox.py).
+    """
+
+    MAX_WORKERS = int(os.getenv('SCRAPE_MAX_WORKERS', '3'))
+    HOST_DELAY_SECONDS = int(os.getenv('SCRAPE_DELAY_BETWEEN_FACILITIES_SECONDS', '120'))
+
+    def __init__(self, manager_factory, max_workers=None, host_delay_seconds=None, sandbox=None):
+        self.manager_factory = manager_factory
+        self.sandbox = SCRAPE_SANDBOX if sandbox is None else sandbox
+        self.max_workers = max_workers or self.MAX_WORKERS
+        delay = self.HOST_DELAY_SECONDS if host_delay_seconds is None else host_delay_seconds
+        self.limiter = HostLimiter(min_interval_seconds=delay)
+
+    def scrape_one(self, name, host, date_range=None, due_only=True):
+        """Scrape one facility now: the date range if given, else its due dates (or the whole window
+        if not `due_only`). The caller makes sure the host is free (worker.py: the job claim)."""
+        started = time.monotonic()
+        try:
+            logger.info(f"Scrape started: {name} ({host})" + (" in a sandbox process" if self.sandbox else ""))
+            run = run_scrape_sandboxed if self.sandbox else run_scrape
+            result = run(self.manager_factory, name, date_range, due_only)
+        except Exception as e:
+            logger.error(f"Scheduled scrape {name} failed: {e}")
+            result = {'success': False, 'error': str(e)}
+        result['duration_seconds'] = round(time.monotonic() - started, 1)
+        logger.info(f"Scheduled scrape {name}: success={result.get('success')} in {result['duration_seconds']}s")
+        return result
+
+    def _scrape_polite(self, name, host, date_range=None):
+        """scrape_one once the host is free here and its politeness delay has passed (this process only)."""
+        self.limiter.acquire(host)
+        try:
+            return self.scrape_one(name, host, date_range)
+        finally:
+            self.limiter.release(host)
+
+    def run(self, facilities, scraper_classes, date_ranges=None):
+        """Scrape the given facility names; returns {name: result}.
+
+        `date_ranges` maps a name to the (start, end) dates to scrape; others scrape their due dates.
+        """
+        date_ranges = date_ranges or {}
+        hosts = {
+            name: facility_host(scraper_classes[name]) if name in scraper_classes else name
+            for name in facilities
+        }
+        logger.info(f"Scrape-all started for {facilities} with {self.max_workers} workers; hosts: {hosts}")
+        started = time.monotonic()
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='scrape') as pool:
+            futures = {pool.submit(self._scrape_polite, name, hosts[name], date_ranges.get(name)): name for name in facilities}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        logger.info(f"Scrape-all finished in {time.monotonic() - started:.0f}s")
+        return results
@@ -0,0 +1,276 @@
+"""Adaptive scrape scheduling: spend a daily scrape budget where stale data is most likely to be seen.
+
+Two things are recorded as the app runs:
+- after each scrape, how many slots changed per facility, date and hour since that date was last
+  scraped (SlotChange), which gives a change rate per facility, days ahead and hour;
+- in get_availability, which facilities and dates users ask for (AvailabilityDemand). Requests are
+  counted in memory and written at most every DEMAND_FLUSH_SECONDS, so reads don't each commit.
+
+Each scheduled run then scores every date as expected changed slots since its last scrape (rate x
+age) times demand for that date, and scrapes the best-scoring facilities, within the day's budget.
+"""
+import os
+import math
+import time
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from database import Facility, CourtAvailability, SlotChange, AvailabilityDemand
+from freshness import DateFreshness
+
+logger = logging.getLogger(__name__)
+
+# Availability requests are counted in memory and written to AvailabilityDemand this often (per process)
+DEMAND_FLUSH_SECONDS = float(os.getenv('DEMAND_FLUSH_SECONDS', '60'))
+
+# 'tiers' = scrape whatever the freshness tiers say is due; 'adaptive' = use this module's plan
+SCRAPE_SCHEDULER = os.getenv('SCRAPE_SCHEDULER', 'tiers').lower()
+
+
+def slot_snapshot(session, facility_id):
+    """{(date, start_time, court): is_available} of the facility's stored slots."""
+    rows = session.query(
+        CourtAvailability.date, CourtAvailability.start_time,
+        CourtAvailability.court_number, CourtAvailability.is_available
+    ).filter_by(facility_id=facility_id).all()
+    return {(date, start, court): bool(available) for date, start, court, available in rows}
+
+
+def record_slot_changes(session, facility_id, before, after, dates, previous_scraped_at, now=None):
+    """Add a SlotChange row per date and hour for the re-scraped `dates` (those scraped before).
+
+    `previous_scraped_at` maps 'YYYY-MM-DD' to when that date was last scraped (DateFreshness).
+    """
+    now = now or datetime.utcnow()
+    today = datetime.now().date()
+    for day in dates:
+        date_str = day.strftime('%Y-%m-%d')
+        previous = previous_scraped_at.get(date_str)
+        if previous is None or previous >= now:
+            continue  # First sight of this date: nothing to compare with
+        by_hour = defaultdict(lambda: [0, 0])  # hour -> [slots, changed]
+        keys = {k for k in before if k[0] == date_str} | {k for k in after if k[0] == date_str}
+        for key in keys:
+            try:
+                hour = int(key[1].split(':')[0])
+            except (AttributeError, ValueError):
+                continue
+            by_hour[hour][0] += 1
+            if before.get(key) != after.get(key):
+                by_hour[hour][1] += 1
+        for hour, (slots, changed) in by_hour.items():
+            session.add(SlotChange(
+                facility_id=facility_id, date=date_str, hour=hour, days_ahead=(day - today).days,
+                slots=slots, changed=changed,
+                interval_seconds=int((now - previous).total_seconds()), observed_at=now,
+            ))
+    session.commit()
+
+
+class DemandBuffer:
+    """Availability request counts held in memory until flush() adds them to AvailabilityDemand."""
+
+    def __init__(self, flush_seconds=None):
+        self.flush_seconds = DEMAND_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self.counts = defaultdict(int)  # (facility name, date or '', day) -> hits
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+
+    def add(self, facility_name, date=None, hits=1):
+        day = datetime.utcnow().date().isoformat()
+        with self.lock:
+            self.counts[(facility_name, date or '', day)] += hits
+
+    def due(self):
+        return bool(self.counts) and time.monotonic() - self.last_flush >= self.flush_seconds
+
+    def flush(self, session):
+        """Write the buffered counts in one commit; returns the requests written."""
+        with self.lock:
+            counts, self.counts = self.counts, defaultdict(int)
+            self.last_flush = time.monotonic()
+        if not counts:
+            return 0
+        written = 0
+        try:
+            names = {name for name, _, _ in counts}
+            facility_ids = dict(session.query(Facility.name, Facility.id).filter(Facility.name.in_(names)).all())
+            for (name, date, day), hits in counts.items():
+                facility_id = facility_ids.get(name)
+                if facility_id is None:
+                    continue
+                row = session.query(AvailabilityDemand).filter_by(facility_id=facility_id, date=date, day=day).first()
+                if not row:
+                    row = AvailabilityDemand(facility_id=facility_id, date=date, day=day, hits=0)
+                    session.add(row)
+                row.hits = (row.hits or 0) + hits
+                written += hits
+            session.commit()
+        except Exception:
+            session.rollback()
+            for (name, date, day), hits in counts.items():  # Keep them for the next flush
+                with self.lock:
+                    self.counts[(name, date, day)] += hits
+            raise
+        return written
+
+
+demand_buffer = DemandBuffer()
+
+
+def record_demand(session, facility_name, date=None):
+    """Count one availability request for the facility (and the date asked about, if any).
+
+    The count is buffered; the DB write happens when a flush is due (every DEMAND_FLUSH_SECONDS).
+    """
+    demand_buffer.add(facility_name, date)
+    if demand_buffer.due():
+        demand_buffer.flush(session)
+
+
+def flush_demand(session):
+    """Write buffered availability requests now (before reading demand, or at shutdown)."""
+    return demand_buffer.flush(session)
+
+
+def purge_scheduler_history(session):
+    """Drop change and demand records older than the history the scheduler looks at."""
+    cutoff = datetime.utcnow() - timedelta(days=AdaptiveScheduler.HISTORY_DAYS)
+    session.query(SlotChange).filter(SlotChange.observed_at < cutoff).delete(synchronize_session=False)
+    session.query(AvailabilityDemand).filter(
+        AvailabilityDemand.day < cutoff.date().isoformat()
+    ).delete(synchronize_session=False)
+
+
+class AdaptiveScheduler:
+    """Chooses which facilities (and which span of their dates) the next scheduled run scrapes."""
+
+    DAILY_BUDGET = int(os.getenv('SCRAPE_DAILY_BUDGET', '24'))  # Scrapes per day, all facilities
+    RUN_INTERVAL_HOURS = float(os.getenv('SCRAPE_SCHEDULER_INTERVAL_HOURS', '1'))  # How often cron calls
+    HISTORY_DAYS = int(os.getenv('SCRAPE_SCHEDULER_HISTORY_DAYS', '14'))
+    # Assumed changes per date per day before anything has been observed, and how many
+    # observations that assumption is worth
+    PRIOR_CHANGES_PER_DAY = float(os.getenv('SCRAPE_PRIOR_CHANGES_PER_DAY', '2'))
+    PRIOR_WEIGHT = 2
+    NEVER_SCRAPED_AGE_HOURS = 24 * 7
+    SPAN_FRACTION = 0.25  # Dates scoring at least this share of the facility's best date join its span
+    MIN_SCORE = 0.1  # Below this (expected stale slot views) a facility isn't worth a scrape
+
+    def __init__(self, db_session):
+        self.session = db_session
+
+    def used_today(self):
+        """Scrapes already run today, all facilities."""
+        today = datetime.utcnow().date().isoformat()
+        used = self.session.query(func.sum(Facility.scrape_count_today)).filter(
+            Facility.last_scrape_date == today
+        ).scalar()
+        return int(used or 0)
+
+    def allowance(self, now=None):
+        """Scrapes this run may spend: what's left of the budget, spread over the runs left today."""
+        now = now or datetime.utcnow()
+        remaining = self.DAILY_BUDGET - self.used_today()
+        if remaining <= 0:
+            return 0
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        runs_left = max(1, math.ceil((midnight - now).total_seconds() / 3600 / self.RUN_INTERVAL_HOURS))
+        return math.ceil(remaining / runs_left)
+
+    def change_rates(self, facility_id):
+        """{days ahead: expected changed slots per hour for one date}, smoothed towards the prior.
+
+        Rates are summed over the hours of the day, each hour's rate being its changes over the
+        time they accumulated in.
+        """
+        since = datetime.utcnow() - timedelta(days=self.HISTORY_DAYS)
+        rows = self.session.query(
+            SlotChange.days_ahead, SlotChange.hour,
+            func.sum(SlotChange.changed), func.sum(SlotChange.interval_seconds),
+            func.count(func.distinct(SlotChange.observed_at)),
+        ).filter(
+            SlotChange.facility_id == facility_id, SlotChange.observed_at >= since
+        ).group_by(SlotChange.days_ahead, SlotChange.hour).all()
+        observed = defaultdict(float)
+        observations = defaultdict(int)
+        for days_ahead, _, changed, seconds, count in rows:
+            if seconds:
+                observed[days_ahead] += (changed or 0) / (seconds / 3600)
+            observations[days_ahead] = max(observations[days_ahead], count)
+        prior = self.PRIOR_CHANGES_PER_DAY / 24
+        return {
+            days_ahead: (observed[days_ahead] * observations[days_ahead] + prior * self.PRIOR_WEIGHT)
+            / (observations[days_ahead] + self.PRIOR_WEIGHT)
+            for days_ahead in observed
+        }
+
+    def demand(self, facility_id, window_days):
+        """{'YYYY-MM-DD': weight} for the window: 1 + requests for that date + a share of undated ones."""
+        since = (datetime.utcnow().date() - timedelta(days=self.HISTORY_DAYS)).isoformat()
+        try:
+            flush_demand(self.session)  # This process's buffered requests count too
+        except Exception as e:
+            logger.warning(f"Could not flush availability demand: {e}")
+        rows = self.session.query(AvailabilityDemand.date, func.sum(AvailabilityDemand.hits)).filter(
+            AvailabilityDemand.facility_id == facility_id, AvailabilityDemand.day >= since
+        ).group_by(AvailabilityDemand.date).all()
+        hits = {date: int(count or 0) for date, count in rows}
+        undated = hits.pop('', 0) / max(window_days, 1)
+        today = datetime.now().date()
+        return {
+            (today + timedelta(days=i)).isoformat(): 1 + hits.get((today + timedelta(days=i)).isoformat(), 0) + undated
+            for i in range(window_days)
+        }
+
+    def date_scores(self, facility_name, window_days, now=None):
+        """[(date, score)] for the window: expected changed slots since last scrape x demand."""
+        now = now or datetime.utcnow()
+        facility = self.session.query(Facility).filter_by(name=facility_name).first()
+        rates = self.change_rates(facility.id) if facility else {}
+        demand = self.demand(facility.id, window_days) if facility else {}
+        scraped_at = DateFreshness(self.session, facility_name).scraped_at
+        prior = self.PRIOR_CHANGES_PER_DAY / 24
+        today = datetime.now().date()
+        scores = []
+        for offset in range(window_days):
+            day = today + timedelta(days=offset)
+            last = scraped_at.get(day.isoformat())
+            age_hours = (now - last).total_seconds() / 3600 if last else self.NEVER_SCRAPED_AGE_HOURS
+            expected_changes = rates.get(offset, prior) * age_hours
+            scores.append((day, expected_changes * demand.get(day.isoformat(), 1)))
+        return scores
+
+    def plan(self, facilities, scraper_classes, now=None):
+        """[{'facility', 'start_date', 'end_date', 'score'}] for this run, best first.
+
+        Each facility's span runs from its first to its last date scoring at least SPAN_FRACTION of
+        its best date; facilities are ranked by the total score inside their span.
+        """
+        allowance = self.allowance(now)
+        if allowance <= 0:
+            logger.info(f"Daily scrape budget used up ({self.DAILY_BUDGET}); nothing scheduled")
+            return []
+        candidates = []
+        for name in facilities:
+            scraper_class = scraper_classes.get(name)
+            if not scraper_class:
+                continue
+            scores = self.date_scores(name, scraper_class.WINDOW_DAYS, now)
+            best = max((score for _, score in scores), default=0)
+            if best <= 0:
+                continue
+            in_span = [i for i, (_, score) in enumerate(scores) if score >= best * self.SPAN_FRACTION]
+            span = scores[in_span[0]:in_span[-1] + 1]
+            total = sum(score for _, score in span)
+            if total >= self.MIN_SCORE:
+                candidates.append({'facility': name, 'start_date': span[0][0], 'end_date': span[-1][0],
+                                   'score': round(total, 2)})
+        candidates.sort(key=lambda c: c['score'], reverse=True)
+        chosen = candidates[:allowance]
+        logger.info(f"Scrape plan ({len(chosen)} of {len(candidates)} candidates, allowance {allowance}): "
+                    + ', '.join(f"{c['facility']} {c['start_date']}..{c['end_date']} ({c['score']})" for c in chosen))
+        return chosen
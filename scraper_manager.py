@@ -6,6 +6,11 @@ from scrapers.linton_village_college import LintonVillageCollegeScraper
 from scrapers.hill_roads import HillRoadsScraper
 from scrapers.one_leisure_st_ives import OneLeisureStIvesScraper
 from scrapers.trumpington_sport import TrumpingtonSportScraper
+from scrapers.deadline import Deadline
+from scrapers.date_range import ScrapeRange
+from freshness import SCRAPE_FRESHNESS_TIERS, SCRAPE_FRESHNESS_SLACK_SECONDS, DateFreshness
+from scrape_scheduler import slot_snapshot, record_slot_changes, record_demand, purge_scheduler_history
+from scrape_history import record_run, run_stats, purge_run_history
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -20,6 +25,8 @@ class ScraperManager:
     MAX_SCRAPES_PER_HOUR = int(os.getenv('MAX_SCRAPES_PER_HOUR', '1'))
     MIN_CACHE_AGE_SECONDS = int(os.getenv('MIN_CACHE_AGE_SECONDS', '3600'))  # 1 hour
     MAX_CONSECUTIVE_ERRORS = 3  # Circuit breaker threshold
+    # Time budget for one scrape (login, navigation and every day's waits); 0 = no limit
+    SCRAPE_DEADLINE_SECONDS = int(os.getenv('SCRAPE_DEADLINE_SECONDS', '600'))
     
     def __init__(self):
         self.db_engine = init_db()
@@ -31,8 +38,14 @@ class ScraperManager:
             'Trumpington Sport': TrumpingtonSportScraper,
         }
     
-    def should_scrape(self, facility_name):
-        """Check if we should scrape based on cache age and rate limits."""
+    def should_scrape(self, facility_name, dates=None):
+        """Check if we should scrape based on cache age and rate limits.
+
+        For a date-range scrape, `dates` are the dates it covers and the cache age is checked per
+        date (DateFreshness): it is refused only if every date is fresher than MIN_CACHE_AGE_SECONDS.
+        Both guards allow SCRAPE_FRESHNESS_SLACK_SECONDS early, like the freshness tiers, so a
+        scheduled run a little early isn't refused. The circuit breaker and daily limit always apply.
+        """
         facility = self.session.query(Facility).filter_by(name=facility_name).first()
         
         if not facility:
@@ -45,7 +58,14 @@ class ScraperManager:
             return False, f"Circuit breaker: {facility.scrape_errors} consecutive errors"
         
         # Check cache age
-        if facility.last_scraped_at:
+        slack = SCRAPE_FRESHNESS_SLACK_SECONDS if dates is not None else 0
+        if dates is not None:
+            freshness = DateFreshness(self.session, facility_name)
+            ages = [freshness.age_seconds(day) for day in dates]
+            if ages and all(age is not None and age < self.MIN_CACHE_AGE_SECONDS - slack for age in ages):
+                logger.info(f"Cache fresh for {facility_name}: all {len(dates)} date(s) under {self.MIN_CACHE_AGE_SECONDS}s old")
+                return False, f"Cache fresh: all {len(dates)} date(s) scraped within {self.MIN_CACHE_AGE_SECONDS}s"
+        elif facility.last_scraped_at:
             age = (datetime.utcnow() - facility.last_scraped_at).total_seconds()
             if age < self.MIN_CACHE_AGE_SECONDS:
                 logger.info(f"Cache fresh for {facility_name}: {age:.0f}s old")
@@ -65,18 +85,27 @@ class ScraperManager:
         
         # Check hourly limit (simplified: if scraped in last hour)
         if facility.last_scraped_at:
-            hours_since = (datetime.utcnow() - facility.last_scraped_at).total_seconds() / 3600
-            if hours_since < 1 and facility.scrape_count_today >= self.MAX_SCRAPES_PER_HOUR:
+            seconds_since = (datetime.utcnow() - facility.last_scraped_at).total_seconds()
+            if seconds_since < 3600 - slack and facility.scrape_count_today >= self.MAX_SCRAPES_PER_HOUR:
                 logger.warning(f"Hourly limit reached for {facility_name}")
                 return False, "Hourly limit reached"
         
         logger.info(f"Scraping approved for {facility_name}")
         return True, "Cache stale or missing"
     
-    def scrape_facility(self, facility_name):
-        """Scrape a facility with error handling and rate limiting."""
+    def scrape_facility(self, facility_name, start_date=None, end_date=None, deadline=None):
+        """Scrape a facility with error handling and rate limiting.
+
+        With start_date/end_date ('YYYY-MM-DD' or date) only those dates are scraped, and only
+        their stored rows are replaced. The scrape stops at `deadline` (default
+        SCRAPE_DEADLINE_SECONDS from now), keeping the days it already read.
+        """
         facility = None
-        should_scrape, reason = self.should_scrape(facility_name)
+        partial = start_date is not None or end_date is not None
+        dates = None
+        if partial and facility_name in self.scrapers:
+            dates = ScrapeRange(self.scrapers[facility_name].WINDOW_DAYS, start_date, end_date).dates
+        should_scrape, reason = self.should_scrape(facility_name, dates=dates)
         
         if not should_scrape:
             return {
@@ -101,10 +130,18 @@ class ScraperManager:
                 'error': f'No scraper found for {facility_name}'
             }
         
+        run_started = datetime.utcnow()
+        scraper = None
         try:
-            logger.info(f"Starting scrape for {facility_name}")
+            logger.info(f"Starting scrape for {facility_name}" + (f" ({start_date} to {end_date})" if partial else ""))
+            freshness = DateFreshness(self.session, facility_name)
+            before = slot_snapshot(self.session, facility.id)
+            if deadline is None:
+                deadline = Deadline(self.SCRAPE_DEADLINE_SECONDS or None)
             scraper = scraper_class(headless=True)
-            scraper.scrape()
+            scraper.scrape(start_date=start_date, end_date=end_date, deadline=deadline)
+            scraped_dates = scraper.range.dates  # Narrowed by the scraper to the days it actually read
+            stopped_early = getattr(scraper, 'stopped_early', False)
             
             # Update facility metadata
             facility.last_scraped_at = datetime.utcnow()
@@ -117,13 +154,21 @@ class ScraperManager:
             facility.scrape_errors = 0  # Reset error count on success
             self._purge_past_availability()
             self.session.commit()
+            self._record_slot_changes(facility, before, scraped_dates, freshness.scraped_at)
+            freshness.record(scraped_dates, facility.last_scraped_at)
+            self._record_run(facility, scraper, run_started, 'stopped_early' if stopped_early else 'success',
+                             start_date, end_date, dates=len(scraped_dates))
             
+            if stopped_early:
+                logger.warning(f"Scrape deadline passed for {facility_name}; kept {len(scraped_dates)} day(s)")
             logger.info(f"Successfully scraped {facility_name}")
             return {
                 'success': True,
                 'cached': False,
                 'facility': facility_name,
                 'scraped_at': facility.last_scraped_at.isoformat(),
+                'dates': [d.isoformat() for d in scraped_dates],
+                'stopped_early': stopped_early,
                 'data': self._get_cached_data(facility_name)
             }
             
@@ -141,6 +186,7 @@ class ScraperManager:
                     self.session.commit()
                 except Exception:
                     self.session.rollback()
+                self._record_run(facility, scraper, run_started, 'failed', start_date, end_date, error=str(e))
             # Return cached data if available
             try:
                 cached_data = self._get_cached_data(facility_name)
@@ -153,8 +199,31 @@ class ScraperManager:
                 'data': cached_data
             }
     
+    def scrape_due(self, facility_name, deadline=None):
+        """Scrape only the dates whose freshness tier says they are due (see freshness.py).
+
+        Without tiers (SCRAPE_FRESHNESS_TIERS empty) this is a plain scrape_facility.
+        """
+        scraper_class = self.scrapers.get(facility_name)
+        if not SCRAPE_FRESHNESS_TIERS or not scraper_class:
+            return self.scrape_facility(facility_name, deadline=deadline)
+        due = DateFreshness(self.session, facility_name).due_range(scraper_class.WINDOW_DAYS)
+        if due is None:
+            logger.info(f"All dates fresh for {facility_name}, nothing to scrape")
+            return {
+                'success': False,
+                'cached': True,
+                'reason': 'All dates fresh',
+                'data': self._get_cached_data(facility_name)
+            }
+        return self.scrape_facility(facility_name, start_date=due[0], end_date=due[1], deadline=deadline)
+    
     def _get_cached_data(self, facility_name):
-        """Get cached availability data for a facility."""
+        """Get cached availability data for a facility.
+
+        A slot's scraped_at is when its date was last scraped (DateFreshness), not when the row last
+        changed: unchanged rows aren't rewritten, so their own scraped_at can be hours older.
+        """
         facility = self.session.query(Facility).filter_by(name=facility_name).first()
         if not facility:
             return []
@@ -170,6 +239,7 @@ class ScraperManager:
             CourtAvailability.date,
             CourtAvailability.start_time
         ).all()
+        checked = DateFreshness(self.session, facility_name).scraped_at
         
         return [{
             'date': r.date,
@@ -177,20 +247,61 @@ class ScraperManager:
             'start_time': r.start_time,
             'end_time': r.end_time,
             'court_number': r.court_number,
-            'scraped_at': r.scraped_at.isoformat() if r.scraped_at else None
+            'scraped_at': checked[r.date].isoformat() if r.date in checked else None
         } for r in records]
     
+    def _record_slot_changes(self, facility, before, scraped_dates, previous_scraped_at):
+        """Feed the adaptive scheduler: slots changed per date/hour since those dates were last scraped."""
+        try:
+            after = slot_snapshot(self.session, facility.id)
+            record_slot_changes(self.session, facility.id, before, after, scraped_dates,
+                                dict(previous_scraped_at), now=facility.last_scraped_at)
+        except Exception as e:
+            logger.warning(f"Could not record slot changes for {facility.name}: {e}")
+            self.session.rollback()
+    
+    def _record_run(self, facility, scraper, started_at, outcome, start_date, end_date, dates=0, error=None):
+        """Save the run and the scraper's timed steps to the run history (see scrape_history.py)."""
+        run_log = getattr(scraper, 'run_log', None)
+        try:
+            record_run(self.session, facility.id, started_at, outcome, run_log.steps if run_log else [],
+                       start_date, end_date, dates=dates, error=error,
+                       peak_rss_mb=run_log.peak_rss_mb if run_log else None)
+        except Exception as e:
+            logger.warning(f"Could not record scrape run for {facility.name}: {e}")
+            self.session.rollback()
+    
+    def record_lost_scrape(self, facility_name, started_at, error, date_range=None):
+        """Count a scrape whose process was killed or crashed (no result came back) as failed."""
+        facility = self.session.query(Facility).filter_by(name=facility_name).first()
+        if not facility:
+            return
+        try:
+            facility.scrape_errors = (facility.scrape_errors or 0) + 1
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+        start_date, end_date = date_range or (None, None)
+        self._record_run(facility, None, started_at, 'failed', start_date, end_date, error=error)
+    
     def _purge_past_availability(self):
         """Delete CourtAvailability rows where date is more than 24 hours in the past (keeps DB size down)."""
         cutoff_date = (datetime.utcnow().date() - timedelta(days=1)).isoformat()
         deleted = self.session.query(CourtAvailability).filter(CourtAvailability.date < cutoff_date).delete()
         if deleted:
             logger.info(f"Purged {deleted} past availability record(s) (date < {cutoff_date})")
+        purge_scheduler_history(self.session)
+        purge_run_history(self.session)
     
     def get_availability(self, facility_name, date=None, start_time=None, end_time=None):
         """Get availability for a facility from the database only (no scrape on request)."""
         # Always return cached/DB data. Scraping is triggered separately via /api/scrape or scheduled jobs.
         data = self._get_cached_data(facility_name)
+        try:
+            record_demand(self.session, facility_name, date)  # Tells the adaptive scheduler what users look at
+        except Exception as e:
+            logger.warning(f"Could not record demand for {facility_name}: {e}")
+            self.session.rollback()
         
         # Apply filters
         if date:
@@ -243,7 +354,8 @@ class ScraperManager:
             'scrape_count_today': facility.scrape_count_today or 0,
             'scrape_errors': facility.scrape_errors or 0,
             'cached_slots': len(cached_data),
-            'circuit_breaker_active': (facility.scrape_errors or 0) >= self.MAX_CONSECUTIVE_ERRORS
+            'circuit_breaker_active': (facility.scrape_errors or 0) >= self.MAX_CONSECUTIVE_ERRORS,
+            'history': run_stats(self.session, facility.id)
         }
     
     def close(self):
@@ -0,0 +1,158 @@
+"""Debug artifacts (screenshots, DOM snapshots, Playwright traces), kept only when they are useful.
+
+A failure always captures the page: a viewport screenshot, its HTML, and the error. Checkpoints
+along the booking flow are captured only on sampled runs (SCRAPER_ARTIFACT_SAMPLE_RATE, default
+0), so normal runs take no screenshots at all. Sampled runs also record a Playwright trace; set
+SCRAPER_TRACE_ON_FAILURE=true to trace every run and keep the trace only when the run fails.
+
+Each run's files go in their own directory under SCRAPER_ARTIFACTS_DIR. The directory is a ring
+buffer: when it grows past SCRAPER_ARTIFACTS_MAX_MB, the oldest runs are deleted. The API lists
+runs at /api/debug/artifacts (see app.py).
+"""
+import os
+import re
+import json
+import random
+import shutil
+from datetime import datetime
+
+SCRAPER_ARTIFACTS_DIR = os.getenv('SCRAPER_ARTIFACTS_DIR') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'debug_artifacts')
+SCRAPER_ARTIFACT_SAMPLE_RATE = float(os.getenv('SCRAPER_ARTIFACT_SAMPLE_RATE', '0'))
+SCRAPER_ARTIFACTS_MAX_MB = float(os.getenv('SCRAPER_ARTIFACTS_MAX_MB', '50'))
+SCRAPER_TRACE_ON_FAILURE = os.getenv('SCRAPER_TRACE_ON_FAILURE', 'false').lower() == 'true'
+CAPTURE_TIMEOUT_MS = 5000  # A hung page must not hold up the error path
+RUN_FILE = 'run.json'
+
+
+def _slug(text):
+    return re.sub(r'[^a-z0-9]+', '_', text.lower()).strip('_')
+
+
+class DebugArtifacts:
+    """One scrape's debug captures: failure() always, checkpoint() only when the run is sampled."""
+
+    def __init__(self, facility_name, sample_rate=None):
+        rate = SCRAPER_ARTIFACT_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.facility_name = facility_name
+        self.sampled = rate > 0 and random.random() < rate
+        self.started_at = datetime.utcnow()
+        self.run_id = f"{self.started_at:%Y%m%dT%H%M%S%f}_{_slug(facility_name)}"
+        self.path = os.path.join(SCRAPER_ARTIFACTS_DIR, self.run_id)
+        self.files = []
+        self.error = None
+        self.tracing = False
+
+    def attach(self, context):
+        """Start a Playwright trace on the context if this run might keep one."""
+        if not (self.sampled or SCRAPER_TRACE_ON_FAILURE):
+            return
+        try:
+            context.tracing.start(screenshots=True, snapshots=True)
+            self.tracing = True
+        except Exception as e:
+            print(f"Could not start trace: {e}")
+
+    def _capture(self, page, name):
+        os.makedirs(self.path, exist_ok=True)
+        base = f"{len(self.files) + 1:02d}_{_slug(name)}"
+        try:
+            page.screenshot(path=os.path.join(self.path, f'{base}.png'), timeout=CAPTURE_TIMEOUT_MS)
+            self.files.append(f'{base}.png')
+        except Exception as e:
+            print(f"Screenshot '{name}' failed: {e}")
+        try:
+            with open(os.path.join(self.path, f'{base}.html'), 'w', encoding='utf-8') as f:
+                f.write(page.content())
+            self.files.append(f'{base}.html')
+        except Exception as e:
+            print(f"DOM snapshot '{name}' failed: {e}")
+
+    def checkpoint(self, page, name):
+        """Capture the page at a step of the flow, on sampled runs only."""
+        if self.sampled:
+            self._capture(page, name)
+
+    def failure(self, page, name, error=None):
+        """Capture the page where something went wrong (always)."""
+        if error is not None:
+            self.error = str(error)[:2000]
+        self._capture(page, name)
+        print(f"Saved debug capture '{name}' to {self.path}")
+
+    def finish(self, context):
+        """Keep or drop the trace, write the run's summary, and trim the ring buffer.
+
+        The run counts as failed if failure() was given its error. Call before the context is closed.
+        """
+        failed = self.error is not None
+        if self.tracing:
+            try:
+                if failed or self.sampled:
+                    os.makedirs(self.path, exist_ok=True)
+                    context.tracing.stop(path=os.path.join(self.path, 'trace.zip'))
+                    self.files.append('trace.zip')
+                else:
+                    context.tracing.stop()
+            except Exception as e:
+                print(f"Could not save trace: {e}")
+            self.tracing = False
+        if not self.files:
+            return
+        with open(os.path.join(self.path, RUN_FILE), 'w') as f:
+            json.dump({'facility': self.facility_name, 'started_at': self.started_at.isoformat(),
+                       'failed': failed, 'sampled': self.sampled, 'error': self.error}, f)
+        trim_artifacts()
+
+
+def _dir_bytes(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)
+               if os.path.isfile(os.path.join(path, name)))
+
+
+def _run_dirs():
+    """Run directories, oldest first (run ids start with their UTC start time)."""
+    if not os.path.isdir(SCRAPER_ARTIFACTS_DIR):
+        return []
+    return sorted(name for name in os.listdir(SCRAPER_ARTIFACTS_DIR)
+                  if os.path.isdir(os.path.join(SCRAPER_ARTIFACTS_DIR, name)))
+
+
+def trim_artifacts(max_mb=None):
+    """Delete the oldest runs until the artifacts fit in max_mb (default SCRAPER_ARTIFACTS_MAX_MB)."""
+    limit = (SCRAPER_ARTIFACTS_MAX_MB if max_mb is None else max_mb) * 1024 * 1024
+    runs = [(name, _dir_bytes(os.path.join(SCRAPER_ARTIFACTS_DIR, name))) for name in _run_dirs()]
+    total = sum(size for _, size in runs)
+    for name, size in runs[:-1]:  # The newest run is kept even if it alone is over the limit
+        if total <= limit:
+            break
+        shutil.rmtree(os.path.join(SCRAPER_ARTIFACTS_DIR, name), ignore_errors=True)
+        total -= size
+
+
+def list_artifacts():
+    """Stored runs, newest first: run id, facility, failed/sampled, error and files with sizes."""
+    runs = []
+    for name in reversed(_run_dirs()):
+        path = os.path.join(SCRAPER_ARTIFACTS_DIR, name)
+        try:
+            with open(os.path.join(path, RUN_FILE)) as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            info = {}  # Run still in progress, or killed before finish()
+        try:
+            files = [{'name': f, 'bytes': os.path.getsize(os.path.join(path, f))}
+                     for f in sorted(os.listdir(path)) if f != RUN_FILE]
+        except OSError:
+            continue  # Trimmed by a scrape while we listed
+        runs.append(dict(info, run=name, files=files))
+    return runs
+
+
+def artifact_path(run, name):
+    """Absolute path of one stored file, or None if there is no such file (or the name escapes the dir)."""
+    path = os.path.realpath(os.path.join(SCRAPER_ARTIFACTS_DIR, run, name))
+    root = os.path.realpath(SCRAPER_ARTIFACTS_DIR)
+    if not path.startswith(root + os.sep) or not os.path.isfile(path):
+        return None
+    return path
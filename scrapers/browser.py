@@ -0,0 +1,251 @@
+"""Shared Chromium for scrapers.
+
+By default each scrape launches its own Chromium, as before. With SHARED_BROWSER=true a single
+long-lived Chromium is kept running in the background and scrapers attach to it over CDP, each
+getting its own isolated browser context. BROWSER_CDP_ENDPOINT points scrapers at a browser that
+is managed elsewhere (e.g. `python -m scrapers.browser` in another process). Sandboxed scrapes
+(sandbox.py) never start the in-process shared browser, because the sandbox's process group is
+killed after each scrape; with SCRAPE_SANDBOX on, SHARED_BROWSER needs BROWSER_CDP_ENDPOINT.
+
+BROWSER_LOW_MEMORY (default true) launches Chromium with a profile for small containers: fewer
+renderer processes, no GPU/extensions/background networking, a capped cache and JS heap, and a
+smaller (still desktop-width) viewport. scrapers/memory.py watches the resulting memory use.
+"""
+import atexit
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from playwright.sync_api import sync_playwright
+from scrapers.routing import RequestPolicy
+from scrapers.har import har_context_options, attach_har
+from scrapers.memory import browser_pid
+
+SHARED_BROWSER = os.getenv('SHARED_BROWSER', 'false').lower() == 'true'
+BROWSER_CDP_ENDPOINT = os.getenv('BROWSER_CDP_ENDPOINT')
+BROWSER_SERVICE_PORT = int(os.getenv('BROWSER_SERVICE_PORT', '0'))  # 0 = pick a free port
+
+BROWSER_LOW_MEMORY = os.getenv('BROWSER_LOW_MEMORY', 'true').lower() == 'true'
+BROWSER_JS_HEAP_MB = int(os.getenv('BROWSER_JS_HEAP_MB', '256'))  # V8 old-space cap per renderer
+
+LAUNCH_ARGS = ['--disable-blink-features=AutomationControlled']
+LOW_MEMORY_ARGS = [
+    '--renderer-process-limit=2',  # Pages share renderers instead of one process each
+    '--disable-site-isolation-trials',
+    '--disable-dev-shm-usage',  # Docker's /dev/shm is 64 MB; use /tmp instead
+    '--disable-gpu',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--mute-audio',
+    '--disk-cache-size=33554432',  # 32 MB, also bounds the in-memory cache of incognito contexts
+    '--media-cache-size=1',
+    f'--js-flags=--max-old-space-size={BROWSER_JS_HEAP_MB}',
+]
+if BROWSER_LOW_MEMORY:
+    LAUNCH_ARGS = LAUNCH_ARGS + LOW_MEMORY_ARGS
+# Wide enough for the booking sites' desktop layouts
+VIEWPORT = {'width': 1280, 'height': 800} if BROWSER_LOW_MEMORY else {'width': 1920, 'height': 1080}
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+DEFAULT_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-GB,en;q=0.9',
+}
+HIDE_WEBDRIVER_SCRIPT = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class BrowserService:
+    """Long-lived Chromium process exposing a CDP endpoint, restarted if it crashes."""
+
+    STARTUP_TIMEOUT_SECONDS = 30
+
+    def __init__(self, headless=True, port=None):
+        self.headless = headless
+        self.port = port or BROWSER_SERVICE_PORT or _free_port()
+        self.process = None
+        self.executable_path = None
+        self.user_data_dir = None
+        self.restarts = 0
+        self._lock = threading.Lock()
+
+    @property
+    def endpoint(self):
+        return f'http://127.0.0.1:{self.port}'
+
+    def start(self, executable_path):
+        """Launch Chromium and wait until its CDP endpoint answers."""
+        self.executable_path = executable_path
+        self.user_data_dir = tempfile.mkdtemp(prefix='court-finder-chromium-')
+        args = [
+            executable_path,
+            f'--remote-debugging-port={self.port}',
+            f'--user-data-dir={self.user_data_dir}',
+            '--no-first-run',
+            '--no-default-browser-check',
+            *LAUNCH_ARGS,
+        ]
+        if self.headless:
+            args.append('--headless=new')
+        args.append('about:blank')
+        self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + self.STARTUP_TIMEOUT_SECONDS
+        while time.monotonic() < deadline:
+            if self.is_healthy():
+                print(f"Browser service started (pid {self.process.pid}) at {self.endpoint}")
+                return self.endpoint
+            if self.process.poll() is not None:
+                break
+            time.sleep(0.2)
+        self.stop()
+        raise Exception(f"Browser service did not start on port {self.port}")
+
+    def is_healthy(self):
+        """True if the process is alive and the CDP endpoint responds."""
+        if self.process is None or self.process.poll() is not None:
+            return False
+        try:
+            with urllib.request.urlopen(f'{self.endpoint}/json/version', timeout=2) as resp:
+                return resp.status == 200
+        except Exception:
+            return False
+
+    def ensure_running(self, executable_path=None):
+        """Start the browser, or restart it if it has crashed. Returns the CDP endpoint."""
+        with self._lock:
+            if self.is_healthy():
+                return self.endpoint
+            if self.process is not None:
+                print(f"Browser service unhealthy (exit code {self.process.poll()}), restarting...")
+                self.stop()
+                self.restarts += 1
+            return self.start(executable_path or self.executable_path)
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+        if self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+            self.user_data_dir = None
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_browser_service(headless=True):
+    """Process-wide BrowserService (created on first use, stopped at exit)."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = BrowserService(headless=headless)
+            atexit.register(_service.stop)
+        return _service
+
+
+@contextmanager
+def scraper_browser(headless=True, watchdog=None):
+    """Yield a Browser: the shared one if configured, else a freshly launched Chromium.
+
+    Closing a browser obtained over CDP only disconnects (and drops our contexts); the shared
+    process keeps running for the next scrape. `watchdog` (an RssWatchdog) samples the memory of
+    a freshly launched browser until it is closed; a shared one is not measured.
+    """
+    with _browser(headless) as (browser, launched):
+        if watchdog:
+            watchdog.start(browser_pid(browser) if launched else None)
+        try:
+            yield browser
+        finally:
+            if watchdog:
+                watchdog.stop()
+
+
+def _in_sandbox():
+    """True inside a sandboxed scrape process (sandbox.py), whose process group is killed afterwards."""
+    return os.getenv('SCRAPE_SANDBOX_CHILD') == '1'
+
+
+@contextmanager
+def _browser(headless):
+    """Yield (browser, launched): launched is True for a private Chromium started for this scrape."""
+    with sync_playwright() as p:
+        browser = None
+        endpoint = BROWSER_CDP_ENDPOINT
+        try:
+            if not endpoint and SHARED_BROWSER:
+                if _in_sandbox():
+                    # A service started here would be killed with the sandbox after one scrape
+                    print("SHARED_BROWSER needs BROWSER_CDP_ENDPOINT when scrapes are sandboxed "
+                          "(run `python -m scrapers.browser`); launching a private browser")
+                else:
+                    endpoint = get_browser_service(headless).ensure_running(p.chromium.executable_path)
+            if endpoint:
+                browser = p.chromium.connect_over_cdp(endpoint)
+        except Exception as e:
+            print(f"Could not use shared browser ({e}); launching a private one")
+        launched = browser is None
+        if launched:
+            browser = p.chromium.launch(headless=headless, args=LAUNCH_ARGS)
+        try:
+            yield browser, launched
+        finally:
+            browser.close()
+
+
+def new_scraper_context(browser, extra_http_headers=None, request_policy=None, recording=None, **options):
+    """Create an isolated context with the desktop UA, en-GB locale and webdriver flag hidden.
+
+    Requests are routed through `request_policy` (default: a RequestPolicy with no allowlist), so
+    images, fonts, media and trackers are never fetched. `recording` is the facility name its
+    traffic is recorded under or replayed from when SCRAPER_HAR_MODE is set (see scrapers/har.py).
+    """
+    headers = dict(DEFAULT_HEADERS)
+    headers.update(extra_http_headers or {})
+    settings = {
+        'user_agent': USER_AGENT,
+        'viewport': VIEWPORT,
+        'locale': 'en-GB',
+        'timezone_id': 'Europe/London',
+        'extra_http_headers': headers,
+    }
+    settings.update(options)
+    if recording:
+        settings.update(har_context_options(recording))
+    context = browser.new_context(**settings)
+    context.add_init_script(HIDE_WEBDRIVER_SCRIPT)
+    if recording:
+        attach_har(context, recording)  # Routed first, so the request policy (routed last) runs before it
+    (request_policy or RequestPolicy()).attach(context)
+    return context
+
+
+if __name__ == '__main__':
+    # Run the shared browser as its own process; point scrapers at it with BROWSER_CDP_ENDPOINT.
+    with sync_playwright() as p:
+        chromium_path = p.chromium.executable_path
+    service = BrowserService(headless=os.getenv('BROWSER_HEADLESS', 'true').lower() == 'true')
+    print(f"BROWSER_CDP_ENDPOINT={service.ensure_running(chromium_path)}")
+    try:
+        while True:
+            time.sleep(int(os.getenv('BROWSER_HEALTH_CHECK_SECONDS', '30')))
+            service.ensure_running()
+    except KeyboardInterrupt:
+        service.stop()
@@ -0,0 +1,66 @@
+"""Which dates a scrape covers, so a scrape can refresh part of a facility's booking window.
+
+Each scraper has a booking window (today plus N-1 days). A ScrapeRange narrows that window to
+start..end; only those dates are scraped, and only their stored rows are replaced.
+"""
+from datetime import datetime, date, timedelta
+
+
+def as_date(value):
+    """A date from a date, datetime or 'YYYY-MM-DD' string (None stays None)."""
+    if value is None or isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+class ScrapeRange:
+    """The dates of a `window_days` booking window from today that fall within start..end."""
+
+    def __init__(self, window_days, start_date=None, end_date=None, today=None):
+        self.today = today or datetime.now().date()
+        window = [self.today + timedelta(days=i) for i in range(window_days)]
+        start, end = as_date(start_date), as_date(end_date)
+        self.dates = [d for d in window if (start is None or d >= start) and (end is None or d <= end)]
+        self.partial = len(self.dates) < len(window)
+        self.date_strs = {d.strftime('%Y-%m-%d') for d in self.dates}
+        self.read = set()
+
+    @property
+    def day_offsets(self):
+        """Days from today of each date (0 = today), for scrapers that step through date tabs."""
+        return [(d - self.today).days for d in self.dates]
+
+    def rows(self, availability):
+        """The availability rows dated inside the range."""
+        if not self.partial:
+            return availability
+        return [slot for slot in availability if slot['date'] in self.date_strs]
+
+    def scope(self, query, date_column):
+        """Narrow a query over stored rows to the range's dates (whole facility if not partial)."""
+        if not self.partial:
+            return query
+        return query.filter(date_column.in_(sorted(self.date_strs)))
+
+    def mark_read(self, day):
+        """Record that the scraper read `day` (a date or 'YYYY-MM-DD'), even if it had no slots."""
+        self.read.add(day if isinstance(day, str) else day.strftime('%Y-%m-%d'))
+
+    def keep_read(self):
+        """Narrow the range to the dates marked read, before storing.
+
+        Dates that were never read (a failed or missing day, or a scrape that stopped early) then keep
+        their stored rows and aren't counted as fresh.
+        """
+        if self.read >= self.date_strs:
+            return
+        self.dates = [d for d in self.dates if d.strftime('%Y-%m-%d') in self.read]
+        self.date_strs = {d.strftime('%Y-%m-%d') for d in self.dates}
+        self.partial = True
+
+    def __str__(self):
+        if not self.dates:
+            return 'no dates'
+        return f"{self.dates[0]}..{self.dates[-1]} ({len(self.dates)} days{', partial' if self.partial else ''})"
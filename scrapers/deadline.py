@@ -0,0 +1,48 @@
+"""Time budget for one scrape, shared by every navigation and wait in it.
+
+ScraperManager.scrape_facility gives each scrape a Deadline (SCRAPE_DEADLINE_SECONDS). A step asks
+for its usual timeout and gets whatever is left of the budget if that is less. Once the budget is
+spent the next wait raises DeadlineExceeded, and day loops stop and store the days they already
+extracted, so one stuck site cannot hold up the scrapes queued behind it.
+"""
+import time
+
+
+class DeadlineExceeded(Exception):
+    """The scrape's time budget ran out."""
+
+
+class Deadline:
+    """The monotonic time a scrape must finish by (no limit if `seconds` is None)."""
+
+    def __init__(self, seconds=None):
+        self.seconds = seconds
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self):
+        """Seconds left, never negative (None if there is no limit)."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check(self, step=None):
+        """Raise DeadlineExceeded if the budget is spent."""
+        if self.expired:
+            raise DeadlineExceeded(f"Scrape deadline of {self.seconds:g}s passed"
+                                   + (f" before '{step}'" if step else ''))
+
+    def ms(self, timeout_ms, step=None):
+        """`timeout_ms` capped to the time left; raises DeadlineExceeded if none is left."""
+        self.check(step)
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout_ms
+        return max(1, min(timeout_ms, int(remaining * 1000)))  # Playwright reads 0 as no timeout
+
+    def __str__(self):
+        remaining = self.remaining()
+        return 'no deadline' if remaining is None else f"{remaining:.0f}s of {self.seconds:.0f}s left"
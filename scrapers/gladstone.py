@@ -0,0 +1,163 @@
+"""GladstoneGo (One Leisure) timetable data from the JSON the booking SPA fetches.
+
+The SPA asks its API for each date's sessions while the timetable is open. Those responses are
+captured and parsed, and once one is seen the same endpoint is called directly for the other
+dates, so the virtualised grid never has to be scrolled into view.
+"""
+import os
+import re
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapers.payloads import JsonResponseCapture, normalized, first_value, parse_when, walk_objects
+
+COURT_NAME = re.compile(r'\bCourt\s+(\d+)\b', re.I)
+
+# Timetable slot card text: "Court N", "HH:MM - HH:MM", "Thu 5th Feb", then its status
+MONTH_NAMES = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+CARD_DATE = re.compile(
+    r'(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun)\s+(\d+)(?:st|nd|rd|th)?\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\b', re.I)
+CARD_DATE_NO_WEEKDAY = re.compile(r'\b(\d+)(?:st|nd|rd|th)?\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\b', re.I)
+CARD_COURT = re.compile(r'Court\s+(\d+)', re.I)
+CARD_TIME_RANGE = re.compile(r'(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})')
+CARD_BOOKABLE = re.compile(r'\bBook\s+now|\bBook\b|\bAvailable\b', re.I)  # Not the 'available' in 'unavailable'
+CARD_BOOKABLE_LATER = re.compile(r'available to be booked on', re.I)
+CARD_UNAVAILABLE = re.compile(r'unavailable|available to be booked on|This slot is', re.I)
+
+# Keys seen on session objects, compared lower-case with '_' removed
+START_KEYS = ('starttime', 'startdatetime', 'startsat', 'start', 'from')
+END_KEYS = ('endtime', 'enddatetime', 'endsat', 'end', 'to')
+AVAILABLE_KEYS = ('isavailable', 'available', 'bookable', 'isbookable', 'canbook', 'availableslots',
+                  'spacesavailable', 'availablespaces', 'remaining')
+STATUS_KEYS = ('status', 'availabilitystatus', 'state')
+UNAVAILABLE_STATUS = re.compile(r'unavailable|booked|full|closed|not\s*bookable', re.I)
+AVAILABLE_STATUS = re.compile(r'available|bookable|open', re.I)
+
+
+def _court(raw):
+    """'Court N' from any string field of the object (or of an object nested one level down)."""
+    values = list(raw.values())
+    values += [v for nested in raw.values() if isinstance(nested, dict) for v in nested.values()]
+    for value in values:
+        if isinstance(value, str):
+            m = COURT_NAME.search(value)
+            if m:
+                return f"Court {m.group(1)}"
+    return None
+
+
+def _is_available(record):
+    """True/False from an availability flag, count or status text; None if the object has none."""
+    flag = first_value(record, AVAILABLE_KEYS)
+    if isinstance(flag, bool):
+        return flag
+    if isinstance(flag, (int, float)):
+        return flag > 0
+    if isinstance(flag, str) and flag.strip().isdigit():
+        return int(flag) > 0
+    status = first_value(record, STATUS_KEYS)
+    if isinstance(status, str):
+        if UNAVAILABLE_STATUS.search(status):
+            return False
+        if AVAILABLE_STATUS.search(status):
+            return True
+    return None
+
+
+def parse_availability_payload(payload):
+    """Court slot rows from a GladstoneGo availability payload, whatever its nesting.
+
+    Any object naming a court with a start time and an availability flag/status is a slot.
+    Rows whose date isn't in the payload get date None.
+    """
+    availability = []
+    seen = set()
+    for raw in walk_objects(payload):
+        record = normalized(raw)
+        day, start_time = parse_when(first_value(record, START_KEYS))
+        end_time = parse_when(first_value(record, END_KEYS))[1]
+        if start_time is None or end_time is None:
+            continue
+        court = _court(raw)
+        is_available = _is_available(record)
+        if court is None or is_available is None:
+            continue
+        key = (day, court, start_time)
+        if key in seen:
+            continue
+        seen.add(key)
+        availability.append({
+            'date': day.strftime('%Y-%m-%d') if day else None,
+            'day_name': day.strftime('%A') if day else None,
+            'start_time': start_time,
+            'end_time': end_time,
+            'court_number': court,
+            'is_available': is_available,
+        })
+    return availability
+
+
+def parse_card_date(text, target_date=None):
+    """('YYYY-MM-DD', day name) from 'Thu 5th Feb' or '5th Feb' in a card's text, else (None, None).
+
+    The year is target_date's (this year without one), or the next year for a January card
+    read in December.
+    """
+    m = CARD_DATE.search(text) or CARD_DATE_NO_WEEKDAY.search(text)
+    if not m:
+        return None, None
+    month = MONTH_NAMES[m.group(2).lower()[:3]]
+    year = target_date.year if target_date else datetime.now().year
+    if month == 1 and target_date and target_date.month == 12:
+        year = target_date.year + 1
+    try:
+        d = datetime(year, month, int(m.group(1))).date()
+    except ValueError:
+        return None, None
+    return d.strftime('%Y-%m-%d'), d.strftime('%A')
+
+
+def parse_court_cards(texts, date_str, day_name, target_date=None):
+    """Court slot rows from timetable card texts, one per date/court/start time.
+
+    A card's own date ('Thu 5th Feb') wins over date_str, so a calendar click that didn't take
+    still files the slots under the right day. "Book now" is bookable; "unavailable" and
+    "available to be booked on ..." are not.
+    """
+    slots = []
+    seen = set()
+    for text in texts:
+        court_m = CARD_COURT.search(text)
+        time_m = CARD_TIME_RANGE.search(text)
+        if not court_m or not time_m:
+            continue
+        slot_date_str, slot_day_name = parse_card_date(text, target_date)
+        if slot_date_str is None:
+            slot_date_str, slot_day_name = date_str, day_name
+        court_label = f"Court {court_m.group(1)}"
+        start_time = f"{int(time_m.group(1)):02d}:{time_m.group(2)}"
+        key = (slot_date_str, court_label, start_time)
+        if key in seen:
+            continue
+        seen.add(key)
+        bookable = bool(CARD_BOOKABLE.search(text)) and not CARD_BOOKABLE_LATER.search(text)
+        slots.append({
+            'date': slot_date_str,
+            'day_name': slot_day_name,
+            'start_time': start_time,
+            'end_time': f"{int(time_m.group(3)):02d}:{time_m.group(4)}",
+            'court_number': court_label,
+            'is_available': bookable or not CARD_UNAVAILABLE.search(text),
+        })
+    return slots
+
+
+class AvailabilityCapture(JsonResponseCapture):
+    """GladstoneGo availability JSON seen by a page (see JsonResponseCapture)."""
+
+    def __init__(self, page):
+        super().__init__(page, 'gladstonego', parse_availability_payload)
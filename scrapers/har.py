@@ -0,0 +1,96 @@
+"""HAR record/replay: run the scrapers end to end against recorded traffic instead of the live sites.
+
+SCRAPER_HAR_MODE=record saves each scrape's browser traffic to SCRAPER_HAR_DIR/<facility>.har
+(written when the browser context closes). SCRAPER_HAR_MODE=replay serves every request from that
+file with Playwright's route_from_har; anything that was not recorded is aborted, so nothing
+reaches the network. During replay the scrape's dates and the page's clock are moved back to the
+time of the recording, so date tabs and timetable requests ask for the recorded dates.
+
+Requests made outside the browser (Legend HTTP mode, One Leisure's page.request calls) are not in
+a HAR, so scrapers skip them in both modes (see BROWSER_ONLY).
+
+Recordings contain the login form post and session cookies: they are kept out of git
+(recordings/ is ignored) and should not be shared.
+"""
+import os
+import re
+import json
+from datetime import datetime
+from functools import lru_cache
+
+SCRAPER_HAR_MODE = os.getenv('SCRAPER_HAR_MODE', 'off').lower()  # off, record or replay
+SCRAPER_HAR_DIR = os.getenv('SCRAPER_HAR_DIR') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'recordings')
+# Only browser traffic is recorded, so scrapers must not fetch anything behind the browser's back
+BROWSER_ONLY = SCRAPER_HAR_MODE in ('record', 'replay')
+
+# Runs before any page script: Date (and Date.now) run `shift` ms behind/ahead of the real clock
+SHIFT_CLOCK_JS = """
+(shift => {
+    const RealDate = Date;
+    class ShiftedDate extends RealDate {
+        constructor(...args) {
+            if (args.length === 0) { super(RealDate.now() + shift); } else { super(...args); }
+        }
+        static now() { return RealDate.now() + shift; }
+    }
+    globalThis.Date = ShiftedDate;
+})(%d);
+"""
+
+
+def har_path(facility_name):
+    """Where the facility's recording is kept, e.g. recordings/hill_roads_sport_and_tennis_centre.har."""
+    slug = re.sub(r'[^a-z0-9]+', '_', facility_name.lower()).strip('_')
+    return os.path.join(SCRAPER_HAR_DIR, f'{slug}.har')
+
+
+@lru_cache(maxsize=None)
+def _recorded_at(path, mtime):
+    with open(path) as f:
+        log = json.load(f).get('log', {})
+    started = [item['startedDateTime'] for item in log.get('pages', []) + log.get('entries', [])
+               if item.get('startedDateTime')]
+    if not started:
+        return None
+    first = min(started).replace('Z', '+00:00')
+    return datetime.fromisoformat(first).astimezone().replace(tzinfo=None)  # Local time, naive
+
+
+def recorded_at(facility_name):
+    """Local time the facility's recording started, or None if there is no usable recording."""
+    path = har_path(facility_name)
+    if not os.path.exists(path):
+        return None
+    return _recorded_at(path, os.path.getmtime(path))
+
+
+def replay_today(facility_name):
+    """The recording's date when replaying (the scrape's 'today'), else None (the real today)."""
+    if SCRAPER_HAR_MODE != 'replay':
+        return None
+    started = recorded_at(facility_name)
+    return started.date() if started else None
+
+
+def har_context_options(facility_name):
+    """Extra browser.new_context options: in record mode, where to write the HAR."""
+    if SCRAPER_HAR_MODE != 'record':
+        return {}
+    os.makedirs(SCRAPER_HAR_DIR, exist_ok=True)
+    print(f"Recording browser traffic to {har_path(facility_name)}")
+    return {'record_har_path': har_path(facility_name)}
+
+
+def attach_har(context, facility_name):
+    """In replay mode, serve the context's requests from the recording and shift its clock."""
+    if SCRAPER_HAR_MODE != 'replay':
+        return
+    path = har_path(facility_name)
+    started = recorded_at(facility_name)
+    if started is None:
+        raise Exception(f"No recording for {facility_name} at {path}; make one with SCRAPER_HAR_MODE=record")
+    context.route_from_har(path, not_found='abort')
+    shift_ms = int((started - datetime.now()).total_seconds() * 1000)
+    context.add_init_script(SHIFT_CLOCK_JS % shift_ms)
+    print(f"Replaying {path} (recorded {started:%Y-%m-%d %H:%M})")
@@ -1,16 +1,30 @@
 """Scraper for Hill Roads Sport and Tennis Centre badminton court availability."""
 import os
-import time
 import re
 from datetime import datetime, timedelta
 from urllib.parse import urljoin
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from dotenv import load_dotenv
 import sys
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import init_db, get_session, Facility, CourtAvailability
+from database import init_db, get_session, Facility
+from scrapers.browser import scraper_browser, new_scraper_context
+from scrapers.sessions import LoginSessionStore
+from scrapers.waits import Waiter
+from scrapers.resolver import SelectorResolver
+from scrapers.routing import RequestPolicy
+from scrapers.date_range import ScrapeRange
+from scrapers.storage import store_availability
+from scrapers.har import replay_today
+from scrapers.deadline import Deadline, DeadlineExceeded
+from scrapers.run_log import RunLog
+from scrapers.memory import RssWatchdog
+from scrapers.artifacts import DebugArtifacts
+from scrapers.legend import SLOT_TIME_TEXT_SELECTOR, TimetableCapture, extract_slot_cards, badminton_cards, parse_slot_cards
+from scrapers.payloads import TimetableEndpoint, fill_missing_dates
+from scrapers.legend_http import LEGEND_HTTP_MODE, fetch_timetable_days
 
 load_dotenv()
 
@@ -19,6 +33,9 @@ class HillRoadsScraper:
     """Scraper for Hill Roads Sport and Tennis Centre badminton courts."""
     
     BASE_URL = "https://hillsroad.legendonlineservices.co.uk/enterprise/account/login"
+    WINDOW_DAYS = 5  # Date tabs to scrape (today onwards)
+    # URL substrings the booking flow needs even though the request policy would block them
+    REQUEST_ALLOWLIST = ()
     
     def __init__(self, headless=True):
         self.headless = headless if headless is not None else True
@@ -39,49 +56,74 @@ class HillRoadsScraper:
             self.session.commit()
         return facility
     
-    def scrape(self):
-        """Main scraping method."""
+    def scrape(self, start_date=None, end_date=None, deadline=None):
+        """Main scraping method. start_date/end_date narrow the scrape to part of the booking window.
+
+        If the deadline passes while days are being read, the days read so far are stored.
+        """
         print("Starting Hill Roads Sport and Tennis Centre scraper...")
+        self.range = ScrapeRange(self.WINDOW_DAYS, start_date, end_date, today=replay_today(self.facility.name))
+        self.deadline = deadline or Deadline()
+        self.stopped_early = False
+        self.run_log = RunLog()
+        self.memory = RssWatchdog(self.run_log)
+        print(f"Dates: {self.range} ({self.deadline})")
+        if not self.range.dates:
+            self.session.close()
+            return
         
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=self.headless,
-                args=['--disable-blink-features=AutomationControlled']
-            )
-            context = browser.new_context(
-                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                viewport={'width': 1920, 'height': 1080},
-                locale='en-GB',
-                timezone_id='Europe/London',
-                extra_http_headers={
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'Accept-Language': 'en-GB,en;q=0.9',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1'
-                }
-            )
-            # Hide webdriver flag
+        login_store = LoginSessionStore(self.session, self.BASE_URL)
+        saved_login = login_store.load()
+        # With a saved login and a known timetable endpoint, no browser is needed at all
+        endpoint = TimetableEndpoint.load(self.session, self.BASE_URL) if LEGEND_HTTP_MODE else None
+        if endpoint and saved_login and self._scrape_over_http(saved_login, endpoint):
+            self.session.close()
+            return
+        with scraper_browser(self.headless, watchdog=self.memory) as browser:
+            self.requests = RequestPolicy(self.REQUEST_ALLOWLIST)
+            context = new_scraper_context(browser, request_policy=self.requests, recording=self.facility.name, storage_state=saved_login, extra_http_headers={
+                'Accept-Encoding': 'gzip, deflate, br',
+                'Connection': 'keep-alive',
+                'Upgrade-Insecure-Requests': '1'
+            })
             page = context.new_page()
-            page.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            self.artifacts = DebugArtifacts(self.facility.name)
+            self.artifacts.attach(context)
+            self.waits = Waiter(page, deadline=self.deadline)
+            self.capture = TimetableCapture(page)
+            self.selectors = SelectorResolver(self.session, self.facility.name, deadline=self.deadline)
             
             try:
-                # Step 1: Navigate to homepage/login
-                print(f"Navigating to {self.BASE_URL}...")
-                page.goto(self.BASE_URL, wait_until='networkidle')
-                time.sleep(2)
-                
-                # Step 2: Login
-                print("Attempting to log in...")
-                self._login(page)
+                # Step 1-2: Reuse the saved login if it is still valid, else navigate to login and log in
+                logged_in_fresh = False
+                if saved_login:
+                    self.run_log.begin('login', 'saved login')
+                if saved_login and login_store.is_logged_in(page, self.deadline):
+                    print(f"Reusing saved login session, at {page.url}")
+                else:
+                    self.run_log.begin('login')
+                    print(f"Navigating to {self.BASE_URL}...")
+                    page.goto(self.BASE_URL, wait_until='domcontentloaded', timeout=self.deadline.ms(30000, 'login page'))
+                    
+                    print("Attempting to log in...")
+                    self._login(page)
+                    login_store.save(context, page)
+                    logged_in_fresh = True
+
+                if endpoint:
+                    # Saved cookies already failed over HTTP; a fresh login gets one try before relearning
+                    if logged_in_fresh and self._scrape_over_http(context.storage_state(), endpoint):
+                        return
+                    TimetableEndpoint.forget(self.session, self.BASE_URL)
+                    endpoint = None
                 
                 # Step 3: Click "make a booking"
+                self.run_log.begin('navigation', 'timetable')
                 print("Looking for 'make a booking' button...")
                 print(f"Current URL before 'make a booking': {page.url}")
                 print(f"Current page title: {page.title()}")
                 
-                # Take screenshot before looking for button
-                page.screenshot(path='debug_before_make_booking.png')
+                self.artifacts.checkpoint(page, 'before make booking')
                 
                 # Look for the "Make a Booking" link in the main content area (not sidebar)
                 # Based on debug: it's a link (not a button) - Link 7 and Link 24 both say "Make a Booking"
@@ -92,48 +134,37 @@ class HillRoadsScraper:
                     'text="Make a Booking" i',  # Case-insensitive text match
                     'text="make a booking" i'
                 ]
-                make_booking = None
+                selector, matches = self.selectors.resolve(
+                    'make a booking', [(sel, page.locator(sel)) for sel in make_booking_selectors], timeout_ms=10000)
                 clicked = False
-                for selector in make_booking_selectors:
-                    try:
-                        # Get all matches (there might be 2 - sidebar and main content)
-                        all_matches = page.locator(selector).all()
-                        print(f"Found {len(all_matches)} matches for selector: {selector}")
-                        
-                        # Try the second match first (index 1) as it's likely the main content one
-                        # If that doesn't work, try the first one
-                        matches_to_try = [1, 0] if len(all_matches) > 1 else [0]
-                        
-                        for match_idx in matches_to_try:
-                            if match_idx >= len(all_matches):
-                                continue
+                if matches:
+                    # Get all matches (there might be 2 - sidebar and main content)
+                    all_matches = matches.all()
+                    print(f"Found {len(all_matches)} matches for selector: {selector}")
+                    
+                    # Try the second match first (index 1) as it's likely the main content one
+                    # If that doesn't work, try the first one
+                    matches_to_try = [1, 0] if len(all_matches) > 1 else [0]
+                    for match_idx in matches_to_try:
+                        make_booking = all_matches[match_idx]
+                        print(f"Found 'make a booking' element (match {match_idx}) using: {selector}")
+                        # Try to click and wait for navigation
+                        try:
+                            with page.expect_navigation(timeout=self.deadline.ms(10000), wait_until='networkidle'):
+                                make_booking.click()
+                            clicked = True
+                            print(f"Clicked 'make a booking' using: {selector}")
+                            break
+                        except Exception:
                             try:
-                                match = all_matches[match_idx]
-                                if match.is_visible(timeout=2000):
-                                    make_booking = match
-                                    print(f"Found 'make a booking' element (match {match_idx}) using: {selector}")
-                                    # Try to click and wait for navigation
-                                    try:
-                                        with page.expect_navigation(timeout=10000, wait_until='networkidle'):
-                                            make_booking.click()
-                                        clicked = True
-                                        print(f"Clicked 'make a booking' using: {selector}")
-                                        break
-                                    except:
-                                        # No navigation, just click
-                                        make_booking.click()
-                                        page.wait_for_load_state('networkidle', timeout=10000)
-                                        clicked = True
-                                        print(f"Clicked 'make a booking' using: {selector} (no navigation)")
-                                        break
-                            except:
+                                # No navigation, just click
+                                make_booking.click()
+                                self.waits.settled('make a booking (in-page)', timeout_ms=10000)
+                                clicked = True
+                                print(f"Clicked 'make a booking' using: {selector} (no navigation)")
+                                break
+                            except Exception:
                                 continue
-                        
-                        if clicked:
-                            break
-                    except Exception as e:
-                        print(f"Selector {selector} failed: {str(e)[:100]}")
-                        continue
                 
                 if not clicked:
                     # Debug: show what buttons are on the page
@@ -158,29 +189,20 @@ class HillRoadsScraper:
                         except:
                             pass
                     
-                    page.screenshot(path='debug_no_make_booking.png')
                     raise Exception("Could not find 'make a booking' button")
                 
-                time.sleep(3)
                 print(f"Current URL after 'make a booking': {page.url}")
                 print(f"Page title after 'make a booking': {page.title()}")
                 
-                # Step 4: Wait for booking page to load (AJAX content)
-                print("Waiting for booking page content to load...")
-                time.sleep(3)
-                page.wait_for_load_state('networkidle', timeout=30000)
-                
-                # Wait for booking form elements to appear (radio buttons or form)
+                # Step 4: Wait for booking form elements to appear (AJAX content: radio buttons)
                 print("Waiting for booking form to appear...")
-                try:
-                    # Wait for radio buttons or form to appear
-                    page.wait_for_selector('input[type="radio"], form, [class*="booking"], [id*="booking"]', timeout=15000)
+                if self.waits.selector('input[type="radio"]', step='booking form radios', timeout_ms=30000):
                     print("Booking form elements detected")
-                except:
+                else:
                     print("Warning: Booking form elements not detected, continuing anyway...")
                 
                 print(f"After 'Make Bookings', URL: {page.url}, Title: {page.title()}")
-                page.screenshot(path='debug_after_make_bookings.png')
+                self.artifacts.checkpoint(page, 'after make bookings')
                 
                 # Step 5: Click "sports hall" radio button
                 print("Clicking 'sports hall' radio button...")
@@ -192,18 +214,12 @@ class HillRoadsScraper:
                     'input[type="radio"]:near(label:has-text("sports hall"))',
                     'input[type="radio"]:near(label:has-text("Sports Hall"))'
                 ]
-                sports_hall_radio = None
-                for selector in sports_hall_selectors:
-                    try:
-                        sports_hall_radio = page.locator(selector).first
-                        if sports_hall_radio.is_visible(timeout=10000):
-                            sports_hall_radio.click()
-                            print(f"Clicked 'sports hall' using: {selector}")
-                            break
-                    except Exception as e:
-                        print(f"Selector {selector} failed: {e}")
-                        continue
-                if not sports_hall_radio:
+                selector, sports_hall_radio = self.selectors.resolve(
+                    'sports hall radio', [(sel, page.locator(sel)) for sel in sports_hall_selectors], timeout_ms=10000)
+                if sports_hall_radio:
+                    sports_hall_radio.first.click()
+                    print(f"Clicked 'sports hall' using: {selector}")
+                else:
                     # Debug: show all radio buttons
                     all_radios = page.locator('input[type="radio"]').all()
                     print(f"Found {len(all_radios)} radio buttons on page:")
@@ -214,53 +230,33 @@ class HillRoadsScraper:
                             print(f"  {i+1}: value={value}, label={label}")
                         except:
                             pass
-                    page.screenshot(path='debug_no_sports_hall.png')
                     raise Exception("Could not find 'sports hall' radio button")
-                time.sleep(3)
                 print("Sports hall radio clicked, waiting for activities to load...")
+                self.waits.selector('input[type="checkbox"]', step='activity checkboxes', timeout_ms=15000)
                 
                 # Step 6: Click badminton checkbox (click the LABEL so the checkbox toggles regardless of HTML structure)
                 print("Clicking badminton checkbox...")
+                # Prefer the checkbox by accessible name, else click the LABEL so the checkbox toggles
+                # regardless of HTML structure (<label><input>Badminton or <input id><label for>Badminton)
+                candidate, badminton = self.selectors.resolve('badminton checkbox', [
+                    ('checkbox role', page.get_by_role("checkbox", name="Badminton")),
+                    ('label', page.locator('label:has-text("Badminton")')),
+                    ('checkbox value', page.locator('input[type="checkbox"][value*="badminton" i]')),
+                ], timeout_ms=5000)
                 badminton_clicked = False
-                # Prefer clicking the label containing "Badminton" - works for both <label><input>Badminton and <input id><label for>Badminton
-                for label_text in ["Badminton", "badminton"]:
-                    try:
-                        label_el = page.get_by_role("checkbox", name=label_text)
-                        if label_el.is_visible(timeout=3000):
-                            label_el.check()
-                            badminton_clicked = True
-                            print(f"Checked badminton via get_by_role(checkbox, name={label_text!r})")
-                            break
-                    except Exception as e:
-                        print(f"get_by_role(checkbox, name={label_text!r}): {e}")
-                if not badminton_clicked:
+                if badminton:
                     try:
-                        label_el = page.locator('label:has-text("Badminton")').first
-                        if label_el.is_visible(timeout=3000):
-                            label_el.click()
-                            badminton_clicked = True
-                            print("Checked badminton by clicking label:has-text('Badminton')")
+                        if candidate == 'label':
+                            badminton.first.click()
+                        else:
+                            badminton.first.check()
+                        badminton_clicked = True
+                        print(f"Checked badminton via {candidate}")
                     except Exception as e:
-                        print(f"label click: {e}")
-                if not badminton_clicked:
-                    # Fallback: click checkbox by value or nearby label
-                    for selector in [
-                        'input[type="checkbox"][value*="badminton" i]',
-                        'input[type="checkbox"][value*="Badminton"]',
-                    ]:
-                        try:
-                            cb = page.locator(selector).first
-                            if cb.is_visible(timeout=3000):
-                                cb.check()
-                                badminton_clicked = True
-                                print(f"Checked badminton via selector: {selector}")
-                                break
-                        except Exception as e:
-                            print(f"Selector {selector}: {e}")
+                        print(f"Badminton {candidate}: {e}")
                 if not badminton_clicked:
                     raise Exception("Could not find or check badminton checkbox")
-                time.sleep(2)
-                page.wait_for_load_state('networkidle', timeout=15000)
+                self.waits.settled('after badminton checkbox', timeout_ms=15000)
                 print("Badminton checkbox clicked, waiting for timetable to load...")
                 
                 # Verify badminton is actually selected (find checkbox again for verification)
@@ -272,7 +268,7 @@ class HillRoadsScraper:
                     print("Could not verify if badminton is checked")
                 
                 print(f"Current URL after badminton: {page.url}")
-                page.screenshot(path='debug_after_badminton.png')
+                self.artifacts.checkpoint(page, 'after badminton')
                 
                 # Look for time slot elements - they might be in a different structure
                 time_slots = page.locator('[class*="time"], [class*="hour"], [class*="slot"]').all()
@@ -286,58 +282,30 @@ class HillRoadsScraper:
                 
                 # Step 7: Click "View Timetable" button (bottom right)
                 print("Clicking 'View Timetable'...")
-                page.screenshot(path='debug_before_timetable.png')
+                self.artifacts.checkpoint(page, 'before timetable')
                 
-                view_timetable_clicked = False
                 # Prefer role-based and exact text so we hit the green button, not a menu item
-                view_timetable_candidates = [
-                    ('role', 'button', 'View Timetable'),
-                    ('role', 'link', 'View Timetable'),
-                    ('text', None, 'View Timetable'),
-                ]
-                for kind, role_or_none, name in view_timetable_candidates:
+                candidate, view_timetable = self.selectors.resolve('view timetable', [
+                    ('role button', page.get_by_role('button', name='View Timetable')),
+                    ('role link', page.get_by_role('link', name='View Timetable')),
+                    ('exact text', page.get_by_text('View Timetable', exact=True)),
+                    ('button', page.locator('button:has-text("View Timetable")')),
+                    ('link', page.locator('a:has-text("View Timetable")')),
+                    ('submit', page.locator('input[type="submit"][value*="View Timetable" i]')),
+                    ('timetable element', page.locator('[class*="timetable"]:has-text("View Timetable")')),
+                ], timeout_ms=10000)
+                view_timetable_clicked = False
+                if view_timetable:
                     try:
-                        if kind == 'role' and role_or_none:
-                            btn = page.get_by_role(role_or_none, name=name)
-                        else:
-                            btn = page.get_by_text(name, exact=True)
-                        if btn.is_visible(timeout=3000):
-                            url_before = page.url
-                            btn.click()
-                            # Wait for either URL change or network idle (timetable may load in-page)
-                            try:
-                                page.wait_for_url(lambda u: u != url_before, timeout=8000)
-                            except Exception:
-                                page.wait_for_load_state('networkidle', timeout=8000)
-                            view_timetable_clicked = True
-                            print(f"Clicked 'View Timetable' (kind={kind}, name={name}), URL now: {page.url}")
-                            break
+                        url_before = page.url
+                        view_timetable.first.click()
+                        # Wait for either URL change or the page to settle (timetable may load in-page)
+                        if not self.waits.url_change(url_before, 'view timetable navigation', timeout_ms=8000):
+                            self.waits.settled('view timetable (in-page)', timeout_ms=8000)
+                        view_timetable_clicked = True
+                        print(f"Clicked 'View Timetable' ({candidate}), URL now: {page.url}")
                     except Exception as e:
-                        print(f"View Timetable candidate {kind}={name}: {e}")
-                        continue
-                if not view_timetable_clicked:
-                    timetable_selectors = [
-                        'button:has-text("View Timetable")',
-                        'a:has-text("View Timetable")',
-                        'input[type="submit"][value*="View Timetable" i]',
-                        '[class*="timetable"]:has-text("View Timetable")',
-                    ]
-                    for selector in timetable_selectors:
-                        try:
-                            view_timetable = page.locator(selector).first
-                            if view_timetable.is_visible(timeout=3000):
-                                url_before = page.url
-                                view_timetable.click()
-                                try:
-                                    page.wait_for_url(lambda u: u != url_before, timeout=8000)
-                                except Exception:
-                                    page.wait_for_load_state('networkidle', timeout=8000)
-                                view_timetable_clicked = True
-                                print(f"Clicked 'View Timetable' using: {selector}")
-                                break
-                        except Exception as e:
-                            print(f"Selector {selector}: {e}")
-                            continue
+                        print(f"View Timetable {candidate}: {e}")
                 if not view_timetable_clicked:
                     # Debug: show what buttons/links are on the page
                     print("DEBUG: Listing all clickable elements on page...")
@@ -361,52 +329,97 @@ class HillRoadsScraper:
                         except:
                             pass
                     
-                    page.screenshot(path='debug_no_timetable_button.png')
+                    self.artifacts.failure(page, 'no view timetable button')
                     print("Warning: 'view timetable' button not found - timetable may already be loaded")
                     # Don't raise - continue to try extracting timetable
-                page.wait_for_load_state('networkidle', timeout=30000)
-                time.sleep(3)
+                self.waits.selector(SLOT_TIME_TEXT_SELECTOR, step='timetable slots', timeout_ms=30000)
+                self.waits.settled('timetable rendered')
                 print(f"Current URL after 'view timetable': {page.url}")
-                page.screenshot(path='debug_after_timetable.png')
+                self.artifacts.checkpoint(page, 'after timetable')
                 
                 # Step 8: Scrape all available days (same pattern as Linton - all days in one run)
-                MAX_DAYS = 5
                 all_availability = []
                 date_tabs = self._get_date_tabs(page)
-                print(f"Found {len(date_tabs)} date tabs, scraping up to {MAX_DAYS} days...")
+                self.run_log.end()
+                print(f"Found {len(date_tabs)} date tabs, scraping {len(self.range.dates)} days...")
                 
-                for day_index in range(min(len(date_tabs), MAX_DAYS)):
+                for day_index in self.range.day_offsets:
+                    if self.deadline.expired:
+                        print("  Scrape deadline passed; keeping the days read so far")
+                        self.stopped_early = True
+                        break
+                    if self.memory.should_stop(page):
+                        self.stopped_early = True
+                        break
+                    if day_index >= len(date_tabs):
+                        print(f"  Day {day_index + 1}: no date tab, skipping")
+                        continue
                     tab = date_tabs[day_index]
+                    day = self.range.today + timedelta(days=day_index)
                     try:
-                        tab.click()
-                        time.sleep(2)
-                        page.wait_for_load_state('networkidle', timeout=15000)
-                        day_availability = self._extract_availability(page)
+                        with self.run_log.step('date', 'day', day.strftime('%Y-%m-%d')) as step:
+                            self.capture.clear()
+                            tab.click()
+                            self.waits.settled(f'day {day_index + 1} timetable', timeout_ms=15000)
+                            day_availability = self._day_availability(page)
+                            step['slots'] = len(day_availability)
                         all_availability.extend(day_availability)
+                        self.range.mark_read(day)
                         print(f"  Day {day_index + 1}: {len(day_availability)} slots")
                     except Exception as e:
                         print(f"  Day {day_index + 1} failed: {e}")
                         continue
                 
                 # Step 9: Store all days in database (once, like Linton)
+                self.range.keep_read()  # Days that failed or weren't reached keep their stored rows
                 print(f"Storing {len(all_availability)} availability records...")
-                self._store_availability(all_availability)
+                with self.run_log.step('storage') as step:
+                    step['slots'] = self._store_availability(all_availability)
+                if LEGEND_HTTP_MODE:
+                    TimetableEndpoint.learn(self.session, self.BASE_URL, self.capture)
                 
+                self.run_log.summary()
+                self.waits.summary()
+                self.requests.summary()
+                self.selectors.summary()
+                self.selectors.save()
                 print("Scraping completed successfully!")
                 
             except Exception as e:
                 print(f"Error during scraping: {e}")
-                page.screenshot(path='debug_hill_roads_error.png')
+                self.run_log.fail(e)
+                self.artifacts.failure(page, 'error', e)
+                if saved_login and not isinstance(e, DeadlineExceeded):
+                    login_store.clear()  # Don't reuse a session that may be the cause
                 raise
             finally:
-                browser.close()
+                self.artifacts.finish(context)
+                context.close()
                 self.session.close()
     
+    def _scrape_over_http(self, storage_state, endpoint):
+        """Fetch and store every day from the timetable endpoint; False if the browser is needed."""
+        print("Fetching timetable over HTTP...")
+        fetched = []
+        availability = fetch_timetable_days(storage_state, endpoint, self.range.dates, self.deadline, self.run_log,
+                                            fetched=fetched)
+        if availability is None:
+            return False
+        if self.deadline.expired:
+            self.stopped_early = True
+        for day in fetched:
+            self.range.mark_read(day)
+        self.range.keep_read()
+        with self.run_log.step('storage') as step:
+            step['slots'] = self._store_availability(availability)
+        print("Scraping completed successfully (HTTP)!")
+        return True
+
     def _login(self, page):
         """Handle login process."""
         # Wait for login form
-        page.wait_for_selector('input[type="email"], input[type="text"], input[type="password"]', timeout=30000)
-        time.sleep(2)
+        page.wait_for_selector('input[type="email"], input[type="text"], input[type="password"]',
+                               timeout=self.deadline.ms(30000, 'login form'))
         
         # Find and fill email
         email_selectors = [
@@ -430,15 +443,11 @@ class HillRoadsScraper:
         if not email_filled:
             raise Exception("Could not find email input field")
         
-        time.sleep(1)
-        
         # Find and fill password
         password_field = page.locator('input[type="password"]').first
         password_field.fill(self.password)
         print("Filled password")
         
-        time.sleep(1)
-        
         # Submit
         submit_selectors = [
             'button[type="submit"]',
@@ -448,6 +457,7 @@ class HillRoadsScraper:
         ]
         
         submitted = False
+        url_before = page.url
         for selector in submit_selectors:
             try:
                 submit_btn = page.locator(selector).first
@@ -463,15 +473,13 @@ class HillRoadsScraper:
             page.keyboard.press('Enter')
             print("Pressed Enter to submit")
         
-        time.sleep(5)  # Wait for login to complete
+        # Wait for login to complete: we leave the login page, then the account page settles
+        self.waits.url_change(url_before, 'login redirect', timeout_ms=30000)
+        self.waits.settled('post-login page', timeout_ms=30000)
         
         # Verify we're logged in - check URL or page content
         print(f"After login, current URL: {page.url}")
         print(f"After login, page title: {page.title()}")
-        
-        # Wait for page to fully load after login
-        page.wait_for_load_state('networkidle', timeout=30000)
-        time.sleep(2)
     
     def _get_date_tabs(self, page):
         """Return a list of date tab locators (TODAY, TOMORROW, then date links) in display order."""
@@ -509,7 +517,7 @@ class HillRoadsScraper:
 
     def _get_viewing_date(self, page):
         """Parse the currently selected date from the timetable (TODAY / TOMORROW / date text)."""
-        today = datetime.now().date()
+        today = self.range.today
         # Look for selected/highlighted date tab (TODAY, TOMORROW, or "07 FEB 2026")
         try:
             # Tab that is selected often has aria-selected or a class like "active"/"selected"
@@ -556,11 +564,18 @@ class HillRoadsScraper:
             print(f"Date detection warning: {e}")
         return today, today.strftime('%A')
 
+    def _day_availability(self, page):
+        """Slots for the day on screen: parsed from the timetable responses, else read from the DOM."""
+        availability = self.capture.availability()
+        if not availability:
+            return self._extract_availability(page)
+        if any(slot['date'] is None for slot in availability):
+            fill_missing_dates(availability, self._get_viewing_date(page)[0])
+        print(f"Read {len(availability)} availability records from timetable responses")
+        return availability
+
     def _extract_availability(self, page):
         """Extract court availability from the div-based timetable (slot cards)."""
-        availability = []
-        today = datetime.now().date()
-
         print(f"Current page: {page.title()}, URL: {page.url}")
 
         # Resolve the date being viewed (TODAY / TOMORROW / specific date tab)
@@ -568,137 +583,20 @@ class HillRoadsScraper:
         date_str = viewing_date.strftime('%Y-%m-%d')
         print(f"Viewing date: {date_str} ({day_name})")
 
-        # Find slot cards: div-based tiles that contain time (HH:MM) and either "Full" or "X Slots"
-        card_selectors = [
-            '[class*="slot"]',
-            '[class*="Slot"]',
-            '[class*="tile"]',
-            '[class*="card"]',
-            '[class*="booking"]',
-            '[class*="time-slot"]',
-        ]
-        cards = []
-        for selector in card_selectors:
-            try:
-                els = page.locator(selector).all()
-                for el in els:
-                    if not el.is_visible(timeout=500):
-                        continue
-                    text = el.inner_text()
-                    # Must contain a time like 07:00 and either Full or N Slots
-                    if re.search(r'\d{1,2}:\d{2}', text) and (re.search(r'\bFull\b', text, re.I) or re.search(r'\d+\s*Slots?', text, re.I)):
-                        cards.append(el)
-                if cards:
-                    break
-            except Exception as e:
-                print(f"Selector {selector}: {e}")
-                continue
-
-        # Fallback: find any element that looks like a slot card (has time + Full or Slots)
-        if not cards:
-            try:
-                # Get elements that contain both time and availability text; avoid huge containers
-                candidates = page.locator('div').all()
-                for el in candidates:
-                    try:
-                        if not el.is_visible(timeout=200):
-                            continue
-                        text = el.inner_text()
-                        if len(text) > 500:  # Skip big containers
-                            continue
-                        if re.search(r'\d{1,2}:\d{2}', text) and (re.search(r'\bFull\b', text, re.I) or re.search(r'\d+\s*Slots?', text, re.I)):
-                            if 'BADMINTON' in text.upper() or '60 MINUTES' in text:
-                                cards.append(el)
-                    except Exception:
-                        continue
-            except Exception as e:
-                print(f"Fallback card search: {e}")
-
-        # Deduplicate by time (same card might match multiple selectors)
-        seen_times = set()
-        unique_cards = []
-        for card in cards:
-            try:
-                text = card.inner_text()
-                m = re.search(r'(\d{1,2}):(\d{2})', text)
-                if m:
-                    t = f"{int(m.group(1)):02d}:{m.group(2)}"
-                    if t not in seen_times:
-                        seen_times.add(t)
-                        unique_cards.append(card)
-            except Exception:
-                continue
-
-        print(f"Found {len(unique_cards)} slot cards")
-
-        for card in unique_cards:
-            try:
-                text = card.inner_text()
-                # Time: first HH:MM
-                time_m = re.search(r'(\d{1,2}):(\d{2})', text)
-                if not time_m:
-                    continue
-                hour, minute = int(time_m.group(1)), int(time_m.group(2))
-                start_time = f"{hour:02d}:{minute:02d}"
-                if hour + 1 >= 24:
-                    continue
-                end_time = f"{hour + 1:02d}:{minute:02d}"
-
-                # Availability: "Full" vs "N Slots"
-                if re.search(r'\bFull\b', text, re.I):
-                    is_available = False
-                    num_slots = 0
-                else:
-                    slot_m = re.search(r'(\d+)\s*Slots?', text, re.I)
-                    num_slots = int(slot_m.group(1)) if slot_m else 0
-                    is_available = num_slots > 0
-
-                if num_slots > 0:
-                    for i in range(1, num_slots + 1):
-                        availability.append({
-                            'date': date_str,
-                            'day_name': day_name,
-                            'start_time': start_time,
-                            'end_time': end_time,
-                            'court_number': f'Court {i}',
-                            'is_available': True,
-                        })
-                else:
-                    availability.append({
-                        'date': date_str,
-                        'day_name': day_name,
-                        'start_time': start_time,
-                        'end_time': end_time,
-                        'court_number': 'Court 1',
-                        'is_available': False,
-                    })
-            except Exception as e:
-                print(f"Error parsing card: {e}")
-                continue
+        # Find slot cards (tiles with a time and "Full" or "X Slots") in one browser round trip
+        source, texts = extract_slot_cards(page)
+        if source == 'div':
+            # Fallback scan of every div: keep only badminton cards
+            texts = badminton_cards(texts)
+        availability = parse_slot_cards(texts, date_str, day_name)
+        print(f"Found {len(texts)} slot card texts via {source}")
 
         print(f"Extracted {len(availability)} availability records")
         return availability
     
     def _store_availability(self, availability):
-        """Store availability data in database."""
-        # Clear old data for this facility
-        self.session.query(CourtAvailability).filter_by(facility_id=self.facility.id).delete()
-        
-        for slot in availability:
-            record = CourtAvailability(
-                facility_id=self.facility.id,
-                date=slot['date'],
-                day_name=slot.get('day_name'),
-                start_time=slot['start_time'],
-                end_time=slot['end_time'],
-                court_number=slot.get('court_number', 'Court 1'),
-                is_available=slot['is_available'],
-                scraped_at=datetime.utcnow()
-            )
-            self.session.add(record)
-        
-        self.session.commit()
-        print(f"Stored {len(availability)} availability records")
+        """Store availability data in the database (only the slots that changed)."""
+        return store_availability(self.session, self.facility.id, self.range, availability)['slots']
 
 
 if __name__ == "__main__":
@@ -0,0 +1,162 @@
+"""Shared pieces for Legend Online Services sites (Hill Roads, Trumpington)."""
+import os
+import re
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapers.payloads import JsonResponseCapture, normalized, first_value, parse_when, walk_objects
+
+# Any timetable slot card: a time followed somewhere by "Full" or "N Slots"
+SLOT_TIME_TEXT_SELECTOR = r'text=/\d{1,2}:\d{2}[\s\S]*(Full|\d+\s*Slots?)/i'
+
+# Slot card containers, most specific first; the first selector with any matching card wins
+CARD_SELECTORS = [
+    '[class*="slot"]',
+    '[class*="Slot"]',
+    '[class*="tile"]',
+    '[class*="card"]',
+    '[class*="booking"]',
+    '[class*="time-slot"]',
+]
+# Visible-card texts in one browser call: {source: selector or 'div' (fallback scan), texts: [...]}
+SLOT_CARDS_JS = """
+([selectors, maxFallbackLength]) => {
+    const isCard = (text) => /\\d{1,2}:\\d{2}/.test(text) && /\\bFull\\b|\\d+\\s*Slots?/i.test(text);
+    const isVisible = (el) => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+    };
+    const cardTexts = (elements, maxLength) => {
+        const texts = [];
+        for (const el of elements) {
+            if (!isVisible(el)) continue;
+            const text = el.innerText || '';
+            if (maxLength && text.length > maxLength) continue;
+            if (isCard(text)) texts.push(text);
+        }
+        return texts;
+    };
+    for (const selector of selectors) {
+        const texts = cardTexts(document.querySelectorAll(selector), 0);
+        if (texts.length) return {source: selector, texts};
+    }
+    return {source: 'div', texts: cardTexts(document.querySelectorAll('div'), maxFallbackLength)};
+}
+"""
+FALLBACK_CARD_MAX_LENGTH = 500  # Skip big containers in the div scan
+CARD_TIME = re.compile(r'(\d{1,2}):(\d{2})')
+CARD_FULL = re.compile(r'\bFull\b', re.I)
+CARD_SLOTS = re.compile(r'(\d+)\s*Slots?', re.I)
+
+# Keys seen on timetable slot objects, compared lower-case with '_' removed
+START_KEYS = ('starttime', 'startdatetime', 'start', 'timefrom', 'from')
+END_KEYS = ('endtime', 'enddatetime', 'end', 'timeto', 'to')
+DATE_KEYS = ('date', 'startdate', 'sessiondate', 'day')
+SLOTS_KEYS = ('availableslots', 'slotsavailable', 'spacesavailable', 'availablespaces', 'placesavailable',
+              'remainingcapacity', 'remaining', 'freeslots', 'available', 'availability')
+FULL_KEYS = ('isfull', 'full', 'fullybooked')
+NAME_KEYS = ('activityname', 'activity', 'name', 'description', 'title')
+
+def availability_records(date_str, day_name, start_time, end_time, num_slots):
+    """Rows for one timetable slot: one available row per free court, else a single 'Court 1' full row."""
+    base = {'date': date_str, 'day_name': day_name, 'start_time': start_time, 'end_time': end_time}
+    if num_slots > 0:
+        return [dict(base, court_number=f'Court {i}', is_available=True) for i in range(1, num_slots + 1)]
+    return [dict(base, court_number='Court 1', is_available=False)]
+
+
+def extract_slot_cards(page):
+    """(source, texts) of the visible slot cards, collected by a single page.evaluate."""
+    result = page.evaluate(SLOT_CARDS_JS, [CARD_SELECTORS, FALLBACK_CARD_MAX_LENGTH])
+    return result['source'], result['texts']
+
+
+def badminton_cards(texts):
+    """The card texts from the fallback div scan that are badminton sessions (it finds every activity)."""
+    return [t for t in texts if 'BADMINTON' in t.upper() or '60 MINUTES' in t]
+
+
+def parse_slot_cards(texts, date_str, day_name):
+    """Availability rows from slot card texts ("07:00 ... 3 Slots" / "... Full"), one card per start time."""
+    availability = []
+    seen_times = set()
+    for text in texts:
+        time_m = CARD_TIME.search(text)
+        if not time_m:
+            continue
+        hour, minute = int(time_m.group(1)), int(time_m.group(2))
+        start_time = f"{hour:02d}:{minute:02d}"
+        if start_time in seen_times:
+            continue
+        seen_times.add(start_time)
+        if hour + 1 >= 24:
+            continue
+        end_time = f"{hour + 1:02d}:{minute:02d}"
+        if CARD_FULL.search(text):
+            num_slots = 0
+        else:
+            slot_m = CARD_SLOTS.search(text)
+            num_slots = int(slot_m.group(1)) if slot_m else 0
+        availability.extend(availability_records(date_str, day_name, start_time, end_time, num_slots))
+    return availability
+
+
+def _slot_count(record):
+    """Free places on a slot, or None if the record has no availability fields."""
+    full = first_value(record, FULL_KEYS)
+    if full is True or str(full).lower() == 'true':
+        return 0
+    slots = first_value(record, SLOTS_KEYS)
+    if isinstance(slots, bool):
+        return 1 if slots else 0
+    if isinstance(slots, (int, float)):
+        return max(0, int(slots))
+    if isinstance(slots, str):
+        m = re.search(r'\d+', slots)
+        if m:
+            return int(m.group())
+        if re.search(r'\bfull\b', slots, re.I):
+            return 0
+    return 0 if full is not None else None
+
+
+def parse_timetable_payload(payload, activity='badminton'):
+    """Slot rows from a timetable JSON payload, whatever its nesting.
+
+    Any object with a start time and an availability field is treated as a slot. Objects naming
+    a different activity are skipped. Rows whose date isn't in the payload get date None.
+    """
+    availability = []
+    seen = set()
+    for raw in walk_objects(payload):
+        record = normalized(raw)
+        start_day, start_time = parse_when(first_value(record, START_KEYS))
+        num_slots = _slot_count(record)
+        if start_time is None or num_slots is None:
+            continue
+        name = first_value(record, NAME_KEYS)
+        if activity and isinstance(name, str) and activity not in name.lower():
+            continue
+        date_value = first_value(record, DATE_KEYS)
+        day = start_day or (parse_when(date_value)[0] if date_value is not None else None)
+        end_time = parse_when(first_value(record, END_KEYS))[1]
+        if end_time is None:
+            hour, minute = map(int, start_time.split(':'))
+            if hour + 1 >= 24:
+                continue
+            end_time = f"{hour + 1:02d}:{minute:02d}"
+        key = (day, start_time)
+        if key in seen:
+            continue
+        seen.add(key)
+        date_str = day.strftime('%Y-%m-%d') if day else None
+        day_name = day.strftime('%A') if day else None
+        availability.extend(availability_records(date_str, day_name, start_time, end_time, num_slots))
+    return availability
+
+
+class TimetableCapture(JsonResponseCapture):
+    """Legend timetable JSON seen by a page (see JsonResponseCapture)."""
+
+    def __init__(self, page):
+        super().__init__(page, 'legendonlineservices', parse_timetable_payload)
@@ -0,0 +1,100 @@
+"""Browserless timetable fetching for Legend sites.
+
+Once a browser scrape has seen which JSON endpoint serves a day's timetable, the URL is saved
+(scraper_state, kind 'timetable_endpoint') with the query parameter that carries the date. Later
+scrapes reuse the login cookies and request each day from that endpoint over one keep-alive HTTP
+session, without opening a browser. Any sign that this no longer works (login redirect, non-JSON
+reply, no slots at all) makes the caller fall back to the browser.
+"""
+import os
+import sys
+
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapers.browser import USER_AGENT
+from scrapers.legend import parse_timetable_payload
+from scrapers.payloads import fill_missing_dates
+from scrapers.run_log import RunLog
+from scrapers.har import BROWSER_ONLY
+
+# Off while recording or replaying HAR files, which only hold the browser's traffic
+LEGEND_HTTP_MODE = os.getenv('LEGEND_HTTP_MODE', 'true').lower() == 'true' and not BROWSER_ONLY
+LEGEND_HTTP_TIMEOUT_SECONDS = float(os.getenv('LEGEND_HTTP_TIMEOUT_SECONDS', '15'))
+
+
+def http_session(storage_state):
+    """requests.Session with the browser's cookies, a pooled keep-alive adapter and XHR-like headers."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'User-Agent': USER_AGENT,
+        'Accept': 'application/json, text/javascript, */*; q=0.01',
+        'Accept-Language': 'en-GB,en;q=0.9',
+        'X-Requested-With': 'XMLHttpRequest',
+    })
+    for cookie in (storage_state or {}).get('cookies', []):
+        session.cookies.set(cookie['name'], cookie['value'],
+                            domain=cookie.get('domain'), path=cookie.get('path', '/'))
+    return session
+
+
+def _fetch_day(session, endpoint, day, timeout):
+    """One day's rows, or None (reason printed) if the reply shows the session can't be trusted."""
+    response = session.get(endpoint.url_for(day), timeout=timeout)
+    if response.status_code != 200 or '/account/login' in response.url.lower():
+        print(f"HTTP timetable for {day}: status {response.status_code} at {response.url}, session not valid")
+        return None
+    try:
+        payload = response.json()
+    except ValueError:
+        print(f"HTTP timetable for {day} was not JSON")
+        return None
+    rows = fill_missing_dates(parse_timetable_payload(payload), day)
+    rows = [row for row in rows if row['date'] == day.strftime('%Y-%m-%d')]
+    print(f"  {day}: {len(rows)} slots ({response.elapsed.total_seconds() * 1000:.0f} ms)")
+    return rows
+
+
+def fetch_timetable_days(storage_state, endpoint, days, deadline=None, run_log=None, fetched=None):
+    """Availability for the given dates, or None if HTTP mode can't be trusted.
+
+    With a deadline, each request gets at most the time left and the days after it runs out are
+    skipped. The days actually fetched (with or without slots) are appended to the `fetched` list.
+    Each day is a step in `run_log`.
+    """
+    run_log = run_log or RunLog()
+    availability = []
+    with http_session(storage_state) as session:
+        for day in days:
+            timeout = LEGEND_HTTP_TIMEOUT_SECONDS
+            if deadline:
+                if deadline.expired:
+                    print(f"Scrape deadline passed, skipping HTTP timetable from {day}")
+                    break
+                timeout = deadline.ms(timeout * 1000) / 1000
+            step = run_log.begin('date', 'day (http)', day.strftime('%Y-%m-%d'))
+            try:
+                rows = _fetch_day(session, endpoint, day, timeout)
+            except requests.RequestException as e:
+                run_log.end(error=e)
+                if deadline and deadline.expired:
+                    print(f"Scrape deadline passed during HTTP timetable for {day}")
+                    break
+                print(f"HTTP timetable request for {day} failed: {e}")
+                return None
+            if rows is None:
+                run_log.end(error='HTTP timetable not usable')
+                return None
+            step['slots'] = len(rows)
+            run_log.end()
+            availability.extend(rows)
+            if fetched is not None:
+                fetched.append(day)
+    if not availability:
+        print("HTTP timetable returned no slots for any day")
+        return None
+    return availability
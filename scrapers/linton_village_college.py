@@ -1,24 +1,133 @@
 """Scraper for Linton Village College badminton court availability."""
 import os
-import time
 from datetime import datetime, timedelta
 from urllib.parse import urljoin
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 import sys
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import init_db, get_session, Facility, CourtAvailability
+from database import init_db, get_session, Facility
+from scrapers.browser import scraper_browser, new_scraper_context
+from scrapers.waits import Waiter
+from scrapers.routing import RequestPolicy
+from scrapers.date_range import ScrapeRange
+from scrapers.storage import store_availability
+from scrapers.har import replay_today
+from scrapers.deadline import Deadline, DeadlineExceeded
+from scrapers.run_log import RunLog
+from scrapers.memory import RssWatchdog
+from scrapers.artifacts import DebugArtifacts
 
 load_dotenv()
 
 
+MONTH_NUMBERS = {
+    'Jan': '01', 'Feb': '02', 'Mar': '03', 'Apr': '04',
+    'May': '05', 'Jun': '06', 'Jul': '07', 'Aug': '08',
+    'Sep': '09', 'Oct': '10', 'Nov': '11', 'Dec': '12'
+}
+
+
+def _half_hour_end(start_time):
+    """End of a 30-minute slot starting at "HH:MM"."""
+    try:
+        hour, minute = map(int, start_time.split(':'))
+        end_hour = hour
+        end_minute = minute + 30
+        if end_minute >= 60:
+            end_hour += 1
+            end_minute -= 60
+        return f"{end_hour:02d}:{end_minute:02d}"
+    except ValueError:
+        return start_time  # Fallback
+
+
+def _cell_is_available(button_class, cell_class):
+    """Availability from the slot button's colour class, then the cell's class."""
+    # Green (btn-resource-success) = Available
+    # White (btn-resource-default) = Not Available
+    # Orange (btn-resource-warning) = My booking (not available to others)
+    if 'btn-resource-success' in button_class:
+        return True
+    if 'btn-resource-warning' in button_class:
+        return False
+    if 'btn-resource-default' in button_class or 'itemnotavailable' in cell_class:
+        return False
+    # Cell marked as available; default to not available if unclear
+    return 'itemavailable' in cell_class
+
+
+def _header_date(day_header, year):
+    """"Wed 04 Feb" -> "YYYY-02-04" (the header has no year)."""
+    parts = day_header.split()
+    if len(parts) < 3:
+        return None
+    return f"{year}-{MONTH_NUMBERS.get(parts[2], '01')}-{parts[1].zfill(2)}"
+
+
+def parse_slots_grid(html, year=None):
+    """Availability records from the #slotsGrid table HTML (one column per day, one row per 30 min)."""
+    year = year or datetime.now().year
+    table = BeautifulSoup(html, 'html.parser')
+
+    # Day headers (skip first column which is time)
+    day_headers = []
+    for header in table.select('th.mastertableheader')[1:]:
+        day = header.select_one('.availabilityday')
+        day_headers.append(day.get_text(' ', strip=True) if day else '')
+
+    availability = []
+    for row in table.select('tbody tr'):
+        time_cell = row.select_one('td.masterTableLeftHeader')
+        start_time = time_cell.get_text(strip=True) if time_cell else ''
+        if not start_time:
+            continue
+        end_time = _half_hour_end(start_time)
+
+        # Availability cells (skip first column which is time)
+        for i, cell in enumerate(row.find_all('td', recursive=False)[1:]):
+            if i >= len(day_headers):
+                break
+            button = cell.select_one('input[type="submit"]')
+            if button is None:
+                continue
+            is_available = _cell_is_available(' '.join(button.get('class', [])), ' '.join(cell.get('class', [])))
+
+            # Date from data-qa-id ("Date=04/02/2026 18:00:00"), else from the day header
+            date_str = None
+            data_qa_id = button.get('data-qa-id') or ''
+            if 'Date=' in data_qa_id:
+                try:
+                    day, month, year_part = data_qa_id.split('Date=')[1].split(' ')[0].split('/')
+                    date_str = f"{year_part}-{month}-{day}"
+                except ValueError:
+                    pass
+            if not date_str:
+                date_str = _header_date(day_headers[i], year)
+
+            if date_str:
+                availability.append({
+                    'court_number': None,  # Single court for this facility
+                    'date': date_str,
+                    'day_name': day_headers[i].split()[0] if day_headers[i] else None,  # First word is day name
+                    'start_time': start_time,
+                    'end_time': end_time,
+                    'is_available': is_available
+                })
+    return availability
+
+
 class LintonVillageCollegeScraper:
     """Scraper for Linton Village College badminton courts."""
     
     BASE_URL = "https://lvc.org/sportscentre/badminton-hire/"
     LOGIN_URL = None  # Will be determined from the "Book now" link
+    WINDOW_DAYS = 7  # The slots grid shows one week from today
+    # URL substrings the booking flow needs even though the request policy would block them
+    REQUEST_ALLOWLIST = ()
     
     def __init__(self, headless=True):
         self.headless = headless if headless is not None else True
@@ -39,37 +148,41 @@ class LintonVillageCollegeScraper:
             self.session.commit()
         return facility
     
-    def scrape(self):
-        """Main scraping method."""
+    def scrape(self, start_date=None, end_date=None, deadline=None):
+        """Main scraping method. start_date/end_date limit which dates' rows are replaced.
+
+        The slots grid shows the whole week on one page, so the browser work is the same either way
+        (and there are no days to keep if the deadline passes first).
+        """
         print("Starting Linton Village College scraper...")
+        self.range = ScrapeRange(self.WINDOW_DAYS, start_date, end_date, today=replay_today(self.facility.name))
+        self.deadline = deadline or Deadline()
+        self.stopped_early = False
+        self.run_log = RunLog()
+        self.memory = RssWatchdog(self.run_log)
+        print(f"Dates: {self.range} ({self.deadline})")
+        if not self.range.dates:
+            self.session.close()
+            return
         
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=self.headless,
-                args=['--disable-blink-features=AutomationControlled']
-            )
-            context = browser.new_context(
-                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                viewport={'width': 1920, 'height': 1080},
-                locale='en-GB',
-                timezone_id='Europe/London',
-                extra_http_headers={
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'Accept-Language': 'en-GB,en;q=0.9',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1'
-                }
-            )
-            # Hide webdriver flag
+        with scraper_browser(self.headless, watchdog=self.memory) as browser:
+            self.requests = RequestPolicy(self.REQUEST_ALLOWLIST)
+            context = new_scraper_context(browser, request_policy=self.requests, recording=self.facility.name, extra_http_headers={
+                'Accept-Encoding': 'gzip, deflate, br',
+                'Connection': 'keep-alive',
+                'Upgrade-Insecure-Requests': '1'
+            })
             page = context.new_page()
-            page.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            self.artifacts = DebugArtifacts(self.facility.name)
+            self.artifacts.attach(context)
+            self.waits = Waiter(page, deadline=self.deadline)
             
             try:
                 # Step 1: Navigate to badminton hire page
+                self.run_log.begin('navigation', 'book now')
                 print(f"Navigating to {self.BASE_URL}...")
-                page.goto(self.BASE_URL, wait_until='networkidle')
-                time.sleep(2)  # Give page time to load
+                page.goto(self.BASE_URL, wait_until='domcontentloaded', timeout=self.deadline.ms(30000, 'badminton hire page'))
+                self.waits.selector('text=Book now', step='book now link', timeout_ms=30000)
                 
                 # Step 2: Find and click "Book now" button
                 print("Looking for 'Book now' button...")
@@ -78,37 +191,37 @@ class LintonVillageCollegeScraper:
                     book_now = page.locator('text=Book now').first
                     if book_now.is_visible():
                         print("Clicking 'Book now' button...")
+                        url_before = page.url
                         book_now.click()
                         print("Waiting for navigation to login page...")
-                        page.wait_for_load_state('networkidle', timeout=30000)
-                        time.sleep(2)
+                        self.waits.url_change(url_before, 'book now navigation', timeout_ms=30000)
                         print(f"Current URL: {page.url}")
                     else:
                         # Try alternative selectors
                         book_now = page.locator('a:has-text("Book now")').first
                         if book_now.is_visible():
                             print("Clicking 'Book now' link...")
+                            url_before = page.url
                             book_now.click()
                             print("Waiting for navigation to login page...")
-                            page.wait_for_load_state('networkidle', timeout=30000)
-                            time.sleep(2)
+                            self.waits.url_change(url_before, 'book now navigation', timeout_ms=30000)
                             print(f"Current URL: {page.url}")
                         else:
                             raise Exception("Could not find 'Book now' button")
                 except Exception as e:
                     print(f"Error finding book now button: {e}")
-                    # Take screenshot for debugging
-                    page.screenshot(path='debug_book_now.png')
                     raise
                 
                 # Step 3: Login
+                self.run_log.begin('login')
                 print("Attempting to log in...")
                 print(f"Current URL after Book now: {page.url}")
                 try:
-                    # Wait for page to fully load
-                    print("Waiting for page to fully load...")
-                    page.wait_for_load_state('networkidle', timeout=30000)
-                    time.sleep(5)  # Give JavaScript plenty of time to render
+                    # Wait for JavaScript to render the login form (or the WAF's 403 page)
+                    print("Waiting for login form to render...")
+                    self.waits.selector(
+                        'input, body:has-text("Access Forbidden")', step='login form', timeout_ms=30000, state='attached'
+                    )
                     
                     # Detect 403 / bot-block page (Anglian Leisure uses gs-signature.cloud WAF)
                     current_url = page.url
@@ -144,14 +257,8 @@ class LintonVillageCollegeScraper:
                     all_inputs = page.locator('input').all()
                     print(f"Found {len(all_inputs)} input elements on main page")
                     
-                    # If no inputs found, try waiting longer and check again
+                    # If no inputs found, show what the page has instead
                     if len(all_inputs) == 0:
-                        print("No inputs found initially, waiting longer for JavaScript...")
-                        time.sleep(10)  # Wait even longer
-                        all_inputs = page.locator('input').all()
-                        print(f"After additional wait: Found {len(all_inputs)} input elements")
-                        
-                        # Try checking page content
                         try:
                             body_text = page.locator('body').inner_text()[:200]
                             print(f"Page body text (first 200 chars): {body_text}")
@@ -169,12 +276,6 @@ class LintonVillageCollegeScraper:
                             print(f"  Input {i+1}: Error reading attributes: {e}")
                     
                     if len(all_inputs) == 0:
-                        # Take screenshot for debugging
-                        try:
-                            page.screenshot(path='debug_no_inputs.png')
-                            print("Screenshot saved to debug_no_inputs.png")
-                        except:
-                            pass
                         raise Exception("No input fields found on page - login form may not have loaded or is blocked")
                     
                     print(f"Login form appears to be loaded. Current URL: {page.url}")
@@ -205,8 +306,6 @@ class LintonVillageCollegeScraper:
                     if not email_filled:
                         raise Exception("Could not find email input field")
                     
-                    time.sleep(1)
-                    
                     # Find password field
                     password_selectors = [
                         'input[type="password"]',
@@ -229,8 +328,6 @@ class LintonVillageCollegeScraper:
                     if not password_filled:
                         raise Exception("Could not find password input field")
                     
-                    time.sleep(1)
-                    
                     # Submit login form
                     submit_selectors = [
                         'button[type="submit"]',
@@ -241,6 +338,7 @@ class LintonVillageCollegeScraper:
                     ]
                     
                     submitted = False
+                    url_before = page.url
                     for selector in submit_selectors:
                         try:
                             submit_button = page.locator(selector).first
@@ -257,18 +355,18 @@ class LintonVillageCollegeScraper:
                         page.keyboard.press('Enter')
                         print("Pressed Enter to submit")
                     
-                    time.sleep(5)  # Wait for login to complete
+                    # Wait for login to complete (ASP.NET postback navigates away from the login form)
+                    self.waits.url_change(url_before, 'login postback', timeout_ms=30000)
+                    self.waits.settled('post-login page', timeout_ms=30000)
                     
                 except Exception as e:
                     print(f"Error during login: {e}")
-                    page.screenshot(path='debug_login.png')
                     raise
                 
                 # Step 4: Navigate to badminton booking (New Gym)
+                self.run_log.begin('navigation', 'badminton')
                 print("Looking for badminton booking interface...")
                 try:
-                    time.sleep(2)  # Wait for page to fully load
-                    
                     # First, check what activity is currently selected
                     # Look for the activity name in the page
                     activity_text = page.locator('h3').filter(has_text='Badminton').first
@@ -300,7 +398,7 @@ class LintonVillageCollegeScraper:
                                         element.click()
                                         badminton_clicked = True
                                         print(f"Clicked badminton using selector: {selector}")
-                                        time.sleep(3)  # Wait for page to update
+                                        self.waits.settled('badminton activity', timeout_ms=15000)
                                         break
                             if badminton_clicked:
                                 break
@@ -309,8 +407,7 @@ class LintonVillageCollegeScraper:
                             continue
                     
                     # Verify we're on the right activity
-                    time.sleep(2)
-                    page.screenshot(path='debug_after_activity_selection.png')
+                    self.artifacts.checkpoint(page, 'after activity selection')
                     activity_check = page.locator('h3').first
                     if activity_check.is_visible():
                         activity_name = activity_check.inner_text().strip()
@@ -325,22 +422,21 @@ class LintonVillageCollegeScraper:
                                     if 'badminton' in text and 'basketball' not in text:
                                         link.click()
                                         print(f"Clicked badminton link: {text}")
-                                        time.sleep(3)
+                                        self.waits.settled('badminton link', timeout_ms=15000)
                                         break
                                 except:
                                     continue
                     
                     if not badminton_clicked:
-                        print("Could not find badminton button. Screenshot saved to debug_badminton_search.png")
-                        page.screenshot(path='debug_badminton_search.png')
+                        print("Could not find badminton button")
+                        self.artifacts.failure(page, 'no badminton button')
                     
                 except Exception as e:
                     print(f"Error finding badminton interface: {e}")
-                    page.screenshot(path='debug_badminton_error.png')
+                    self.artifacts.failure(page, 'badminton interface')
                 
                 # Step 5: Verify we're on the right activity and extract availability data
                 print("Verifying activity selection...")
-                time.sleep(2)
                 
                 # Double-check we're viewing badminton, not basketball
                 activity_heading = page.locator('h3').first
@@ -353,27 +449,35 @@ class LintonVillageCollegeScraper:
                         print("✓ Confirmed: Badminton is selected")
                 
                 print("Extracting availability data...")
-                time.sleep(2)  # Wait for calendar/availability to load
-                
-                availability_data = self._extract_availability(page)
+                # _extract_availability waits for the #slotsGrid table itself
+                with self.run_log.step('date', 'week grid') as step:
+                    availability_data = self._extract_availability(page)
+                    step['slots'] = len(availability_data)
                 
-                # Step 6: Store in database
+                # Step 6: Store in database (only the week's days the grid showed)
+                self.range.keep_read()
                 print(f"Storing {len(availability_data)} availability records...")
-                self._store_availability(availability_data)
+                with self.run_log.step('storage') as step:
+                    step['slots'] = self._store_availability(availability_data)
                 
                 # Update facility last_scraped_at
                 from datetime import datetime
                 self.facility.last_scraped_at = datetime.utcnow()
                 self.session.commit()
                 
+                self.run_log.summary()
+                self.waits.summary()
+                self.requests.summary()
                 print("Scraping completed successfully!")
                 
             except Exception as e:
                 print(f"Error during scraping: {e}")
-                page.screenshot(path='debug_error.png')
+                self.run_log.fail(e)
+                self.artifacts.failure(page, 'error', e)
                 raise
             finally:
-                browser.close()
+                self.artifacts.finish(context)
+                context.close()
                 self.session.close()
     
     def _extract_availability(self, page):
@@ -382,139 +486,19 @@ class LintonVillageCollegeScraper:
         
         try:
             # Wait for the availability table to load
-            page.wait_for_selector('#slotsGrid', timeout=60000)
-            
-            # Get the table
-            table = page.locator('#slotsGrid')
-            
-            # Extract day headers (skip first column which is time)
-            day_headers = []
-            header_cells = table.locator('th.mastertableheader').all()
-            for i, header in enumerate(header_cells):
-                if i == 0:  # Skip first column (time header)
-                    continue
-                day_text = header.locator('.availabilityday').inner_text()
-                day_headers.append(day_text.strip())
-            
-            print(f"Found {len(day_headers)} days: {day_headers}")
-            
-            # Extract time slots and availability
-            rows = table.locator('tbody tr').all()
-            
-            for row in rows:
-                # Get time from first cell
-                time_cell = row.locator('td.masterTableLeftHeader').first
-                if not time_cell.is_visible():
-                    continue
-                
-                time_text = time_cell.inner_text().strip()
-                if not time_text:
-                    continue
-                
-                # Parse time (format: "HH:MM")
-                start_time = time_text
-                # Calculate end time (30 minutes later for 30-min slots)
-                try:
-                    hour, minute = map(int, start_time.split(':'))
-                    end_hour = hour
-                    end_minute = minute + 30
-                    if end_minute >= 60:
-                        end_hour += 1
-                        end_minute -= 60
-                    end_time = f"{end_hour:02d}:{end_minute:02d}"
-                except:
-                    end_time = start_time  # Fallback
-                
-                # Get availability cells (skip first column which is time)
-                cells = row.locator('td').all()
-                
-                for i, cell in enumerate(cells[1:], start=0):  # Skip first cell (time)
-                    if i >= len(day_headers):
-                        break
-                    
-                    # Check if cell has availability button (including disabled ones)
-                    button = cell.locator('input[type="submit"]').first
-                    button_count = cell.locator('input[type="submit"]').count()
-                    if button_count == 0:
-                        continue
-                    
-                    # Get availability status based on button class (color)
-                    # Green (btn-resource-success) = Available
-                    # White (btn-resource-default) = Not Available
-                    # Orange (btn-resource-warning) = My booking (not available to others)
-                    button_class = button.get_attribute('class') or ''
-                    cell_class = cell.get_attribute('class') or ''
-                    
-                    # Check button class first, then cell class
-                    if 'btn-resource-success' in button_class:
-                        # Green button = Available
-                        is_available = True
-                    elif 'btn-resource-warning' in button_class:
-                        # Orange button = My booking (not available)
-                        is_available = False
-                    elif 'btn-resource-default' in button_class or 'itemnotavailable' in cell_class:
-                        # White/default button = Not Available
-                        is_available = False
-                    elif 'itemavailable' in cell_class:
-                        # Cell marked as available
-                        is_available = True
-                    else:
-                        # Default to not available if unclear
-                        is_available = False
-                    
-                    # Get date from data-qa-id attribute
-                    data_qa_id = button.get_attribute('data-qa-id') or ''
-                    date_str = None
-                    if 'Date=' in data_qa_id:
-                        # Extract date from format: "Date=04/02/2026 18:00:00"
-                        date_part = data_qa_id.split('Date=')[1].split(' ')[0]
-                        # Convert from DD/MM/YYYY to YYYY-MM-DD
-                        try:
-                            day, month, year = date_part.split('/')
-                            date_str = f"{year}-{month}-{day}"
-                        except:
-                            pass
-                    
-                    # If no date from data attribute, try to parse from day header
-                    if not date_str and i < len(day_headers):
-                        day_header = day_headers[i]
-                        # Format: "Wed 04 Feb" - need to get current year
-                        try:
-                            # Parse day header (e.g., "Wed 04 Feb")
-                            parts = day_header.split()
-                            if len(parts) >= 3:
-                                day_num = parts[1]
-                                month_name = parts[2]
-                                current_year = datetime.now().year
-                                # Convert month name to number
-                                month_map = {
-                                    'Jan': '01', 'Feb': '02', 'Mar': '03', 'Apr': '04',
-                                    'May': '05', 'Jun': '06', 'Jul': '07', 'Aug': '08',
-                                    'Sep': '09', 'Oct': '10', 'Nov': '11', 'Dec': '12'
-                                }
-                                month_num = month_map.get(month_name, '01')
-                                date_str = f"{current_year}-{month_num}-{day_num.zfill(2)}"
-                        except Exception as e:
-                            print(f"Error parsing date from header: {e}")
-                    
-                    # Get day name
-                    day_name = None
-                    if i < len(day_headers):
-                        day_header = day_headers[i]
-                        day_name = day_header.split()[0]  # First word is day name
-                    
-                    if date_str:
-                        availability.append({
-                            'court_number': None,  # Single court for this facility
-                            'date': date_str,
-                            'day_name': day_name,
-                            'start_time': start_time,
-                            'end_time': end_time,
-                            'is_available': is_available
-                        })
+            if not self.waits.selector('#slotsGrid', step='slots grid', timeout_ms=60000):
+                raise Exception("Timed out waiting for #slotsGrid")
             
+            # Take the whole table in one round trip and parse it here
+            html = page.eval_on_selector('#slotsGrid', 'table => table.outerHTML')
+            availability = parse_slots_grid(html)
+            if availability:
+                for day in self.range.dates:  # The grid shows the whole week, including days without slots
+                    self.range.mark_read(day)
             print(f"Extracted {len(availability)} time slots")
             
+        except DeadlineExceeded:
+            raise  # Nothing was read; storing an empty grid would wipe the stored week
         except Exception as e:
             print(f"Error extracting availability: {e}")
             import traceback
@@ -523,25 +507,8 @@ class LintonVillageCollegeScraper:
         return availability
     
     def _store_availability(self, availability_data):
-        """Store availability data in the database."""
-        # Clear old data for this facility (subsequent scrape overwrites)
-        self.session.query(CourtAvailability).filter_by(facility_id=self.facility.id).delete()
-        
-        for record in availability_data:
-            availability = CourtAvailability(
-                facility_id=self.facility.id,
-                court_number=record.get('court_number'),
-                date=record.get('date'),
-                day_name=record.get('day_name'),
-                start_time=record.get('start_time'),
-                end_time=record.get('end_time'),
-                is_available=record.get('is_available', True),
-                scraped_at=datetime.utcnow()
-            )
-            self.session.add(availability)
-        
-        self.session.commit()
-        print(f"Stored {len(availability_data)} availability records")
+        """Store availability data in the database (only the slots that changed)."""
+        return store_availability(self.session, self.facility.id, self.range, availability_data)['slots']
 
 
 def main():
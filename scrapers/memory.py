@@ -0,0 +1,177 @@
+"""Browser memory watchdog: samples the memory of this scrape's browser during the scrape.
+
+A background thread reads /proc every BROWSER_RSS_SAMPLE_SECONDS. It sums the PSS (proportional set
+size, from /proc/<pid>/smaps_rollup) of the scrape's Chromium process and everything below it, i.e.
+its renderers, GPU and utility processes. PSS splits each shared page between the processes that map
+it, so the sum is what the browser really costs. An RSS sum would count shared pages in every process.
+The Playwright driver and other scrapes' browsers are not counted.
+The peak is saved on the scrape's RunLog and shown in the run history (as peak_rss_mb).
+
+Between days, scrapers call should_stop(page). Over BROWSER_RSS_LIMIT_MB it first asks Chromium to
+drop what it can (memory pressure signal, GC, HTTP cache). If that is not enough it tells the scraper
+to stop and keep the days it has, so the context is closed and the next scrape starts with a fresh
+one. A shared browser (SHARED_BROWSER, BROWSER_CDP_ENDPOINT) belongs to no single scrape and isn't
+measured.
+"""
+import os
+import threading
+
+BROWSER_RSS_LIMIT_MB = int(os.getenv('BROWSER_RSS_LIMIT_MB', '250'))  # PSS; below the sandbox's tree cap; 0 = measure only
+BROWSER_RSS_SAMPLE_SECONDS = float(os.getenv('BROWSER_RSS_SAMPLE_SECONDS', '1'))
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _parent_pids():
+    """{pid: parent pid} of every process in /proc."""
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                stat = f.read()
+        except OSError:
+            continue  # Exited while we looked
+        # "pid (comm) state ppid ...": comm may contain spaces or brackets, so split after the last ')'
+        parents[int(entry)] = int(stat[stat.rindex(')') + 2:].split()[1])
+    return parents
+
+
+def descendant_pids(pid):
+    """Pids of every process below `pid`."""
+    children = {}
+    for child, parent in _parent_pids().items():
+        children.setdefault(parent, []).append(child)
+    found, stack = [], list(children.get(pid, []))
+    while stack:
+        child = stack.pop()
+        found.append(child)
+        stack.extend(children.get(child, []))
+    return found
+
+
+def process_pss_bytes(pid):
+    """PSS of one process from /proc/<pid>/smaps_rollup (RSS from statm on kernels without it); 0 if gone."""
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    return int(line.split()[1]) * 1024
+        return 0
+    except FileNotFoundError:
+        pass  # Process gone, or a kernel before 4.14
+    except (OSError, ValueError):
+        return 0
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def tree_pss_bytes(pid):
+    """Summed PSS of `pid` and every process below it; 0 where /proc is missing."""
+    if not pid or not os.path.isdir('/proc'):
+        return 0
+    return sum(process_pss_bytes(p) for p in [pid] + descendant_pids(pid))
+
+
+def browser_pid(browser):
+    """Pid of a launched Chromium's main process (asked over CDP), or None if it can't be told."""
+    try:
+        cdp = browser.new_browser_cdp_session()
+        try:
+            processes = cdp.send('SystemInfo.getProcessInfo').get('processInfo', [])
+        finally:
+            cdp.detach()
+    except Exception as e:
+        print(f"Could not find the browser's process: {e}")
+        return None
+    pids = [p.get('id') for p in processes if p.get('type') == 'browser']
+    return pids[0] if pids else None
+
+
+class RssWatchdog:
+    """Samples a browser tree's PSS on a thread while a scrape runs; records the peak on `run_log`."""
+
+    def __init__(self, run_log=None, limit_mb=None, interval_seconds=None):
+        self.run_log = run_log
+        self.limit_mb = BROWSER_RSS_LIMIT_MB if limit_mb is None else limit_mb
+        self.interval_seconds = interval_seconds or BROWSER_RSS_SAMPLE_SECONDS
+        self.current_mb = 0.0
+        self.peak_mb = 0.0
+        self.relieved = 0
+        self.root_pid = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        """Measure now; returns the tree's PSS in MB."""
+        self.current_mb = tree_pss_bytes(self.root_pid) / (1024 * 1024)
+        self.peak_mb = max(self.peak_mb, self.current_mb)
+        return self.current_mb
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval_seconds)
+
+    def start(self, root_pid):
+        """Sample the process tree under `root_pid` (the browser's main process); None = don't measure."""
+        self.root_pid = root_pid
+        if root_pid is None:
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='rss-watchdog', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling and save the peak on the run log."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if self.root_pid is None:
+            print("Browser memory not measured (shared browser, or its process is unknown)")
+            return
+        if self.run_log is not None:
+            self.run_log.peak_rss_mb = round(self.peak_mb, 1)
+        print(f"Peak browser memory: {self.peak_mb:.0f} MB (PSS)"
+              + (f", over the {self.limit_mb} MB limit {self.relieved}x" if self.relieved else ''))
+
+    @property
+    def over_limit(self):
+        return bool(self.limit_mb) and self.root_pid is not None and self.current_mb > self.limit_mb
+
+    def relieve(self, page):
+        """Ask Chromium to free memory: critical memory pressure, a full GC, and an empty HTTP cache."""
+        try:
+            cdp = page.context.new_cdp_session(page)
+        except Exception as e:
+            print(f"Could not open a CDP session to free memory: {e}")
+            return
+        for method, params in (('Memory.simulatePressureNotification', {'level': 'critical'}),
+                               ('HeapProfiler.collectGarbage', None),
+                               ('Network.clearBrowserCache', None)):
+            try:
+                cdp.send(method, params) if params else cdp.send(method)
+            except Exception as e:
+                print(f"  {method}: {e}")
+        try:
+            cdp.detach()
+        except Exception:
+            pass
+
+    def should_stop(self, page):
+        """True if the browser is over the limit even after relieve(); call between days."""
+        if not self.over_limit:
+            return False
+        before = self.current_mb
+        self.relieve(page)
+        self.relieved += 1
+        if self.sample() <= self.limit_mb:
+            print(f"  Browser memory {before:.0f} MB was over {self.limit_mb} MB; freed to {self.current_mb:.0f} MB")
+            return False
+        print(f"  Browser memory still {self.current_mb:.0f} MB (limit {self.limit_mb} MB); keeping the days read so far")
+        return True
@@ -5,22 +5,30 @@ Flow: land on /book → set Where/What/date/Starting from → Search → See ava
 Slot states: "Book now" = available; "This slot is unavailable" or "available to be booked on" = not available.
 """
 import os
-import time
 import re
-from datetime import datetime, timedelta
-from playwright.sync_api import sync_playwright
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
 import sys
 
-# Month name to number for parsing "Thu 5th Feb"
-MONTH_NAMES = {
-    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
-    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
-}
 BOOKING_WINDOW_DAYS = 7  # Can book today + 6 more days (7 days in advance)
+# A timetable slot card: "Court N" followed by an "HH:MM - HH:MM" range
+SLOT_CARD_TEXT_SELECTOR = r"text=/Court\s+\d+[\s\S]*\d{1,2}:\d{2}\s*-\s*\d{1,2}:\d{2}/i"
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import init_db, get_session, Facility, CourtAvailability
+from database import init_db, get_session, Facility
+from scrapers.browser import scraper_browser, new_scraper_context
+from scrapers.waits import Waiter
+from scrapers.resolver import SelectorResolver
+from scrapers.routing import RequestPolicy
+from scrapers.date_range import ScrapeRange
+from scrapers.storage import store_availability
+from scrapers.har import BROWSER_ONLY, replay_today
+from scrapers.deadline import Deadline, DeadlineExceeded
+from scrapers.run_log import RunLog
+from scrapers.memory import RssWatchdog
+from scrapers.artifacts import DebugArtifacts
+from scrapers.payloads import TimetableEndpoint, fill_missing_dates
+from scrapers.gladstone import AvailabilityCapture, parse_availability_payload, parse_court_cards
 
 load_dotenv()
 
@@ -29,6 +37,9 @@ class OneLeisureStIvesScraper:
     """Scraper for One Leisure St Ives (GladstoneGo). Gets to timetable; timetable scraping TBD."""
 
     BASE_URL = "https://oneleisure.gladstonego.cloud/book"
+    WINDOW_DAYS = BOOKING_WINDOW_DAYS
+    # URL substrings the booking flow needs even though the request policy would block them
+    REQUEST_ALLOWLIST = ()
 
     # Filter values for the booking page
     WHERE_VALUE = "One Leisure St Ives Indoo"
@@ -51,46 +62,48 @@ class OneLeisureStIvesScraper:
         return facility
 
     def _today_dd_mm_yyyy(self):
-        return datetime.now().strftime("%d/%m/%Y")
+        return self.range.today.strftime("%d/%m/%Y")
 
-    def scrape(self):
-        """Navigate to book page, apply filters, open timetable via 'See available spaces'."""
+    def scrape(self, start_date=None, end_date=None, deadline=None):
+        """Navigate to book page, apply filters, open timetable via 'See available spaces'.
+
+        start_date/end_date narrow the scrape to part of the booking window. If the deadline
+        passes while days are being read, the days read so far are stored.
+        """
         print("Starting One Leisure St Ives scraper...")
+        self.range = ScrapeRange(self.WINDOW_DAYS, start_date, end_date, today=replay_today(self.facility.name))
+        self.deadline = deadline or Deadline()
+        self.stopped_early = False
+        self.run_log = RunLog()
+        self.memory = RssWatchdog(self.run_log)
+        print(f"Dates: {self.range} ({self.deadline})")
+        if not self.range.dates:
+            self.session.close()
+            return
 
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=self.headless,
-                args=["--disable-blink-features=AutomationControlled"],
-            )
-            context = browser.new_context(
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                viewport={"width": 1920, "height": 1080},
-                locale="en-GB",
-                timezone_id="Europe/London",
-                extra_http_headers={
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                    "Accept-Language": "en-GB,en;q=0.9",
-                },
-            )
+        with scraper_browser(self.headless, watchdog=self.memory) as browser:
+            self.requests = RequestPolicy(self.REQUEST_ALLOWLIST)
+            context = new_scraper_context(browser, request_policy=self.requests, recording=self.facility.name)
             page = context.new_page()
-            page.add_init_script(
-                "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-            )
+            self.artifacts = DebugArtifacts(self.facility.name)
+            self.artifacts.attach(context)
+            self.waits = Waiter(page, deadline=self.deadline)
+            self.capture = AvailabilityCapture(page)
+            self.selectors = SelectorResolver(self.session, self.facility.name, deadline=self.deadline)
+            self.api_headers = {}
 
             try:
                 # Step 1: Open book page (allow extra time on Render/slow envs)
+                self.run_log.begin("navigation", "search form")
                 print(f"Navigating to {self.BASE_URL}...")
-                page.goto(self.BASE_URL, wait_until="networkidle", timeout=60000)
-                time.sleep(3)
+                page.goto(self.BASE_URL, wait_until="domcontentloaded", timeout=self.deadline.ms(60000, "book page"))
                 # Wait for the booking form to be visible (SPA may load slowly on Render)
-                try:
-                    page.get_by_text("Where", exact=True).first.wait_for(state="visible", timeout=15000)
-                except Exception:
-                    try:
-                        page.get_by_placeholder(re.compile(r"location|where", re.I)).first.wait_for(state="visible", timeout=10000)
-                    except Exception:
-                        pass
-                time.sleep(1)
+                if not self.waits.locator(page.get_by_text("Where", exact=True).first, "booking form", timeout_ms=30000):
+                    self.waits.locator(
+                        page.get_by_placeholder(re.compile(r"location|where", re.I)).first,
+                        "booking form (placeholder)", timeout_ms=10000,
+                    )
+                self.waits.dom_quiet("booking form settled")
 
                 # Step 2: Set "Where" → One Leisure St Ives Indoo
                 print("Setting 'Where' to One Leisure St Ives Indoo...")
@@ -109,88 +122,62 @@ class OneLeisureStIvesScraper:
                 self._set_starting_from(page)
 
                 # Step 6: Click Search (if present) or wait for results
+                self.run_log.begin("navigation", "timetable")
                 self._submit_search(page)
 
                 # Step 7: Wait for results and click "See available spaces" (prefer Badminton)
                 self._open_timetable(page)
 
-                # Timetable page is now loaded; actual slot scraping will be added here
-                time.sleep(2)
+                # Timetable page is now loaded
+                self.waits.selector(SLOT_CARD_TEXT_SELECTOR, step="timetable cards", timeout_ms=20000)
                 print(f"Timetable URL: {page.url}")
-                page.screenshot(path="debug_one_leisure_timetable.png")
+                self.run_log.end()
+                self.artifacts.checkpoint(page, "timetable")
 
                 # Stub: extract and store availability from timetable (next phase)
                 availability = self._extract_availability_from_timetable(page)
-                if availability:
-                    self._store_availability(availability)
-                else:
+                if not availability:
                     print("No availability extracted yet (timetable scraping to be extended).")
-
+                    self.range.read.clear()  # No slots on any day: keep the stored rows rather than wipe them
+                self.range.keep_read()
+                if self.range.dates:
+                    with self.run_log.step("storage") as step:
+                        step["slots"] = self._store_availability(availability)
+
+                self.run_log.summary()
+                self.waits.summary()
+                self.requests.summary()
+                self.selectors.summary()
+                self.selectors.save()
                 print("One Leisure St Ives scraper finished (reached timetable).")
             except Exception as e:
                 print(f"Error during scraping: {e}")
-                page.screenshot(path="debug_one_leisure_error.png")
+                self.run_log.fail(e)
+                self.artifacts.failure(page, "error", e)
                 raise
             finally:
-                browser.close()
+                self.artifacts.finish(context)
+                context.close()
                 self.session.close()
 
     def _set_where(self, page):
         """Click the Where dropdown to open it, then select One Leisure St Ives Indoo."""
-        # Longer timeouts for Render/slow envs (SPA loads slowly headless)
-        wait_short, wait_long = 5000, 10000
-        where_clicked = False
         # GladstoneGo: Where field often has placeholder "Search for a location..."
-        try:
-            inp = page.get_by_placeholder(re.compile(r"Search for a location|location", re.I)).first
-            if inp.is_visible(timeout=wait_long):
-                inp.click()
-                where_clicked = True
-                print("Clicked Where (placeholder 'Search for a location').")
-        except Exception:
-            pass
-        if not where_clicked:
-            try:
-                cb = page.get_by_role("combobox", name=re.compile(r"Where", re.I)).first
-                if cb.is_visible(timeout=wait_long):
-                    cb.click()
-                    where_clicked = True
-                    print("Clicked Where combobox.")
-            except Exception:
-                pass
-        if not where_clicked:
-            try:
-                label = page.get_by_text("Where", exact=True).first
-                if label.is_visible(timeout=wait_long):
-                    parent = label.locator("xpath=ancestor::*[.//input or .//button or .//*[@role='combobox']][1]")
-                    if parent.count() > 0 and parent.first.is_visible(timeout=wait_short):
-                        parent.first.click()
-                        where_clicked = True
-                        print("Clicked Where (parent of label).")
-            except Exception:
-                pass
-        if not where_clicked:
-            try:
-                first_combobox = page.get_by_role("combobox").first
-                if first_combobox.is_visible(timeout=wait_long):
-                    first_combobox.click()
-                    where_clicked = True
-                    print("Clicked first combobox (Where).")
-            except Exception:
-                pass
-        if not where_clicked:
-            try:
-                block = page.get_by_text("Where", exact=True).locator("xpath=ancestor::*[contains(@class, 'filter') or contains(@class, 'field') or contains(@class, 'select')][1]")
-                if block.count() > 0 and block.first.is_visible(timeout=wait_long):
-                    block.first.click()
-                    where_clicked = True
-                    print("Clicked Where block.")
-            except Exception:
-                pass
-        if not where_clicked:
+        # (longer timeout for Render/slow envs: the SPA loads slowly headless)
+        where_label = page.get_by_text("Where", exact=True)
+        candidate, where = self.selectors.resolve("where dropdown", [
+            ("placeholder", page.get_by_placeholder(re.compile(r"Search for a location|location", re.I))),
+            ("combobox role", page.get_by_role("combobox", name=re.compile(r"Where", re.I))),
+            ("label parent", where_label.locator("xpath=ancestor::*[.//input or .//button or .//*[@role='combobox']][1]")),
+            ("first combobox", page.get_by_role("combobox")),
+            ("label block", where_label.locator("xpath=ancestor::*[contains(@class, 'filter') or contains(@class, 'field') or contains(@class, 'select')][1]")),
+        ], timeout_ms=10000)
+        if not where:
             raise Exception("Could not find or click the 'Where' dropdown")
+        where.first.click()
+        print(f"Clicked Where ({candidate}).")
 
-        time.sleep(1)
+        self.waits.selector("[role='option']", step="where options", timeout_ms=5000)
         # 2) Wait for dropdown options and click "One Leisure St Ives Indoo" (or partial match)
         option_clicked = False
         for option_text in [self.WHERE_VALUE, "One Leisure St Ives", "St Ives Indoo", "St Ives"]:
@@ -214,104 +201,66 @@ class OneLeisureStIvesScraper:
                     continue
         if not option_clicked:
             raise Exception("Could not select 'One Leisure St Ives Indoo' from Where dropdown")
-        time.sleep(0.5)
+        self.waits.dom_quiet("where selected")
 
     def _set_what(self, page):
         """Fill or select 'What are you looking to do' with Court Bookings."""
         what_label = "What are you looking to do"
-        for attempt in [
-            lambda: page.get_by_label(what_label, exact=False).first,
-            lambda: page.get_by_placeholder(what_label).first,
-            lambda: page.get_by_text(what_label, exact=False).locator("..").locator("input, [contenteditable]").first,
-        ]:
-            try:
-                el = attempt()
-                if el.is_visible(timeout=3000):
-                    el.click()
-                    time.sleep(0.5)
-                    el.fill("")
-                    el.fill(self.WHAT_VALUE)
-                    time.sleep(1)
-                    opt = page.get_by_text(self.WHAT_VALUE, exact=False).first
-                    if opt.is_visible(timeout=2000):
-                        opt.click()
-                    print("Set What successfully.")
-                    return
-            except Exception as e:
-                continue
-        raise Exception("Could not set 'What are you looking to do' field")
+        candidate, el = self.selectors.resolve("what field", [
+            ("label", page.get_by_label(what_label, exact=False)),
+            ("placeholder", page.get_by_placeholder(what_label)),
+            ("input near text", page.get_by_text(what_label, exact=False).locator("..").locator("input, [contenteditable]")),
+        ], timeout_ms=5000)
+        if not el:
+            raise Exception("Could not set 'What are you looking to do' field")
+        el = el.first
+        el.click()
+        el.fill("")
+        el.fill(self.WHAT_VALUE)
+        opt = page.get_by_text(self.WHAT_VALUE, exact=False).first
+        if self.waits.locator(opt, "what suggestions", timeout_ms=3000):
+            opt.click()
+        print(f"Set What successfully ({candidate}).")
 
     def _set_date(self, page):
         """Set 'What date' to today (DD/MM/YYYY)."""
         today_str = self._today_dd_mm_yyyy()
-        for attempt in [
-            lambda: page.get_by_label("What date", exact=False).first,
-            lambda: page.get_by_placeholder("date", exact=False).first,
-            lambda: page.locator('input[type="text"]').filter(has_text=re.compile(r"\d{2}/\d{2}/\d{4}")).first,
-            lambda: page.get_by_text("What date", exact=False).locator("..").locator("input").first,
-        ]:
-            try:
-                el = attempt()
-                if el.is_visible(timeout=3000):
-                    el.click()
-                    time.sleep(0.3)
-                    el.fill("")
-                    el.fill(today_str)
-                    time.sleep(0.5)
-                    print("Set date successfully.")
-                    return
-            except Exception:
-                continue
-        raise Exception("Could not set 'What date' field")
+        candidate, el = self.selectors.resolve("date field", [
+            ("label", page.get_by_label("What date", exact=False)),
+            ("placeholder", page.get_by_placeholder("date", exact=False)),
+            ("text input with date", page.locator('input[type="text"]').filter(has_text=re.compile(r"\d{2}/\d{2}/\d{4}"))),
+            ("input near text", page.get_by_text("What date", exact=False).locator("..").locator("input")),
+        ], timeout_ms=5000)
+        if not el:
+            raise Exception("Could not set 'What date' field")
+        el = el.first
+        el.click()
+        el.fill("")
+        el.fill(today_str)
+        self.waits.dom_quiet("date set")
+        print(f"Set date successfully ({candidate}).")
 
     def _set_starting_from(self, page):
         """Open the 'Starting from' dropdown and select the first (earliest) option. Non-fatal if it fails."""
         # 1) Click the "Starting from" dropdown to open it (same pattern as Where)
-        opened = False
-        try:
-            cb = page.get_by_role("combobox", name=re.compile(r"Starting from", re.I)).first
-            if cb.is_visible(timeout=3000):
-                cb.click()
-                opened = True
-                print("Clicked Starting from combobox.")
-        except Exception:
-            pass
-        if not opened:
-            try:
-                label = page.get_by_text("Starting from", exact=True).first
-                if label.is_visible(timeout=3000):
-                    parent = label.locator("xpath=ancestor::*[.//input or .//button or .//*[@role='combobox']][1]")
-                    if parent.count() > 0 and parent.first.is_visible(timeout=2000):
-                        parent.first.click()
-                        opened = True
-                        print("Clicked Starting from (parent of label).")
-            except Exception:
-                pass
-        if not opened:
-            try:
-                first_cb = page.get_by_role("combobox").all()
-                # "Starting from" is often the last or a later combobox; try the one that contains "Starting" in its accessible name
-                for cb in first_cb:
-                    if cb.is_visible(timeout=1000) and "starting" in (cb.get_attribute("aria-label") or cb.get_attribute("aria-labelledby") or "").lower():
-                        cb.click()
-                        opened = True
-                        print("Clicked Starting from (combobox by aria).")
-                        break
-            except Exception:
-                pass
-        if not opened:
-            try:
-                block = page.get_by_text("Starting from", exact=True).locator("xpath=ancestor::*[contains(@class, 'filter') or contains(@class, 'field') or contains(@class, 'select')][1]")
-                if block.count() > 0 and block.first.is_visible(timeout=3000):
-                    block.first.click()
-                    opened = True
-                    print("Clicked Starting from block.")
-            except Exception:
-                pass
-        if not opened:
+        starting_label = page.get_by_text("Starting from", exact=True)
+        candidate, dropdown = self.selectors.resolve("starting from dropdown", [
+            ("combobox role", page.get_by_role("combobox", name=re.compile(r"Starting from", re.I))),
+            ("label parent", starting_label.locator("xpath=ancestor::*[.//input or .//button or .//*[@role='combobox']][1]")),
+            # "Starting from" is often a later combobox; match on its aria label
+            ("combobox by aria", page.locator("[role='combobox'][aria-label*='starting' i], [role='combobox'][aria-labelledby*='starting' i]")),
+            ("label block", starting_label.locator("xpath=ancestor::*[contains(@class, 'filter') or contains(@class, 'field') or contains(@class, 'select')][1]")),
+        ], timeout_ms=3000)
+        if not dropdown:
             print("Warning: Could not open 'Starting from' dropdown; continuing to Search.")
             return
-        time.sleep(1)
+        try:
+            dropdown.first.click()
+            print(f"Clicked Starting from ({candidate}).")
+        except Exception as e:
+            print(f"Warning: Could not open 'Starting from' dropdown ({e}); continuing to Search.")
+            return
+        self.waits.selector("[role='option'], [role='listbox'], [role='menu']", step="starting from options", timeout_ms=5000)
         # 2) Select the first (earliest) option in the list instead of relying on "Starting now"
         option_clicked = False
         try:
@@ -334,7 +283,7 @@ class OneLeisureStIvesScraper:
                 pass
         if not option_clicked:
             print("Warning: Could not select an option in 'Starting from'; continuing to Search.")
-        time.sleep(0.5)
+        self.waits.dom_quiet("starting from selected")
 
     def _submit_search(self, page):
         """Click the Search button (not 'Clear filters') to load results on the right, then wait for results."""
@@ -364,20 +313,14 @@ class OneLeisureStIvesScraper:
                 continue
         if not search_clicked:
             print("Warning: Search button not found; waiting for results anyway.")
-        time.sleep(2)
-        page.wait_for_load_state("networkidle", timeout=15000)
         # Wait for results panel: "See available spaces" or "Badminton" should appear on the right
-        try:
-            page.get_by_text("See available spaces", exact=False).first.wait_for(state="visible", timeout=15000)
+        if self.waits.locator(page.get_by_text("See available spaces", exact=False).first, "search results", timeout_ms=30000):
             print("Results loaded (See available spaces visible).")
-        except Exception:
-            try:
-                page.get_by_text("Badminton", exact=False).first.wait_for(state="visible", timeout=5000)
-                print("Results loaded (Badminton card visible).")
-            except Exception:
-                if not search_clicked:
-                    raise Exception("Search button was not clicked and results did not appear. Cannot proceed to timetable.")
-        time.sleep(1)
+        elif self.waits.locator(page.get_by_text("Badminton", exact=False).first, "search results (badminton)", timeout_ms=5000):
+            print("Results loaded (Badminton card visible).")
+        elif not search_clicked:
+            raise Exception("Search button was not clicked and results did not appear. Cannot proceed to timetable.")
+        self.waits.dom_quiet("search results settled")
 
     def _open_timetable(self, page):
         """Click 'See available spaces' — prefer Badminton Court card."""
@@ -393,8 +336,7 @@ class OneLeisureStIvesScraper:
                 if btn.is_visible(timeout=2000):
                     btn.click()
                     print("Clicked 'See available spaces' on Badminton card.")
-                    page.wait_for_load_state("networkidle", timeout=15000)
-                    time.sleep(2)
+                    self.waits.settled("open timetable", timeout_ms=15000)
                     return
         except Exception as e:
             print(f"Badminton card not found: {e}")
@@ -408,39 +350,101 @@ class OneLeisureStIvesScraper:
             raise Exception("Could not find 'See available spaces' button")
         first_btn.click()
         print("Clicked first 'See available spaces'.")
-        page.wait_for_load_state("networkidle", timeout=15000)
-        time.sleep(2)
+        self.waits.settled("open timetable", timeout_ms=15000)
 
     def _extract_availability_from_timetable(self, page):
-        """Extract slots from the timetable grid for the 7-day booking window only."""
-        today = datetime.now().date()
-        dates_to_scrape = [today + timedelta(days=i) for i in range(BOOKING_WINDOW_DAYS)]
+        """Extract slots for the scrape's dates within the 7-day booking window.
+
+        Each day comes from the availability API when possible (the response captured while the
+        timetable opened, or the same endpoint called for that date), else from the grid on screen.
+        """
+        dates_to_scrape = self.range.dates
         all_slots = []
+        captured = self.capture.availability()
+        endpoint = None
 
         for target_date in dates_to_scrape:
+            if self.memory.should_stop(page):
+                self.stopped_early = True
+                break
             date_str = target_date.strftime("%Y-%m-%d")
-            day_name = target_date.strftime("%A")
-            day_num = target_date.day
-            month_abbr = target_date.strftime("%b").lower()  # e.g. "feb"
-
-            # Select this date in the calendar (click the day cell, e.g. "THU 5" or "5")
-            if not self._select_timetable_date(page, target_date, day_num, month_abbr):
+            endpoint = endpoint or self._availability_endpoint()
+            day_slots = [s for s in captured if s["date"] == date_str] or None
+            source = "api"
+            step = self.run_log.begin("date", "day", date_str)
+            try:
+                if day_slots is None and endpoint and not BROWSER_ONLY:  # page.request is not in a HAR
+                    day_slots = self._fetch_day_from_api(page, endpoint, target_date)
+                if day_slots is None:
+                    source = "grid"
+                    day_slots = self._scrape_day_from_grid(page, target_date)
+            except DeadlineExceeded as e:
+                self.run_log.end(error=e)
+                print(f"  Scrape deadline passed at {date_str}; keeping the days read so far")
+                self.stopped_early = True
+                break
+            step["name"] = f"day ({source})"
+            if day_slots is None:
+                self.run_log.end(error="Could not select date")
                 print(f"  Could not select date {date_str}, skipping.")
                 continue
-            time.sleep(1)
-            page.wait_for_load_state("networkidle", timeout=10000)
-
-            # Scroll to load all time slots (down) and all courts (right, for Court 6)
-            self._scroll_timetable_grid(page)
-            time.sleep(0.5)
-
-            # Find all slot cards and parse (use date from card text when present so we're correct even if calendar didn't change)
-            day_slots = self._parse_timetable_cards_for_date(page, date_str, day_name, target_date=target_date)
+            step["slots"] = len(day_slots)
+            self.run_log.end()
             all_slots.extend(day_slots)
-            print(f"  {date_str}: {len(day_slots)} slots ({sum(1 for s in day_slots if s['is_available'])} available)")
+            self.range.mark_read(target_date)
+            print(f"  {date_str}: {len(day_slots)} slots ({sum(1 for s in day_slots if s['is_available'])} available, {source})")
 
         return all_slots
 
+    def _availability_endpoint(self):
+        """Endpoint (with the date in its query) of a captured single-day availability response, if any."""
+        for url, day in self.capture.timetable_urls:
+            endpoint = TimetableEndpoint.from_capture(url, day)
+            if endpoint:
+                self.api_headers = self.capture.request_headers.get(url, {})
+                print(f"Using availability API: {urlsplit(url).path} (date in {', '.join(endpoint.date_params)})")
+                return endpoint
+        return None
+
+    def _fetch_day_from_api(self, page, endpoint, target_date):
+        """One day's slots from the availability API (same cookies/headers as the SPA); None on failure."""
+        try:
+            response = page.request.get(endpoint.url_for(target_date), headers=self.api_headers,
+                                        timeout=self.deadline.ms(15000, f"API {target_date}"))
+            if not response.ok:
+                print(f"  API {target_date}: status {response.status}")
+                return None
+            slots = parse_availability_payload(response.json())
+        except DeadlineExceeded:
+            raise  # The caller stops; falling back to the grid would run past the deadline
+        except Exception as e:
+            print(f"  API {target_date}: {e}")
+            return None
+        slots = [s for s in slots if s["date"] in (target_date.strftime("%Y-%m-%d"), None)]
+        return fill_missing_dates(slots, target_date)
+
+    def _scrape_day_from_grid(self, page, target_date):
+        """Select the day in the calendar and read it (from the response it triggers, else the cards)."""
+        date_str = target_date.strftime("%Y-%m-%d")
+        day_name = target_date.strftime("%A")
+        day_num = target_date.day
+        month_abbr = target_date.strftime("%b").lower()  # e.g. "feb"
+
+        # Select this date in the calendar (click the day cell, e.g. "THU 5" or "5")
+        self.capture.clear()
+        if not self._select_timetable_date(page, target_date, day_num, month_abbr):
+            return None
+        self.waits.settled(f"{date_str} grid", timeout_ms=10000)
+        day_slots = [s for s in self.capture.availability() if s["date"] in (date_str, None)]
+        if day_slots:
+            return fill_missing_dates(day_slots, target_date)
+
+        # Scroll to load all time slots (down) and all courts (right, for Court 6)
+        self._scroll_timetable_grid(page)
+
+        # Read all slot cards and parse them (the date on a card wins, in case the calendar didn't change)
+        return parse_court_cards(self._timetable_card_texts(page), date_str, day_name, target_date=target_date)
+
     def _select_timetable_date(self, page, target_date, day_num, month_abbr):
         """Click the calendar day cell for the given date (e.g. THU 5 in February)."""
         day_pattern = re.compile(rf"(?:MON|TUE|WED|THU|FRI|SAT|SUN)\s+{day_num}\b", re.I)
@@ -449,8 +453,7 @@ class OneLeisureStIvesScraper:
                 has_text=day_pattern
             ).first
             if day_cell.is_visible(timeout=3000):
-                day_cell.click()
-                time.sleep(1.5)  # Let grid update before parsing
+                day_cell.click()  # Caller waits for the grid to update before parsing
                 return True
         except Exception:
             pass
@@ -458,7 +461,6 @@ class OneLeisureStIvesScraper:
             day_cell = page.get_by_text(re.compile(rf"^{day_num}$"), exact=False).first
             if day_cell.is_visible(timeout=2000):
                 day_cell.click()
-                time.sleep(1.5)
                 return True
         except Exception:
             pass
@@ -466,148 +468,62 @@ class OneLeisureStIvesScraper:
 
     def _scroll_timetable_grid(self, page):
         """Scroll down to load all time slots and right to load Court 6."""
+        # After each wheel step, wait only until the virtualised grid stops re-rendering
+        quiet = dict(quiet_ms=150, timeout_ms=1000)
         try:
             # Scroll main content down (multiple steps to load all hours)
             for _ in range(4):
                 page.mouse.wheel(0, 400)
-                time.sleep(0.2)
+                self.waits.dom_quiet("scroll down", **quiet)
             # Scroll back up so we can parse from top
             for _ in range(4):
                 page.mouse.wheel(0, -400)
-                time.sleep(0.2)
+                self.waits.dom_quiet("scroll up", **quiet)
             # Scroll right to reveal Court 6
             page.mouse.wheel(300, 0)
-            time.sleep(0.3)
+            self.waits.dom_quiet("scroll right", **quiet)
             page.mouse.wheel(-300, 0)
-            time.sleep(0.2)
+            self.waits.dom_quiet("scroll left", **quiet)
         except Exception:
             pass
 
-    def _parse_date_from_card_text(self, text, target_date=None):
-        """Parse 'Thu 5th Feb' or '5th Feb' from card text; return (date_str, day_name) or (None, None)."""
-        year = target_date.year if target_date else datetime.now().year
-        m = re.search(
-            r"(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun)\s+(\d+)(?:st|nd|rd|th)?\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\b",
-            text, re.I
-        )
-        if not m:
-            m = re.search(r"\b(\d+)(?:st|nd|rd|th)?\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\b", text, re.I)
-        if m:
-            day_num = int(m.group(1))
-            month_abbr = m.group(2).lower()[:3]
-            month = MONTH_NAMES.get(month_abbr)
-            if month:
-                # Year rollover: if card says Jan and we're scraping in Dec, use next year
-                if month == 1 and target_date and target_date.month == 12:
-                    year = target_date.year + 1
-                try:
-                    d = datetime(year, month, day_num).date()
-                    return d.strftime("%Y-%m-%d"), d.strftime("%A")
-                except ValueError:
-                    pass
-        return None, None
-
-    def _parse_timetable_cards_for_date(self, page, date_str, day_name, target_date=None):
-        """Find all slot cards in the grid and parse court, time, availability. Use date from card text when present."""
-        slots = []
-        year = target_date.year if target_date else datetime.now().year
-        # Cards contain: "Court N", "HH:MM - HH:MM", "Thu 5th Feb", and either "Book now" or "unavailable" or "available to be booked"
+    def _timetable_card_texts(self, page):
+        """Texts of the visible slot cards (Court N + HH:MM - HH:MM) in the timetable grid."""
         card_selectors = [
             page.locator("[class*='card'], [class*='slot'], [class*='cell']").filter(
                 has_text=re.compile(r"Court\s+\d+", re.I)
             ).filter(has_text=re.compile(r"\d{1,2}:\d{2}\s*-\s*\d{1,2}:\d{2}")),
             page.locator("[class*='slot']").filter(has_text=re.compile(r"Court\s+\d+", re.I)),
         ]
-        cards = []
+        texts = []
         for sel in card_selectors:
             try:
                 for el in sel.all():
                     if el.is_visible(timeout=300):
-                        cards.append(el)
-                if cards:
-                    break
+                        texts.append(el.inner_text())
+                if texts:
+                    return texts
             except Exception:
                 continue
-        if not cards:
-            # Fallback: any element that has Court + time range + one of the status phrases
-            try:
-                candidates = page.locator("div, article, section").filter(
-                    has_text=re.compile(r"Court\s+\d+.*\d{1,2}:\d{2}\s*-\s*\d{1,2}:\d{2}", re.S)
-                ).all()
-                for el in candidates:
-                    try:
-                        t = el.inner_text()
-                        if len(t) > 500:
-                            continue
-                        if re.search(r"Court\s+\d+", t, re.I) and re.search(r"\d{1,2}:\d{2}\s*-\s*\d{1,2}:\d{2}", t):
-                            cards.append(el)
-                    except Exception:
-                        continue
-            except Exception:
-                pass
-
-        seen = set()
-        for card in cards:
-            try:
-                text = card.inner_text()
-                # Use date from card text ("Thu 5th Feb") when present so we're correct even if calendar didn't change
-                slot_date_str, slot_day_name = self._parse_date_from_card_text(text, target_date=target_date)
-                if slot_date_str is None:
-                    slot_date_str, slot_day_name = date_str, day_name
-                # Court: "Court 1" .. "Court 6"
-                court_m = re.search(r"Court\s+(\d+)", text, re.I)
-                if not court_m:
-                    continue
-                court_num = court_m.group(1)
-                court_label = f"Court {court_num}"
-                # Time: "15:00 - 16:00"
-                time_m = re.search(r"(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})", text)
-                if not time_m:
-                    continue
-                start_time = f"{int(time_m.group(1)):02d}:{time_m.group(2)}"
-                end_time = f"{int(time_m.group(3)):02d}:{time_m.group(4)}"
-                key = (slot_date_str, court_label, start_time)
-                if key in seen:
+        # Fallback: any small element with Court + time range (parse_court_cards checks both)
+        try:
+            candidates = page.locator("div, article, section").filter(
+                has_text=re.compile(r"Court\s+\d+.*\d{1,2}:\d{2}\s*-\s*\d{1,2}:\d{2}", re.S)
+            ).all()
+            for el in candidates:
+                try:
+                    t = el.inner_text()
+                    if len(t) <= 500:
+                        texts.append(t)
+                except Exception:
                     continue
-                seen.add(key)
-                # Availability: bookable if we see Book now/Book/Available (GladstoneGo varies); not if explicitly unavailable
-                has_bookable = bool(
-                    re.search(r"Book\s+now|Book\b|Available", text, re.I)
-                    and not re.search(r"available to be booked on", text, re.I)
-                )
-                has_unavailable = bool(
-                    re.search(r"unavailable|available to be booked on|This slot is", text, re.I)
-                )
-                is_available = has_bookable or (not has_unavailable)
-                slots.append({
-                    "date": slot_date_str,
-                    "day_name": slot_day_name,
-                    "start_time": start_time,
-                    "end_time": end_time,
-                    "court_number": court_label,
-                    "is_available": is_available,
-                })
-            except Exception:
-                continue
-        return slots
+        except Exception:
+            pass
+        return texts
 
     def _store_availability(self, availability):
-        """Store availability in DB (same shape as other scrapers)."""
-        self.session.query(CourtAvailability).filter_by(facility_id=self.facility.id).delete()
-        for slot in availability:
-            record = CourtAvailability(
-                facility_id=self.facility.id,
-                date=slot["date"],
-                day_name=slot.get("day_name"),
-                start_time=slot["start_time"],
-                end_time=slot["end_time"],
-                court_number=slot.get("court_number", "Court 1"),
-                is_available=slot["is_available"],
-                scraped_at=datetime.utcnow(),
-            )
-            self.session.add(record)
-        self.session.commit()
-        print(f"Stored {len(availability)} availability records.")
+        """Store availability data in the database (only the slots that changed)."""
+        return store_availability(self.session, self.facility.id, self.range, availability)["slots"]
 
 
 if __name__ == "__main__":
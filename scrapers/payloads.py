@@ -0,0 +1,211 @@
+"""Reading availability out of the JSON that booking sites fetch for their own pages.
+
+Booking sites (Legend, GladstoneGo) load their timetables as JSON. Rather than depend on one
+exact schema, parsers walk every object in a payload and pick out the fields that look like a
+slot; the helpers here do the key matching and time parsing they share.
+"""
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, parse_qsl, urlencode, urlunsplit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapers.state import site_key, load_state, save_state, delete_state
+
+try:
+    from zoneinfo import ZoneInfo
+    LONDON = ZoneInfo('Europe/London')
+except Exception:  # No tz database on this system: fall back to the machine's local time
+    LONDON = None
+
+ASPNET_DATE = re.compile(r'/Date\((-?\d+)')
+CLOCK_TIME = re.compile(r'(?:T|\b)(\d{1,2}):(\d{2})')
+ISO_DATE = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+
+
+def normalized(record):
+    """The object's keys lower-cased with '_' removed, so 'Start_Time' and 'startTime' match."""
+    return {str(k).replace('_', '').lower(): v for k, v in record.items()}
+
+
+def first_value(record, keys):
+    """Value of the first of `keys` that is present and not empty."""
+    for key in keys:
+        if record.get(key) not in (None, ''):
+            return record[key]
+    return None
+
+
+def parse_when(value):
+    """(date or None, 'HH:MM' or None) from '07:00', '2026-02-10T07:00:00' or ASP.NET '/Date(ms)/'."""
+    if value is None or isinstance(value, bool):
+        return None, None
+    text = str(value)
+    m = ASPNET_DATE.search(text)
+    if m:
+        when = datetime.fromtimestamp(int(m.group(1)) / 1000, tz=timezone.utc)
+        when = when.astimezone(LONDON) if LONDON else when.astimezone()
+        return when.date(), when.strftime('%H:%M')
+    if ISO_DATE.match(text):
+        try:
+            when = datetime.fromisoformat(text.replace('Z', '+00:00'))
+            if when.tzinfo is not None:  # UTC/offset timestamps: use the venue's wall-clock time
+                when = when.astimezone(LONDON) if LONDON else when.astimezone()
+            return when.date(), when.strftime('%H:%M') if len(text) > 10 else None
+        except ValueError:
+            pass
+    day = None
+    d = ISO_DATE.search(text)
+    if d:
+        day = datetime(int(d.group(1)), int(d.group(2)), int(d.group(3))).date()
+    t = CLOCK_TIME.search(text[d.end():] if d else text)
+    clock = f"{int(t.group(1)):02d}:{t.group(2)}" if t else None
+    return day, clock
+
+
+def walk_objects(payload):
+    """Every dict in a JSON payload, outermost first."""
+    if isinstance(payload, dict):
+        yield payload
+        for value in payload.values():
+            yield from walk_objects(value)
+    elif isinstance(payload, list):
+        for item in payload:
+            yield from walk_objects(item)
+
+
+def fill_missing_dates(availability, viewing_date):
+    """Give rows without a date (payload had none) the date being viewed."""
+    for slot in availability:
+        if slot['date'] is None:
+            slot['date'] = viewing_date.strftime('%Y-%m-%d')
+            slot['day_name'] = viewing_date.strftime('%A')
+    return availability
+
+
+class JsonResponseCapture:
+    """Keeps the JSON xhr/fetch responses a page receives from one site and parses them on demand.
+
+    Responses are only collected in the event handler; bodies are read later in availability(),
+    from the scraper's own flow. `parser(payload, **kwargs)` returns availability rows.
+    """
+
+    def __init__(self, page, host_pattern, parser):
+        self.host_pattern = host_pattern
+        self.parser = parser
+        self.responses = []
+        self.returned = set()  # (date, start, court) already handed out, for payloads spanning days
+        self.timetable_urls = []  # (url, date) of responses that held a single day's slots
+        self.request_headers = {}  # url -> headers the page sent, for calling the same endpoint again
+        page.on('response', self._on_response)
+
+    def _on_response(self, response):
+        if response.request.resource_type not in ('xhr', 'fetch'):
+            return
+        if self.host_pattern not in response.url:
+            return
+        if 'json' not in response.headers.get('content-type', ''):
+            return
+        self.responses.append(response)
+
+    def clear(self):
+        """Forget responses seen so far (call before loading the next day)."""
+        self.responses = []
+
+    def availability(self, **parser_kwargs):
+        """Slot rows parsed from the captured responses (empty if none looked like a timetable).
+
+        Dated rows already returned for an earlier day are left out.
+        """
+        availability = []
+        for response in self.responses:
+            try:
+                payload = response.json()
+            except Exception:
+                continue
+            slots = self.parser(payload, **parser_kwargs)
+            dates = {slot['date'] for slot in slots}
+            if len(dates) == 1 and None not in dates:
+                self.timetable_urls.append((response.url, dates.pop()))
+                self.request_headers[response.url] = response.request.headers
+            for slot in slots:
+                key = (slot['date'], slot['start_time'], slot['court_number'])
+                if slot['date'] is not None and key in self.returned:
+                    continue
+                self.returned.add(key)
+                availability.append(slot)
+        return availability
+
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%Y/%m/%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%S.%fZ',
+                '%Y-%m-%dT%H:%M:%SZ', '%d %b %Y')
+
+
+class TimetableEndpoint:
+    """A timetable URL whose date query values (`date_params`) are swapped for the day wanted."""
+
+    KIND = 'timetable_endpoint'
+
+    def __init__(self, url, date_params, date_format):
+        self.url = url
+        self.date_params = list(date_params)
+        self.date_format = date_format
+
+    @classmethod
+    def from_capture(cls, url, day):
+        """Endpoint for a captured timetable URL, if its query carries `day` ('YYYY-MM-DD').
+
+        Every parameter holding that day in the first matching format is swapped (e.g. both
+        dateFrom and dateTo).
+        """
+        target = datetime.strptime(day, '%Y-%m-%d').date()
+        query = parse_qsl(urlsplit(url).query, keep_blank_values=True)
+        for fmt in DATE_FORMATS:
+            params = []
+            for name, value in query:
+                try:
+                    if datetime.strptime(value, fmt).date() == target:
+                        params.append(name)
+                except ValueError:
+                    continue
+            if params:
+                return cls(url, params, fmt)
+        return None
+
+    def url_for(self, day):
+        """The URL for another day; any time of day in the date values is kept."""
+        def swap(value):
+            when = datetime.strptime(value, self.date_format)
+            return when.replace(year=day.year, month=day.month, day=day.day).strftime(self.date_format)
+
+        parts = urlsplit(self.url)
+        query = [(name, swap(value) if name in self.date_params else value)
+                 for name, value in parse_qsl(parts.query, keep_blank_values=True)]
+        return urlunsplit(parts._replace(query=urlencode(query, safe='/:')))
+
+    @classmethod
+    def load(cls, db_session, site_url):
+        payload, _ = load_state(db_session, site_key(site_url), cls.KIND)
+        if not payload:
+            return None
+        return cls(payload['url'], payload['date_params'], payload['date_format'])
+
+    def save(self, db_session, site_url):
+        save_state(db_session, site_key(site_url), self.KIND,
+                   {'url': self.url, 'date_params': self.date_params, 'date_format': self.date_format})
+
+    @classmethod
+    def learn(cls, db_session, site_url, capture):
+        """Save the endpoint from a JsonResponseCapture's dated timetable responses, if one fits."""
+        for url, day in capture.timetable_urls:
+            endpoint = cls.from_capture(url, day)
+            if endpoint:
+                endpoint.save(db_session, site_url)
+                print(f"Learned timetable endpoint: {urlsplit(url).path} (date in {', '.join(endpoint.date_params)})")
+                return endpoint
+        return None
+
+    @classmethod
+    def forget(cls, db_session, site_url):
+        delete_state(db_session, site_key(site_url), cls.KIND)
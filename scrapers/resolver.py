@@ -0,0 +1,87 @@
+"""Find the element for a scraper step among several candidate locators, quickly.
+
+Scrapers keep lists of fallback locators because the booking sites' markup drifts. Trying them
+one by one with is_visible(timeout=...) costs the full timeout for every miss. The resolver
+instead waits once for whichever candidate becomes visible first (all candidates combined with
+Locator.or_ into a single wait), remembers per facility and step which candidate won
+(scraper_state, kind 'selector_cache'), and checks that one first next time.
+"""
+import os
+import time
+import sys
+from functools import reduce
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapers.state import load_state, save_state
+from scrapers.deadline import Deadline
+
+
+class SelectorResolver:
+    """Candidate resolution with a learned winner per step for one facility."""
+
+    KIND = 'selector_cache'
+    DEFAULT_TIMEOUT_MS = 10000
+
+    def __init__(self, db_session, facility_name, deadline=None):
+        self.db_session = db_session
+        self.site = facility_name
+        self.deadline = deadline or Deadline()
+        self.cache, _ = load_state(db_session, self.site, self.KIND)
+        self.cache = self.cache or {}
+        self.changed = False
+        self.steps = []  # (step, seconds, outcome) with outcome 'hit', 'miss' or 'none'
+
+    def resolve(self, step, candidates, timeout_ms=None):
+        """Return (name, visible matches) of the first visible candidate, or (None, None).
+
+        `candidates` is a list of (name, Locator); names must be stable between runs since they
+        are what gets cached. The cached winner is checked first without waiting; otherwise the
+        visible matches of all candidates are raced in one wait, and the winner is picked in
+        order (cached first). The wait is capped to what is left of the scrape's deadline.
+        """
+        timeout = self.deadline.ms(timeout_ms or self.DEFAULT_TIMEOUT_MS, step)
+        started = time.monotonic()
+        cached = self.cache.get(step)
+        ordered = sorted(candidates, key=lambda c: c[0] != cached)
+        winner = self._visible(ordered[:1]) if cached else None
+        if winner is None:
+            try:
+                visible = [locator.locator('visible=true') for _, locator in ordered]
+                combined = reduce(lambda a, b: a.or_(b), visible)
+                combined.first.wait_for(state='visible', timeout=timeout)
+            except Exception:
+                pass  # Timed out: nothing visible (checked once more below)
+            winner = self._visible(ordered)
+        outcome = 'none' if winner is None else ('hit' if winner[0] == cached else 'miss')
+        if outcome == 'miss':
+            self.cache[step] = winner[0]
+            self.changed = True
+        self.steps.append((step, time.monotonic() - started, outcome))
+        return winner or (None, None)
+
+    def _visible(self, candidates):
+        """(name, visible matches) of the first candidate with a visible match, without waiting."""
+        for name, locator in candidates:
+            visible = locator.locator('visible=true')
+            try:
+                if visible.first.is_visible():
+                    return name, visible
+            except Exception:
+                continue
+        return None
+
+    def save(self):
+        """Persist the winners learned in this run."""
+        if self.changed:
+            save_state(self.db_session, self.site, self.KIND, self.cache)
+            self.changed = False
+
+    def summary(self):
+        """Print time per step and the cache hit rate (misses mean the page layout moved)."""
+        if not self.steps:
+            return
+        hits = sum(1 for _, _, outcome in self.steps if outcome == 'hit')
+        print(f"Selectors: {hits}/{len(self.steps)} cache hits")
+        for step, seconds, outcome in self.steps:
+            winner = self.cache.get(step, '-') if outcome != 'none' else 'not found'
+            print(f"  {seconds:5.2f}s {outcome:4}  {step}: {winner}")
@@ -0,0 +1,130 @@
+"""Request routing for scraper browser contexts: skip what the scrapers never read.
+
+Scrapers only read timetable text, so images, media, fonts and third-party trackers are aborted
+before they are requested. Each facility can allowlist URLs its booking flow needs, and
+bot-check/captcha hosts are never blocked. Set SCRAPER_BLOCK_RESOURCES=false to load pages in
+full (the report then shows the unblocked baseline).
+
+A blocked request is never fetched, so its size is unknown. The bytes saved are estimated as the
+number of blocked requests times an average size for their kind. The average is measured when the
+same scrape loaded some requests of that kind (e.g. an allowlisted image); otherwise it is a typical
+size from ESTIMATED_BYTES.
+"""
+import os
+from urllib.parse import urlsplit
+
+SCRAPER_BLOCK_RESOURCES = os.getenv('SCRAPER_BLOCK_RESOURCES', 'true').lower() == 'true'
+
+BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font'})
+TRACKER_HOSTS = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'googleadservices.com',
+    'googlesyndication.com',
+    'doubleclick.net',
+    'facebook.net',
+    'facebook.com',
+    'hotjar.com',
+    'clarity.ms',
+    'bat.bing.com',
+    'licdn.com',
+    'tiktok.com',
+)
+# Typical transfer size per blocked kind, used when the scrape measured none of that kind itself
+ESTIMATED_BYTES = {
+    'image': 40 * 1024,
+    'media': 300 * 1024,
+    'font': 30 * 1024,
+    'tracker': 25 * 1024,
+}
+# Login and bot checks must always work, whatever else is blocked
+ALWAYS_ALLOWED = (
+    'recaptcha',
+    'hcaptcha.com',
+    'challenges.cloudflare.com',
+)
+
+
+def _host_matches(host, domains):
+    return any(host == d or host.endswith('.' + d) for d in domains)
+
+
+def _blockable_kind(url, resource_type):
+    """The kind of request the policy blocks ('image', 'font', 'tracker', ...), ignoring allowlists."""
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return resource_type
+    if _host_matches(urlsplit(url).hostname or '', TRACKER_HOSTS):
+        return 'tracker'
+    return None
+
+
+class RequestPolicy:
+    """Aborts unneeded requests in a browser context; counts what was blocked, loaded and (roughly) saved."""
+
+    def __init__(self, allowlist=(), enabled=None):
+        self.allowlist = tuple(allowlist)
+        self.enabled = SCRAPER_BLOCK_RESOURCES if enabled is None else enabled
+        self.blocked = {}  # reason -> count
+        self.loaded_requests = 0
+        self.loaded_bytes = 0
+        self.blockable = {}  # reason -> [requests, bytes] of loaded responses of a blockable kind
+
+    def block_reason(self, url, resource_type):
+        """Why a request should be aborted ('image', 'font', 'tracker', ...), or None to let it through."""
+        if any(pattern in url for pattern in ALWAYS_ALLOWED + self.allowlist):
+            return None
+        return _blockable_kind(url, resource_type)
+
+    def attach(self, context):
+        """Route every request of `context` through this policy."""
+        if self.enabled:
+            context.route('**/*', self._route)
+        context.on('response', self._on_response)
+
+    def _route(self, route):
+        request = route.request
+        reason = self.block_reason(request.url, request.resource_type)
+        if reason is None:
+            route.fallback()  # On to the network, or to a HAR replay route if there is one
+            return
+        self.blocked[reason] = self.blocked.get(reason, 0) + 1
+        route.abort('blockedbyclient')
+
+    def _on_response(self, response):
+        self.loaded_requests += 1
+        try:
+            size = int(response.headers.get('content-length', 0))
+        except ValueError:
+            return
+        self.loaded_bytes += size
+        reason = _blockable_kind(response.url, response.request.resource_type)
+        if reason is not None and size:  # Allowlisted, or blocking is off: a measured size for the estimate
+            seen = self.blockable.setdefault(reason, [0, 0])
+            seen[0] += 1
+            seen[1] += size
+
+    def average_bytes(self, reason):
+        """Average size of one `reason` request: measured in this scrape if possible, else ESTIMATED_BYTES."""
+        requests, size = self.blockable.get(reason, (0, 0))
+        if requests:
+            return size / requests
+        return ESTIMATED_BYTES.get(reason, 0)
+
+    @property
+    def saved_bytes(self):
+        """Estimated bytes not downloaded because of blocking."""
+        return sum(count * self.average_bytes(reason) for reason, count in self.blocked.items())
+
+    def summary(self):
+        """Print how many requests were blocked (by reason), the estimated bytes saved, and what was loaded."""
+        blocked_total = sum(self.blocked.values())
+        loaded = f"loaded {self.loaded_requests} ({self.loaded_bytes / 1024:.0f} KB)"
+        if not self.enabled:
+            blockable = sum(requests for requests, _ in self.blockable.values())
+            blockable_kb = sum(size for _, size in self.blockable.values()) / 1024
+            print(f"Requests: blocking disabled, {loaded}, of which {blockable} "
+                  f"({blockable_kb:.0f} KB) were images, media, fonts or trackers")
+            return
+        reasons = ', '.join(f"{reason} {count}" for reason, count in sorted(self.blocked.items()))
+        print(f"Requests: blocked {blocked_total}" + (f" ({reasons})" if reasons else '')
+              + f", ~{self.saved_bytes / 1024:.0f} KB saved (estimated), {loaded}")
@@ -0,0 +1,63 @@
+"""Timed steps of one scrape, kept by the scraper and saved by ScraperManager (scrape_history.py).
+
+Steps are the coarse phases of a run: login, navigation to the timetable, each date read, and
+storage. Long phases are marked with begin() (each step runs until the next one begins); short
+blocks use the step() context manager. Waiter timings stay the detailed per-wait view printed at
+the end of a scrape.
+"""
+import time
+from contextlib import contextmanager
+
+
+class RunLog:
+    """Steps of one scrape, each a dict with kind, name, date, seconds, ok, slots and error."""
+
+    def __init__(self):
+        self.steps = []
+        self.peak_rss_mb = None  # Browser memory peak, set by the RssWatchdog (scrapers/memory.py)
+        self._open = None  # (record, started) of the step begun and not yet ended
+
+    def begin(self, kind, name=None, date=None):
+        """End the open step (if any) and start timing a new one; returns its record."""
+        self.end()
+        record = {'kind': kind, 'name': name or kind, 'date': date, 'seconds': None,
+                  'ok': True, 'slots': None, 'error': None}
+        self._open = (record, time.monotonic())
+        return record
+
+    def end(self, error=None):
+        """Stop timing the open step, as failed if `error` is given."""
+        if self._open is None:
+            return
+        record, started = self._open
+        self._open = None
+        record['seconds'] = round(time.monotonic() - started, 3)
+        if error is not None:
+            record['ok'] = False
+            record['error'] = str(error)[:500]
+        self.steps.append(record)
+
+    def fail(self, error):
+        """The scrape failed: end the open step as failed."""
+        self.end(error=error)
+
+    @contextmanager
+    def step(self, kind, name=None, date=None):
+        """Time the block as one step; set step['slots'] inside it. An exception marks it failed."""
+        record = self.begin(kind, name, date)
+        try:
+            yield record
+        except Exception as e:
+            self.end(error=e)
+            raise
+        self.end()
+
+    def summary(self):
+        """Print each step's time."""
+        if not self.steps:
+            return
+        print(f"Steps: {sum(s['seconds'] for s in self.steps):.1f}s in total")
+        for s in self.steps:
+            label = s['name'] + (f" {s['date']}" if s['date'] else '')
+            slots = f", {s['slots']} slots" if s['slots'] is not None else ''
+            print(f"  {s['seconds']:6.2f}s {'ok' if s['ok'] else 'FAILED'}  {s['kind']}: {label}{slots}")
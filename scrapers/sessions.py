@@ -0,0 +1,79 @@
+"""Persisted login sessions: reuse a site's cookies/local storage instead of logging in every run."""
+import os
+import time
+from datetime import datetime
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapers.state import site_key, load_state, save_state, delete_state
+
+LOGIN_SESSION_MAX_AGE_SECONDS = int(os.getenv('LOGIN_SESSION_MAX_AGE_SECONDS', str(12 * 3600)))
+
+
+class LoginSessionStore:
+    """Saved storage state for one site, plus the page we landed on after logging in.
+
+    Validity is checked cheaply: first offline (age, cookie expiry), then by opening the saved
+    post-login page and checking we were not sent back to a login form.
+    """
+
+    KIND = 'login_session'
+
+    def __init__(self, db_session, login_url):
+        self.db_session = db_session
+        self.login_url = login_url
+        self.site = site_key(login_url)
+        self._saved = None
+
+    def load(self):
+        """Return the saved storage_state (for browser.new_context) or None if missing/expired."""
+        payload, updated_at = load_state(self.db_session, self.site, self.KIND)
+        if not payload:
+            return None
+        if updated_at and (datetime.utcnow() - updated_at).total_seconds() > LOGIN_SESSION_MAX_AGE_SECONDS:
+            print(f"Saved login for {self.site} is older than {LOGIN_SESSION_MAX_AGE_SECONDS}s, ignoring")
+            return None
+        state = payload.get('storage_state') or {}
+        now = time.time()
+        cookies = [c for c in state.get('cookies', []) if c.get('expires', -1) < 0 or c['expires'] > now]
+        if not cookies:
+            print(f"Saved login for {self.site} has no unexpired cookies, ignoring")
+            return None
+        state['cookies'] = cookies
+        self._saved = payload
+        return state
+
+    def is_logged_in(self, page, deadline=None):
+        """Open the saved post-login page; True if the session still works (no login form)."""
+        if not self._saved or not self._saved.get('home_url'):
+            return False
+        timeout = deadline.ms(30000, 'saved login check') if deadline else 30000
+        try:
+            page.goto(self._saved['home_url'], wait_until='domcontentloaded', timeout=timeout)
+        except Exception as e:
+            print(f"Saved login check failed to load page: {e}")
+            return False
+        return self.looks_logged_in(page)
+
+    def looks_logged_in(self, page):
+        if '/account/login' in page.url.lower():
+            return False
+        try:
+            return page.locator("input[type='password']").count() == 0
+        except Exception:
+            return False
+
+    def save(self, context, page):
+        """Save the context's storage state after a successful login."""
+        if not self.looks_logged_in(page):
+            print("Login did not reach a logged-in page; not saving session")
+            return
+        save_state(self.db_session, self.site, self.KIND, {
+            'storage_state': context.storage_state(),
+            'home_url': page.url,
+        })
+        print(f"Saved login session for {self.site}")
+
+    def clear(self):
+        delete_state(self.db_session, self.site, self.KIND)
+        self._saved = None
@@ -0,0 +1,41 @@
+"""Small JSON key-value store (per site and kind) for state that scrapers keep between runs."""
+import json
+from datetime import datetime
+from urllib.parse import urlparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import ScraperState
+
+
+def site_key(url):
+    """Host part of a URL, used as the site key (e.g. "abbeycroft.legendonlineservices.co.uk")."""
+    return urlparse(url).netloc.lower() or url
+
+
+def load_state(session, site, kind):
+    """Return (payload, updated_at) for this site/kind, or (None, None) if nothing is stored."""
+    row = session.query(ScraperState).filter_by(site=site, kind=kind).first()
+    if not row or not row.payload:
+        return None, None
+    try:
+        return json.loads(row.payload), row.updated_at
+    except ValueError:
+        return None, None
+
+
+def save_state(session, site, kind, payload):
+    """Insert or replace the payload for this site/kind and commit."""
+    row = session.query(ScraperState).filter_by(site=site, kind=kind).first()
+    if not row:
+        row = ScraperState(site=site, kind=kind)
+        session.add(row)
+    row.payload = json.dumps(payload)
+    row.updated_at = datetime.utcnow()
+    session.commit()
+
+
+def delete_state(session, site, kind):
+    session.query(ScraperState).filter_by(site=site, kind=kind).delete()
+    session.commit()
@@ -0,0 +1,162 @@
+"""Availability storage shared by the scrapers: write only the slots that changed.
+
+A stored slot is keyed on (facility, date, court, start time), and the table has a unique constraint
+on that key (database.py). A scrape loads the facility's stored rows for the dates it read, compares
+them with what it read, and then makes three kinds of change:
+- it inserts new slots;
+- it updates slots whose end time, day name or availability changed;
+- it deletes slots that are no longer listed.
+Unchanged rows are not written, so a scrape costs writes in proportion to how much changed, not to
+how many slots there are. A row's scraped_at is when it last changed. When a date was last scraped is
+tracked in DateFreshness, and that is what the API reports as a slot's scraped_at.
+
+Changes are written in bulk, with one scraped_at per batch. Inserts use COPY on Postgres (psycopg2)
+and a Core executemany elsewhere (SQLite). Updates are one executemany, and deletes are one
+DELETE ... IN per chunk of ids. benchmarks/bulk_insert.py times this for 10k and 100k slots.
+"""
+import os
+import io
+import sys
+from datetime import datetime
+
+from sqlalchemy import bindparam
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import CourtAvailability
+
+TABLE = CourtAvailability.__table__
+INSERT_COLUMNS = ('facility_id', 'date', 'day_name', 'start_time', 'end_time', 'court_number',
+                  'is_available', 'scraped_at')
+
+DEFAULT_COURT = 'Court 1'  # Single-court facilities (Linton) report no court; NULL would escape the unique key
+COMPARED = ('day_name', 'end_time', 'is_available')
+DELETE_CHUNK = 500  # Ids per DELETE ... IN (...), under SQLite's bound-parameter limit
+
+
+def slot_key(date, court_number, start_time):
+    return (date, court_number or DEFAULT_COURT, start_time)
+
+
+def slot_values(slot):
+    """The stored columns of one scraped slot, besides facility and scraped_at."""
+    return {
+        'date': slot['date'],
+        'court_number': slot.get('court_number') or DEFAULT_COURT,
+        'start_time': slot['start_time'],
+        'end_time': slot['end_time'],
+        'day_name': slot.get('day_name'),
+        'is_available': bool(slot.get('is_available', True)),
+    }
+
+
+def uses_copy(session):
+    """True if inserts can go through COPY (Postgres over psycopg2)."""
+    dialect = session.get_bind().dialect
+    return dialect.name == 'postgresql' and dialect.driver == 'psycopg2'
+
+
+def _csv_field(value):
+    """One COPY CSV field: None is left empty and unquoted (NULL), everything else is quoted."""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _copy_rows(session, rows):
+    """COPY rows into court_availability inside the session's transaction."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(','.join(_csv_field(row[col]) for col in INSERT_COLUMNS) + '\n')
+    buffer.seek(0)
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {TABLE.name} ({', '.join(INSERT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def insert_slots(session, facility_id, slots, scraped_at):
+    """Insert slot_values() dicts in bulk, all stamped with the same scraped_at. Does not commit."""
+    if not slots:
+        return
+    rows = [dict(values, facility_id=facility_id, scraped_at=scraped_at) for values in slots]
+    if uses_copy(session):
+        _copy_rows(session, rows)
+    else:
+        session.execute(TABLE.insert(), rows)  # One executemany
+
+
+def update_slots(session, updates, scraped_at):
+    """Apply (id, compared columns) pairs as one executemany of UPDATE ... WHERE id = ?. Does not commit."""
+    if not updates:
+        return
+    # executemany needs the same columns in every row, so each update sets all compared columns
+    session.execute(
+        TABLE.update().where(TABLE.c.id == bindparam('row_id')),
+        [dict(values, row_id=row_id, scraped_at=scraped_at) for row_id, values in updates],
+    )
+
+
+def delete_slots(session, ids):
+    """Delete rows by id, DELETE_CHUNK ids per statement. Does not commit."""
+    for start in range(0, len(ids), DELETE_CHUNK):
+        session.execute(TABLE.delete().where(TABLE.c.id.in_(ids[start:start + DELETE_CHUNK])))
+
+
+def diff_availability(stored, scraped):
+    """Compare stored rows with scraped slots, both keyed by slot_key.
+
+    `stored` maps key -> {'id', 'day_name', 'end_time', 'is_available'} and `scraped` maps
+    key -> slot_values(). Returns (inserts, updates, delete_ids). inserts are value dicts, and
+    updates are (id, compared columns) pairs for rows where any compared column changed.
+    """
+    inserts, updates = [], []
+    for key, values in scraped.items():
+        row = stored.get(key)
+        if row is None:
+            inserts.append(values)
+            continue
+        if any(row[col] != values[col] for col in COMPARED):
+            updates.append((row['id'], {col: values[col] for col in COMPARED}))
+    delete_ids = [row['id'] for key, row in stored.items() if key not in scraped]
+    return inserts, updates, delete_ids
+
+
+def store_availability(session, facility_id, date_range, availability):
+    """Make the facility's stored slots for the range's dates match `availability`, then commit.
+
+    Returns counts: slots (stored after the scrape), inserted, updated, deleted.
+    """
+    scraped = {}
+    for slot in date_range.rows(availability):
+        values = slot_values(slot)
+        scraped.setdefault(slot_key(values['date'], values['court_number'], values['start_time']), values)
+
+    query = session.query(
+        CourtAvailability.id, CourtAvailability.date, CourtAvailability.court_number,
+        CourtAvailability.start_time, CourtAvailability.end_time, CourtAvailability.day_name,
+        CourtAvailability.is_available,
+    ).filter(CourtAvailability.facility_id == facility_id)
+    stored, duplicate_ids = {}, []
+    for row in date_range.scope(query, CourtAvailability.date):
+        key = slot_key(row.date, row.court_number, row.start_time)
+        if key in stored:
+            duplicate_ids.append(row.id)  # Left by the old delete-and-reinsert storage
+            continue
+        stored[key] = {'id': row.id, 'day_name': row.day_name, 'end_time': row.end_time,
+                       'is_available': bool(row.is_available)}
+
+    inserts, updates, delete_ids = diff_availability(stored, scraped)
+    delete_ids += duplicate_ids
+    now = datetime.utcnow()  # One timestamp for the whole batch
+    delete_slots(session, delete_ids)  # First, so a re-inserted key can't hit the unique constraint
+    update_slots(session, updates, now)
+    insert_slots(session, facility_id, inserts, now)
+    session.commit()
+
+    counts = {'slots': len(scraped), 'inserted': len(inserts), 'updated': len(updates), 'deleted': len(delete_ids)}
+    print(f"Stored {counts['slots']} availability records ({counts['inserted']} new, "
+          f"{counts['updated']} changed, {counts['deleted']} removed)")
+    return counts
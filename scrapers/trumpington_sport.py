@@ -5,20 +5,40 @@ Court bookings → Badminton → View timetable. Scrapes today + 13 days.
 Red X = booked, green arrow / N Slots = bookable (same Legend UI as Hill Roads).
 """
 import os
-import time
 import re
 from datetime import datetime, timedelta
-from playwright.sync_api import sync_playwright
 from dotenv import load_dotenv
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import init_db, get_session, Facility, CourtAvailability
+from database import init_db, get_session, Facility
+from scrapers.browser import scraper_browser, new_scraper_context
+from scrapers.sessions import LoginSessionStore
+from scrapers.state import site_key, load_state, save_state, delete_state
+from scrapers.waits import Waiter, selector_on_pages
+from scrapers.resolver import SelectorResolver
+from scrapers.routing import RequestPolicy
+from scrapers.date_range import ScrapeRange
+from scrapers.storage import store_availability
+from scrapers.har import replay_today
+from scrapers.deadline import Deadline, DeadlineExceeded
+from scrapers.run_log import RunLog
+from scrapers.memory import RssWatchdog
+from scrapers.artifacts import DebugArtifacts
+from scrapers.legend import SLOT_TIME_TEXT_SELECTOR, TimetableCapture, extract_slot_cards, parse_slot_cards
+from scrapers.payloads import TimetableEndpoint, fill_missing_dates
+from scrapers.legend_http import LEGEND_HTTP_MODE, fetch_timetable_days
 
 load_dotenv()
 
 # Number of days to scrape: today + 13 following = 14 days
 SCRAPE_DAYS = 14
+# Timetable tabs scraping days at the same time (1 = click through the date bar on one tab)
+DAY_CONCURRENCY = int(os.getenv("TRUMPINGTON_DAY_CONCURRENCY", "4"))
+# After the timetable URL fails to open in a new tab, scrapes use one tab for this long before trying again
+DEEP_LINK_RETRY_HOURS = float(os.getenv("TRUMPINGTON_DEEP_LINK_RETRY_HOURS", "24"))
+# Text the timetable shows once the club and activity are selected; a new tab must show the same
+TIMETABLE_FILTER_MARKERS = ("Trumpington Sport", "Badminton")
 
 
 class TrumpingtonSportScraper:
@@ -26,6 +46,9 @@ class TrumpingtonSportScraper:
 
     # Racquet sports timetable goes to Legend login
     LOGIN_URL = "https://abbeycroft.legendonlineservices.co.uk/enterprise/account/login"
+    WINDOW_DAYS = SCRAPE_DAYS
+    # URL substrings the booking flow needs even though the request policy would block them
+    REQUEST_ALLOWLIST = ()
 
     def __init__(self, headless=True):
         self.headless = headless if headless is not None else True
@@ -45,48 +68,71 @@ class TrumpingtonSportScraper:
             self.session.commit()
         return facility
 
-    def scrape(self):
-        """Main scraping method."""
+    def scrape(self, start_date=None, end_date=None, deadline=None):
+        """Main scraping method. start_date/end_date narrow the scrape to part of the booking window.
+
+        If the deadline passes while days are being read, the days read so far are stored.
+        """
         print("Starting Trumpington Sport (Abbeycroft) scraper...")
+        self.range = ScrapeRange(self.WINDOW_DAYS, start_date, end_date, today=replay_today(self.facility.name))
+        self.deadline = deadline or Deadline()
+        self.stopped_early = False
+        self.run_log = RunLog()
+        self.memory = RssWatchdog(self.run_log)
+        print(f"Dates: {self.range} ({self.deadline})")
+        if not self.range.dates:
+            self.session.close()
+            return
 
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=self.headless,
-                args=["--disable-blink-features=AutomationControlled"],
-            )
-            context = browser.new_context(
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                viewport={"width": 1920, "height": 1080},
-                locale="en-GB",
-                timezone_id="Europe/London",
-                extra_http_headers={
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                    "Accept-Language": "en-GB,en;q=0.9",
-                },
-            )
+        login_store = LoginSessionStore(self.session, self.LOGIN_URL)
+        saved_login = login_store.load()
+        # With a saved login and a known timetable endpoint, no browser is needed at all
+        endpoint = TimetableEndpoint.load(self.session, self.LOGIN_URL) if LEGEND_HTTP_MODE else None
+        if endpoint and saved_login and self._scrape_over_http(saved_login, endpoint):
+            self.session.close()
+            return
+        with scraper_browser(self.headless, watchdog=self.memory) as browser:
+            self.requests = RequestPolicy(self.REQUEST_ALLOWLIST)
+            context = new_scraper_context(browser, request_policy=self.requests, recording=self.facility.name, storage_state=saved_login)
             page = context.new_page()
-            page.add_init_script(
-                "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-            )
+            self.artifacts = DebugArtifacts(self.facility.name)
+            self.artifacts.attach(context)
+            self.waits = Waiter(page, deadline=self.deadline)
+            self.capture = TimetableCapture(page)
+            self.selectors = SelectorResolver(self.session, self.facility.name, deadline=self.deadline)
 
             try:
-                # Step 1: Go to Legend login (Abbeycroft racquet sports)
-                print(f"Navigating to {self.LOGIN_URL}...")
-                page.goto(self.LOGIN_URL, wait_until="networkidle", timeout=60000)
-                time.sleep(2)
-
-                # Step 2: Login
-                print("Logging in...")
-                self._login(page)
+                # Step 1-2: Reuse the saved login if still valid, else go to Legend login (Abbeycroft racquet sports)
+                logged_in_fresh = False
+                if saved_login:
+                    self.run_log.begin("login", "saved login")
+                if saved_login and login_store.is_logged_in(page, self.deadline):
+                    print(f"Reusing saved login session, at {page.url}")
+                else:
+                    self.run_log.begin("login")
+                    print(f"Navigating to {self.LOGIN_URL}...")
+                    page.goto(self.LOGIN_URL, wait_until="domcontentloaded", timeout=self.deadline.ms(60000, "login page"))
+
+                    print("Logging in...")
+                    self._login(page)
+                    login_store.save(context, page)
+                    logged_in_fresh = True
+
+                if endpoint:
+                    # Saved cookies already failed over HTTP; a fresh login gets one try before relearning
+                    if logged_in_fresh and self._scrape_over_http(context.storage_state(), endpoint):
+                        return
+                    TimetableEndpoint.forget(self.session, self.LOGIN_URL)
+                    endpoint = None
 
                 # Step 3: Click "Drop ins" in the Make a booking section (right side)
+                self.run_log.begin("navigation", "timetable")
                 print("Looking for 'Drop ins'...")
                 self._click_drop_ins(page)
 
                 # Step 4: Select club "Trumpington Sport"
                 print("Selecting club Trumpington Sport...")
                 self._select_club(page)
-                time.sleep(3)  # Let category section load (radios appear after club selected)
 
                 # Step 5: Select category "Court Bookings" radio
                 print("Selecting Court bookings...")
@@ -100,17 +146,29 @@ class TrumpingtonSportScraper:
                 print("Clicking View timetable...")
                 self._click_view_timetable(page)
 
-                time.sleep(3)
-                page.wait_for_load_state("networkidle", timeout=30000)
+                self.waits.selector(SLOT_TIME_TEXT_SELECTOR, step="timetable slots", timeout_ms=30000)
+                self.waits.settled("timetable rendered")
                 print(f"Timetable URL: {page.url}")
+                self.run_log.end()
 
-                # Step 8: Scrape today + 13 days (14 total). Date bar reveals one more day
-                # each time you click (TODAY → TOMORROW → 13 FEB 2026 → …). Click through
-                # to reveal and select each day.
+                # Step 8: Scrape the range's days (up to today + 13), several tabs at once, each jumping
+                # straight to its dates; any day that fails is retried on the first tab below.
                 all_availability = []
-                print(f"Scraping {SCRAPE_DAYS} days (click through date bar to reveal each)...")
-
-                for day_index in range(SCRAPE_DAYS):
+                day_indexes = self.range.day_offsets
+                if DAY_CONCURRENCY > 1 and len(day_indexes) > 1:
+                    all_availability, day_indexes = self._scrape_days_in_tabs(context, page)
+
+                # Date bar reveals one more day each time you click (TODAY → TOMORROW → 13 FEB 2026 → …).
+                # Click through to reveal and select each remaining day.
+                if day_indexes:
+                    print(f"Scraping {len(day_indexes)} days (click through date bar to reveal each)...")
+                for day_index in day_indexes:
+                    if self.deadline.expired:
+                        print("  Scrape deadline passed; keeping the days read so far")
+                        self.stopped_early = True
+                    if self.stopped_early or self.memory.should_stop(page):
+                        self.stopped_early = True
+                        break
                     date_tabs = self._get_date_tabs(page)
                     # Click the rightmost tab repeatedly to reveal the next day until we have a tab for this index
                     while len(date_tabs) <= day_index:
@@ -119,33 +177,39 @@ class TrumpingtonSportScraper:
                         prev_count = len(date_tabs)
                         try:
                             date_tabs[-1].click()
-                            time.sleep(2)
-                            page.wait_for_load_state("networkidle", timeout=10000)
+                            self.waits.settled(f"reveal day {prev_count + 1}", timeout_ms=10000)
                             date_tabs = self._get_date_tabs(page)
                             if len(date_tabs) <= prev_count:
                                 break  # No new tab appeared
                         except Exception:
                             break
+                    target_date = self.range.today + timedelta(days=day_index)
                     if day_index < len(date_tabs):
                         tab = date_tabs[day_index]
                         try:
-                            tab.click()
-                            time.sleep(2)
-                            page.wait_for_load_state("networkidle", timeout=15000)
-                            day_availability = self._extract_availability(page)
+                            with self.run_log.step("date", "day", target_date.strftime("%Y-%m-%d")) as step:
+                                self.capture.clear()
+                                tab.click()
+                                self.waits.settled(f"day {day_index + 1} timetable", timeout_ms=15000)
+                                day_availability = self._day_availability(page)
+                                step["slots"] = len(day_availability)
                             all_availability.extend(day_availability)
+                            self.range.mark_read(target_date)
                             print(f"  Day {day_index + 1}: {len(day_availability)} slots")
                         except Exception as e:
                             print(f"  Day {day_index + 1} failed: {e}")
                         continue
                     # Fallback: use date picker (far right of date bar) to select today + day_index
-                    target_date = datetime.now().date() + timedelta(days=day_index)
+                    self.capture.clear()
                     if self._select_date_via_picker(page, target_date):
-                        time.sleep(2)
-                        page.wait_for_load_state("networkidle", timeout=15000)
                         try:
-                            day_availability = self._extract_availability(page, expected_date=target_date)
+                            with self.run_log.step("date", "day (picker)", target_date.strftime("%Y-%m-%d")) as step:
+                                self.waits.settled(f"day {day_index + 1} timetable (picker)", timeout_ms=15000)
+                                self._check_picked_date(page, target_date)
+                                day_availability = self._day_availability(page, expected_date=target_date)
+                                step["slots"] = len(day_availability)
                             all_availability.extend(day_availability)
+                            self.range.mark_read(target_date)
                             print(f"  Day {day_index + 1} (picker): {len(day_availability)} slots")
                         except Exception as e:
                             print(f"  Day {day_index + 1} failed: {e}")
@@ -153,25 +217,55 @@ class TrumpingtonSportScraper:
                         print(f"  Day {day_index + 1}: no tab or picker, skipping")
 
                 # Step 9: Store in database
+                self.range.keep_read()  # Days that failed or weren't reached keep their stored rows
                 print(f"Storing {len(all_availability)} availability records...")
-                self._store_availability(all_availability)
-
+                with self.run_log.step("storage") as step:
+                    step["slots"] = self._store_availability(all_availability)
+                if LEGEND_HTTP_MODE:
+                    TimetableEndpoint.learn(self.session, self.LOGIN_URL, self.capture)
+
+                self.run_log.summary()
+                self.waits.summary()
+                self.requests.summary()
+                self.selectors.summary()
+                self.selectors.save()
                 print("Trumpington Sport scraping completed successfully!")
             except Exception as e:
                 print(f"Error during scraping: {e}")
-                page.screenshot(path="debug_trumpington_error.png")
+                self.run_log.fail(e)
+                self.artifacts.failure(page, "error", e)
+                if saved_login and not isinstance(e, DeadlineExceeded):
+                    login_store.clear()  # Don't reuse a session that may be the cause
                 raise
             finally:
-                browser.close()
+                self.artifacts.finish(context)
+                context.close()
                 self.session.close()
 
+    def _scrape_over_http(self, storage_state, endpoint):
+        """Fetch and store every day from the timetable endpoint; False if the browser is needed."""
+        print("Fetching timetable over HTTP...")
+        fetched = []
+        availability = fetch_timetable_days(storage_state, endpoint, self.range.dates, self.deadline, self.run_log,
+                                            fetched=fetched)
+        if availability is None:
+            return False
+        if self.deadline.expired:
+            self.stopped_early = True
+        for day in fetched:
+            self.range.mark_read(day)
+        self.range.keep_read()
+        with self.run_log.step("storage") as step:
+            step["slots"] = self._store_availability(availability)
+        print("Trumpington Sport scraping completed successfully (HTTP)!")
+        return True
+
     def _login(self, page):
         """Handle login (email + password + Login)."""
         page.wait_for_selector(
             "input[type='email'], input[type='text'], input[type='password']",
-            timeout=30000,
+            timeout=self.deadline.ms(30000, "login form"),
         )
-        time.sleep(2)
 
         # Email
         for selector in [
@@ -189,12 +283,11 @@ class TrumpingtonSportScraper:
         else:
             raise Exception("Could not find email input")
 
-        time.sleep(1)
         page.locator("input[type='password']").first.fill(self.password)
         print("Filled password")
-        time.sleep(1)
 
         # Submit (Login button)
+        url_before = page.url
         for sel in [
             "button[type='submit']",
             "input[type='submit']",
@@ -211,30 +304,25 @@ class TrumpingtonSportScraper:
         else:
             page.keyboard.press("Enter")
 
-        time.sleep(5)
-        page.wait_for_load_state("networkidle", timeout=30000)
-        time.sleep(2)
+        self.waits.url_change(url_before, "login redirect", timeout_ms=30000)
+        self.waits.settled("post-login page", timeout_ms=30000)
         print(f"After login: {page.url}")
 
     def _click_drop_ins(self, page):
         """Click 'Drop ins' in the Make a booking section."""
-        for selector in [
-            'a:has-text("Drop ins")',
-            'button:has-text("Drop ins")',
-            '[class*="drop"]:has-text("Drop ins")',
-            'text="Drop ins"',
-        ]:
-            try:
-                el = page.locator(selector).first
-                if el.is_visible(timeout=5000):
-                    el.click()
-                    time.sleep(3)
-                    page.wait_for_load_state("networkidle", timeout=15000)
-                    print("Clicked Drop ins")
-                    return
-            except Exception:
-                continue
-        raise Exception("Could not find 'Drop ins'")
+        selector, el = self.selectors.resolve("drop ins", [
+            (selector, page.locator(selector)) for selector in [
+                'a:has-text("Drop ins")',
+                'button:has-text("Drop ins")',
+                '[class*="drop"]:has-text("Drop ins")',
+                'text="Drop ins"',
+            ]
+        ], timeout_ms=5000)
+        if not el:
+            raise Exception("Could not find 'Drop ins'")
+        el.first.click()
+        self.waits.settled("click drop ins", timeout_ms=15000)
+        print(f"Clicked Drop ins ({selector})")
 
     def _select_club(self, page):
         """Select club 'Trumpington Sport' in the main content Clubs field (combobox)."""
@@ -243,13 +331,11 @@ class TrumpingtonSportScraper:
             clubs_input = page.get_by_placeholder(re.compile(r"Please select a club", re.I)).first
             if clubs_input.is_visible(timeout=5000):
                 clubs_input.click()
-                time.sleep(1)
                 # Click the option "Trumpington Sport" in the dropdown
                 opt = page.get_by_role("option").filter(has_text="Trumpington Sport").first
-                if opt.is_visible(timeout=5000):
+                if self.waits.locator(opt, "club options", timeout_ms=5000):
                     opt.click()
-                    time.sleep(2)
-                    page.wait_for_load_state("networkidle", timeout=10000)
+                    self.waits.settled("select club", timeout_ms=10000)
                     print("Selected club: Trumpington Sport (combobox)")
                     return
         except Exception as e:
@@ -257,10 +343,10 @@ class TrumpingtonSportScraper:
         try:
             # Fallback: click label "Clubs" then find and click option
             page.get_by_text("Clubs", exact=True).first.click()
-            time.sleep(1)
-            page.get_by_text("Trumpington Sport", exact=True).first.click()
-            time.sleep(2)
-            page.wait_for_load_state("networkidle", timeout=10000)
+            option = page.get_by_text("Trumpington Sport", exact=True).first
+            self.waits.locator(option, "club option text", timeout_ms=5000)
+            option.click()
+            self.waits.settled("select club", timeout_ms=10000)
             print("Selected club: Trumpington Sport (label + text)")
             return
         except Exception:
@@ -270,8 +356,7 @@ class TrumpingtonSportScraper:
                 sel = page.locator("select").first
                 if sel.is_visible(timeout=2000):
                     sel.select_option(label=name)
-                    time.sleep(2)
-                    page.wait_for_load_state("networkidle", timeout=10000)
+                    self.waits.settled("select club", timeout_ms=10000)
                     print(f"Selected club: {name}")
                     return
             except Exception:
@@ -280,8 +365,7 @@ class TrumpingtonSportScraper:
                 el = page.get_by_text(re.compile(re.escape(name), re.I)).first
                 if el.is_visible(timeout=3000):
                     el.click()
-                    time.sleep(2)
-                    page.wait_for_load_state("networkidle", timeout=10000)
+                    self.waits.settled("select club", timeout_ms=10000)
                     print(f"Selected club (text): {name}")
                     return
             except Exception:
@@ -291,34 +375,25 @@ class TrumpingtonSportScraper:
     def _select_court_bookings(self, page):
         """Select the 'Court Bookings' radio in the Category section (not the left nav)."""
         # Wait for Category section to show radios (loads after club selected)
-        try:
-            page.get_by_text(re.compile(r"Court Bookings|Appointments and Inductions")).first.wait_for(
-                state="visible", timeout=10000
-            )
-            time.sleep(1)
-        except Exception:
-            pass
-        for label_text in ["Court Bookings", "Court bookings"]:
-            try:
-                radio = page.get_by_role("radio", name=label_text).first
-                if radio.is_visible(timeout=3000):
-                    radio.check()
-                    time.sleep(2)
-                    page.wait_for_load_state("networkidle", timeout=10000)
-                    print("Selected Court Bookings (category radio)")
-                    return
-            except Exception:
-                pass
+        self.waits.locator(
+            page.get_by_text(re.compile(r"Court Bookings|Appointments and Inductions")).first,
+            "category section", timeout_ms=10000,
+        )
+        candidate, el = self.selectors.resolve("court bookings radio", [
+            ("radio role", page.get_by_role("radio", name="Court Bookings")),
+            ("label", page.locator('label:has-text("Court Bookings"), label:has-text("Court bookings")')),
+        ], timeout_ms=3000)
+        if el:
             try:
-                label = page.locator(f'label:has-text("{label_text}")').first
-                if label.is_visible(timeout=3000):
-                    label.click()
-                    time.sleep(2)
-                    page.wait_for_load_state("networkidle", timeout=10000)
-                    print("Selected Court Bookings (label click)")
-                    return
-            except Exception:
-                continue
+                if candidate == "radio role":
+                    el.first.check()
+                else:
+                    el.first.click()
+                self.waits.settled("select court bookings", timeout_ms=10000)
+                print(f"Selected Court Bookings ({candidate})")
+                return
+            except Exception as e:
+                print(f"  Court Bookings {candidate}: {e}")
         # Fallback: click element with exact text "Court Bookings" in main content (avoid left nav)
         try:
             # Prefer main content area so we don't click "Court hire and appointments" in the nav
@@ -327,96 +402,57 @@ class TrumpingtonSportScraper:
                 el = main.get_by_text("Court Bookings", exact=True).first
                 if el.is_visible(timeout=3000):
                     el.click()
-                    time.sleep(2)
-                    page.wait_for_load_state("networkidle", timeout=10000)
+                    self.waits.settled("select court bookings", timeout_ms=10000)
                     print("Selected Court Bookings (main content text)")
                     return
             el = page.get_by_text("Court Bookings", exact=True).first
             if el.is_visible(timeout=3000):
                 el.click()
-                time.sleep(2)
-                page.wait_for_load_state("networkidle", timeout=10000)
+                self.waits.settled("select court bookings", timeout_ms=10000)
                 print("Selected Court Bookings (text click)")
                 return
         except Exception:
             pass
-        page.screenshot(path="debug_trumpington_no_court_bookings.png")
         raise Exception("Could not select Court Bookings category radio")
 
     def _select_badminton(self, page):
         """Check the 'Badminton' checkbox in the Activities section (enables View Timetable)."""
-        time.sleep(2)  # Let activities checkboxes load after Court Bookings is selected
-        for name in ["Badminton", "badminton"]:
-            try:
-                cb = page.get_by_role("checkbox", name=name).first
-                if cb.is_visible(timeout=5000):
-                    cb.check()
-                    time.sleep(2)
-                    page.wait_for_load_state("networkidle", timeout=10000)
-                    print("Selected Badminton (checkbox)")
-                    return True
-            except Exception:
-                pass
+        # Let activities checkboxes load after Court Bookings is selected
+        self.waits.selector("input[type='checkbox']", step="activity checkboxes", timeout_ms=10000)
+        candidate, el = self.selectors.resolve("badminton checkbox", [
+            ("checkbox role", page.get_by_role("checkbox", name="Badminton")),
+            ("label", page.locator('label:has-text("Badminton")')),
+            ("exact text", page.get_by_text("Badminton", exact=True)),
+        ], timeout_ms=5000)
+        if el:
             try:
-                label = page.locator(f'label:has-text("{name}")').first
-                if label.is_visible(timeout=3000):
-                    label.click()
-                    time.sleep(2)
-                    page.wait_for_load_state("networkidle", timeout=10000)
-                    print("Selected Badminton (label)")
-                    return True
-            except Exception:
-                continue
-        try:
-            el = page.get_by_text("Badminton", exact=True).first
-            if el.is_visible(timeout=2000):
-                el.click()
-                time.sleep(2)
-                page.wait_for_load_state("networkidle", timeout=10000)
-                print("Selected Badminton (text click)")
+                if candidate == "checkbox role":
+                    el.first.check()
+                else:
+                    el.first.click()
+                self.waits.settled("select badminton", timeout_ms=10000)
+                print(f"Selected Badminton ({candidate})")
                 return True
-        except Exception:
-            pass
-        page.screenshot(path="debug_trumpington_no_badminton.png")
+            except Exception as e:
+                print(f"  Badminton {candidate}: {e}")
         raise Exception("Could not select Badminton checkbox in Activities")
 
     def _click_view_timetable(self, page):
         """Click 'View timetable' button (bottom right). Uses short timeouts to avoid hanging if button is disabled."""
-        wait_after = 10000  # 10s max wait after click
-        for candidate in [
-            page.get_by_role("button", name="View Timetable"),
-            page.get_by_role("link", name="View Timetable"),
-            page.get_by_text("View Timetable", exact=True),
-        ]:
-            try:
-                if candidate.first.is_visible(timeout=3000):
-                    candidate.first.click()
-                    try:
-                        page.wait_for_load_state("networkidle", timeout=wait_after)
-                    except Exception:
-                        pass
-                    print("Clicked View timetable")
-                    return
-            except Exception:
-                continue
-        for selector in [
-            'button:has-text("View Timetable")',
-            'a:has-text("View Timetable")',
-            '[class*="timetable"]:has-text("View Timetable")',
-        ]:
-            try:
-                el = page.locator(selector).first
-                if el.is_visible(timeout=3000):
-                    el.click()
-                    try:
-                        page.wait_for_load_state("networkidle", timeout=wait_after)
-                    except Exception:
-                        pass
-                    print("Clicked View timetable (selector)")
-                    return
-            except Exception:
-                continue
-        raise Exception("Could not find or click 'View timetable' button (ensure Badminton is selected if required)")
+        wait_after = 10000  # 10s max wait after click (readiness is checked by the caller)
+        candidate, el = self.selectors.resolve("view timetable", [
+            ("role button", page.get_by_role("button", name="View Timetable")),
+            ("role link", page.get_by_role("link", name="View Timetable")),
+            ("exact text", page.get_by_text("View Timetable", exact=True)),
+            ("button", page.locator('button:has-text("View Timetable")')),
+            ("link", page.locator('a:has-text("View Timetable")')),
+            ("timetable element", page.locator('[class*="timetable"]:has-text("View Timetable")')),
+        ], timeout_ms=5000)
+        if not el:
+            raise Exception("Could not find or click 'View timetable' button (ensure Badminton is selected if required)")
+        el.first.click()
+        self.waits.settled("view timetable", timeout_ms=wait_after)
+        print(f"Clicked View timetable ({candidate})")
 
     def _select_date_via_picker(self, page, target_date):
         """Use the date picker (calendar icon, far right of date bar) to select the given date. Returns True if done."""
@@ -432,11 +468,10 @@ class TrumpingtonSportScraper:
                 picker = page.get_by_text(re.compile(r"\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4}")).first
             if picker.is_visible(timeout=2000):
                 picker.click()
-                time.sleep(1)
                 # In the calendar popup, click the day number for target_date
                 day_num = target_date.day
                 day_el = page.get_by_text(re.compile(rf"^{day_num}$")).first
-                if day_el.is_visible(timeout=3000):
+                if self.waits.locator(day_el, "date picker popup", timeout_ms=3000):
                     day_el.click()
                     return True
                 # Some pickers use aria or data attributes
@@ -480,8 +515,13 @@ class TrumpingtonSportScraper:
         return tabs
 
     def _get_viewing_date(self, page):
-        """Parse the currently selected date from the timetable tab."""
-        today = datetime.now().date()
+        """Parse the currently selected date from the timetable tab (today if it can't be read)."""
+        viewing_date = self._shown_date(page) or self.range.today
+        return viewing_date, viewing_date.strftime("%A")
+
+    def _shown_date(self, page):
+        """The date of the selected timetable tab, or None if it can't be read."""
+        today = self.range.today
         try:
             selected = page.locator(
                 '[class*="active"]:has-text("TODAY"), [class*="active"]:has-text("TOMORROW"), '
@@ -490,10 +530,9 @@ class TrumpingtonSportScraper:
             if selected.is_visible(timeout=2000):
                 text = selected.inner_text().strip().upper()
                 if "TODAY" in text:
-                    return today, today.strftime("%A")
+                    return today
                 if "TOMORROW" in text:
-                    d = today + timedelta(days=1)
-                    return d, d.strftime("%A")
+                    return today + timedelta(days=1)
         except Exception:
             pass
         try:
@@ -509,7 +548,7 @@ class TrumpingtonSportScraper:
                 "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
                 "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12,
             }
-            for link in date_links[:5]:
+            for link in date_links:  # The selected day can be anywhere in the 14-day bar
                 t = link.inner_text().strip()
                 m = re.search(
                     r"(\d{1,2})\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{4})",
@@ -523,146 +562,169 @@ class TrumpingtonSportScraper:
                         d = datetime(year, mon, day).date()
                         cls = link.get_attribute("class") or ""
                         if "active" in cls or "selected" in cls:
-                            return d, d.strftime("%A")
+                            return d
         except Exception:
             pass
-        return today, today.strftime("%A")
+        return None
+
+    def _check_picked_date(self, page, target_date):
+        """Raise unless the timetable shows target_date: the picker clicks a day number in whichever
+        month it has open, so near a month boundary it can land on the wrong month."""
+        shown = self._shown_date(page)
+        if shown != target_date:
+            raise Exception(f"date picker opened {shown or 'an unreadable date'}, not {target_date}")
+
+    def _scrape_days_in_tabs(self, context, page):
+        """Scrape the range's days with DAY_CONCURRENCY tabs of the timetable, each using the date picker.
+
+        The sync Playwright API drives every tab from this thread, so the tabs overlap by starting
+        each tab's date change first and only then waiting for and reading each one in turn. A new
+        tab is only used if it shows the same club and activity as the first. When none does, that
+        is saved in scraper_state and scrapes use one tab for DEEP_LINK_RETRY_HOURS.
+        Returns (availability, day indexes that still need scraping).
+        """
+        today = self.range.today
+        pending = self.range.day_offsets
+        site = site_key(self.LOGIN_URL)
+        failure, failed_at = load_state(self.session, site, "timetable_deep_link")
+        expected = self._filter_markers(page)
+        extra_tabs = []
+        if failure and failed_at and (datetime.utcnow() - failed_at).total_seconds() < DEEP_LINK_RETRY_HOURS * 3600:
+            print(f"Timetable URL did not open in a new tab last time ({failure.get('reason')}); using one tab")
+        elif not expected:
+            print("Timetable shows neither the club nor the activity, so new tabs can't be checked; using one tab")
+        else:
+            extra_tabs = self._open_timetable_tabs(context, page, min(DAY_CONCURRENCY, len(pending)) - 1)
+
+        # Today is already on screen in the first tab; read it while the other tabs load
+        availability, failed = [], []
+        if pending[0] == 0:
+            try:
+                with self.run_log.step("date", "day (tab)", today.strftime("%Y-%m-%d")) as step:
+                    availability = self._day_availability(page, expected_date=today)
+                    step["slots"] = len(availability)
+                self.range.mark_read(today)
+                print(f"  Day 1: {len(availability)} slots")
+            except Exception as e:
+                print(f"  Day 1 failed: {e}")
+                failed.append(0)
+            pending = pending[1:]
+
+        tabs = [(page, self.waits, self.capture)]
+        if extra_tabs:
+            usable, reasons = self._usable_tabs(extra_tabs, expected)
+            tabs += usable
+            if not usable:
+                save_state(self.session, site, "timetable_deep_link", {"reason": "; ".join(sorted(set(reasons)))})
+            elif failure:
+                delete_state(self.session, site, "timetable_deep_link")
+        print(f"Scraping {len(self.range.dates)} days across {len(tabs)} tabs...")
+        while pending:
+            if self.deadline.expired or self.memory.should_stop(page):
+                self.stopped_early = True  # The date bar loop stops too; the pending days stay unscraped
+                break
+            batch, pending = pending[:len(tabs)], pending[len(tabs):]
+            started = []
+            for (tab, waits, capture), day_index in zip(tabs, batch):
+                target_date = today + timedelta(days=day_index)
+                capture.clear()
+                if self._select_date_via_picker(tab, target_date):
+                    started.append((tab, waits, capture, day_index, target_date))
+                else:
+                    failed.append(day_index)
+            if not started:
+                failed.extend(pending)  # The picker isn't working here; leave the rest to the date bar
+                break
+            for tab, waits, capture, day_index, target_date in started:
+                try:
+                    with self.run_log.step("date", "day (tab)", target_date.strftime("%Y-%m-%d")) as step:
+                        waits.settled(f"day {day_index + 1} timetable (tab)", timeout_ms=15000)
+                        self._check_picked_date(tab, target_date)
+                        day_availability = self._day_availability(tab, expected_date=target_date, capture=capture)
+                        step["slots"] = len(day_availability)
+                    availability.extend(day_availability)
+                    self.range.mark_read(target_date)
+                    print(f"  Day {day_index + 1}: {len(day_availability)} slots")
+                except Exception as e:
+                    print(f"  Day {day_index + 1} failed: {e}")
+                    failed.append(day_index)
+
+        for tab, waits, _ in extra_tabs:
+            self.waits.timings.extend(waits.timings)
+            tab.close()
+        return availability, sorted(failed)
+
+    def _open_timetable_tabs(self, context, page, count):
+        """Start loading the timetable URL in `count` new tabs; returns (tab, Waiter, TimetableCapture) triples."""
+        self.run_log.begin("navigation", "open tabs")
+        timetable_url = page.url
+        extra_tabs = []
+        for _ in range(count):
+            tab = context.new_page()
+            extra_tabs.append((tab, Waiter(tab, deadline=self.deadline), TimetableCapture(tab)))
+            # All extra tabs load at the same time
+            tab.goto(timetable_url, wait_until="commit", timeout=self.deadline.ms(30000, "tab timetable"))
+        self.run_log.end()
+        return extra_tabs
+
+    def _usable_tabs(self, extra_tabs, expected):
+        """Split the extra tabs into (usable tabs, reasons the others were not used).
+
+        A usable tab shows timetable slots and every filter marker in `expected`. All tabs are waited
+        on together, so a URL that doesn't deep-link costs one timeout, not one per tab.
+        """
+        self.run_log.begin("navigation", "tab timetables")
+        loaded = selector_on_pages([waits for _, waits, _ in extra_tabs], SLOT_TIME_TEXT_SELECTOR,
+                                   step="tab timetable", timeout_ms=30000)
+        usable, reasons = [], []
+        for (tab, waits, capture), ok in zip(extra_tabs, loaded):
+            missing = expected - self._filter_markers(tab) if ok else set()
+            if not ok:
+                reasons.append("no timetable slots")
+            elif missing:
+                reasons.append(f"{' and '.join(sorted(missing))} not selected")
+            else:
+                usable.append((tab, waits, capture))
+        for reason in reasons:
+            print(f"  Timetable URL in a new tab: {reason}; not using it")
+        self.run_log.end(error="; ".join(reasons) if not usable else None)
+        return usable, reasons
+
+    def _filter_markers(self, page):
+        """Which of TIMETABLE_FILTER_MARKERS the page's text shows (case-insensitive)."""
+        try:
+            text = page.evaluate("() => document.body ? document.body.innerText : ''").lower()
+        except Exception:
+            return set()
+        return {marker for marker in TIMETABLE_FILTER_MARKERS if marker.lower() in text}
+
+    def _day_availability(self, page, expected_date=None, capture=None):
+        """Slots for the day on screen: parsed from the timetable responses, else read from the DOM."""
+        availability = (capture or self.capture).availability()
+        if not availability:
+            return self._extract_availability(page, expected_date=expected_date)
+        if any(slot["date"] is None for slot in availability):
+            fill_missing_dates(availability, expected_date or self._get_viewing_date(page)[0])
+        print(f"  Read {len(availability)} records from timetable responses")
+        return availability
 
     def _extract_availability(self, page, expected_date=None):
         """Extract slots from timetable: red X = booked, green arrow / N Slots = bookable.
-        If expected_date is set (e.g. from date picker), use it when the tab date can't be parsed."""
-        availability = []
-        today = datetime.now().date()
-        viewing_date, day_name = self._get_viewing_date(page)
+        The rows are dated expected_date if given (a date the caller has checked is on screen),
+        else the date read from the selected tab."""
         if expected_date is not None:
-            viewing_date = expected_date
-            day_name = expected_date.strftime("%A")
+            viewing_date, day_name = expected_date, expected_date.strftime("%A")
+        else:
+            viewing_date, day_name = self._get_viewing_date(page)
         date_str = viewing_date.strftime("%Y-%m-%d")
 
-        # Same pattern as Hill Roads: slot cards with time and "Full" or "N Slots"
-        card_selectors = [
-            "[class*='slot']",
-            "[class*='Slot']",
-            "[class*='tile']",
-            "[class*='card']",
-            "[class*='booking']",
-            "[class*='time-slot']",
-        ]
-        cards = []
-        for selector in card_selectors:
-            try:
-                for el in page.locator(selector).all():
-                    if not el.is_visible(timeout=500):
-                        continue
-                    text = el.inner_text()
-                    if re.search(r"\d{1,2}:\d{2}", text) and (
-                        re.search(r"\bFull\b", text, re.I)
-                        or re.search(r"\d+\s*Slots?", text, re.I)
-                    ):
-                        cards.append(el)
-                if cards:
-                    break
-            except Exception:
-                continue
-
-        if not cards:
-            try:
-                for el in page.locator("div").all():
-                    try:
-                        if not el.is_visible(timeout=200):
-                            continue
-                        text = el.inner_text()
-                        if len(text) > 500:
-                            continue
-                        if re.search(r"\d{1,2}:\d{2}", text) and (
-                            re.search(r"\bFull\b", text, re.I)
-                            or re.search(r"\d+\s*Slots?", text, re.I)
-                        ):
-                            cards.append(el)
-                    except Exception:
-                        continue
-            except Exception:
-                pass
-
-        # Deduplicate by time
-        seen_times = set()
-        unique_cards = []
-        for card in cards:
-            try:
-                text = card.inner_text()
-                m = re.search(r"(\d{1,2}):(\d{2})", text)
-                if m:
-                    t = f"{int(m.group(1)):02d}:{m.group(2)}"
-                    if t not in seen_times:
-                        seen_times.add(t)
-                        unique_cards.append(card)
-            except Exception:
-                continue
-
-        for card in unique_cards:
-            try:
-                text = card.inner_text()
-                time_m = re.search(r"(\d{1,2}):(\d{2})", text)
-                if not time_m:
-                    continue
-                hour, minute = int(time_m.group(1)), int(time_m.group(2))
-                start_time = f"{hour:02d}:{minute:02d}"
-                if hour + 1 >= 24:
-                    continue
-                end_time = f"{hour + 1:02d}:{minute:02d}"
-
-                if re.search(r"\bFull\b", text, re.I):
-                    num_slots = 0
-                    is_available = False
-                else:
-                    slot_m = re.search(r"(\d+)\s*Slots?", text, re.I)
-                    num_slots = int(slot_m.group(1)) if slot_m else 0
-                    is_available = num_slots > 0
-
-                if num_slots > 0:
-                    for i in range(1, num_slots + 1):
-                        availability.append({
-                            "date": date_str,
-                            "day_name": day_name,
-                            "start_time": start_time,
-                            "end_time": end_time,
-                            "court_number": f"Court {i}",
-                            "is_available": True,
-                        })
-                else:
-                    availability.append({
-                        "date": date_str,
-                        "day_name": day_name,
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "court_number": "Court 1",
-                        "is_available": False,
-                    })
-            except Exception as e:
-                print(f"Parse slot: {e}")
-                continue
-
-        return availability
+        # Same pattern as Hill Roads: slot cards with time and "Full" or "N Slots", read in one round trip
+        source, texts = extract_slot_cards(page)
+        return parse_slot_cards(texts, date_str, day_name)
 
     def _store_availability(self, availability):
-        """Store availability in database (replace existing for this facility)."""
-        self.session.query(CourtAvailability).filter_by(
-            facility_id=self.facility.id
-        ).delete()
-        for slot in availability:
-            record = CourtAvailability(
-                facility_id=self.facility.id,
-                date=slot["date"],
-                day_name=slot.get("day_name"),
-                start_time=slot["start_time"],
-                end_time=slot["end_time"],
-                court_number=slot.get("court_number", "Court 1"),
-                is_available=slot["is_available"],
-                scraped_at=datetime.utcnow(),
-            )
-            self.session.add(record)
-        self.session.commit()
-        print(f"Stored {len(availability)} availability records.")
+        """Store availability data in the database (only the slots that changed)."""
+        return store_availability(self.session, self.facility.id, self.range, availability)["slots"]
 
 
 if __name__ == "__main__":
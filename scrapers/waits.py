@@ -0,0 +1,185 @@
+"""Event-driven waits for scrapers: wait for the page to be ready instead of sleeping.
+
+Every wait has its own timeout and is timed; `Waiter.timings` keeps (step, seconds, ok) so slow
+steps show up in the logs. Waits return False on timeout rather than raising, like the fixed
+sleeps they replace; callers that need the condition check the return value. With a Deadline,
+each wait gets at most the scrape's remaining budget and raises DeadlineExceeded once it is spent.
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapers.deadline import Deadline
+
+# Resolves once no DOM mutation has happened for quietMs (true), or after timeoutMs (false).
+DOM_QUIET_JS = """
+([quietMs, timeoutMs]) => new Promise(resolve => {
+    let quietTimer = null;
+    let hardTimer = null;
+    const observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => finish(true), quietMs);
+    });
+    const finish = (ok) => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(hardTimer);
+        resolve(ok);
+    };
+    observer.observe(document.documentElement || document, {
+        childList: true, subtree: true, attributes: true, characterData: true,
+    });
+    quietTimer = setTimeout(() => finish(true), quietMs);
+    hardTimer = setTimeout(() => finish(false), timeoutMs);
+})
+"""
+
+
+class Waiter:
+    """Readiness waits bound to one page."""
+
+    DEFAULT_TIMEOUT_MS = 15000
+    QUIET_MS = 750
+    NETWORK_IDLE_TIMEOUT_MS = 5000
+    PAGE_TIMEOUT_MS = 30000  # Playwright's default for clicks, fills and navigations
+
+    def __init__(self, page, default_timeout_ms=None, deadline=None):
+        self.page = page
+        self.default_timeout_ms = default_timeout_ms or self.DEFAULT_TIMEOUT_MS
+        self.deadline = deadline or Deadline()
+        self.timings = []
+
+    def _timeout(self, timeout_ms, step):
+        """The wait's timeout within the deadline; also caps the page's own timeouts until the next wait."""
+        timeout = self.deadline.ms(timeout_ms or self.default_timeout_ms, step)
+        if self.deadline.expires_at is not None:
+            self.page.set_default_timeout(self.deadline.ms(self.PAGE_TIMEOUT_MS, step))
+        return timeout
+
+    def _record(self, step, started, ok):
+        elapsed = time.monotonic() - started
+        self.timings.append((step, elapsed, ok))
+        if not ok:
+            print(f"  wait '{step}' timed out after {elapsed:.1f}s")
+        return ok
+
+    def selector(self, selector, step=None, timeout_ms=None, state='visible'):
+        """Wait for a selector to reach `state` (visible by default)."""
+        step = step or f'selector {selector[:40]}'
+        timeout = self._timeout(timeout_ms, step)
+        started = time.monotonic()
+        try:
+            self.page.wait_for_selector(selector, state=state, timeout=timeout)
+            ok = True
+        except Exception:
+            ok = False
+        return self._record(step, started, ok)
+
+    def locator(self, locator, step, timeout_ms=None, state='visible'):
+        """Wait for a Playwright locator (e.g. get_by_text(...).first) to reach `state`."""
+        timeout = self._timeout(timeout_ms, step)
+        started = time.monotonic()
+        try:
+            locator.wait_for(state=state, timeout=timeout)
+            ok = True
+        except Exception:
+            ok = False
+        return self._record(step, started, ok)
+
+    def response(self, url_pattern, action, step, timeout_ms=None):
+        """Run `action` and wait for a response whose URL matches `url_pattern` (regex or substring).
+
+        Returns the Response, or None if none arrived in time (the action still ran).
+        """
+        pattern = re.compile(url_pattern, re.I) if isinstance(url_pattern, str) else url_pattern
+        timeout = self._timeout(timeout_ms, step)
+        started = time.monotonic()
+        try:
+            with self.page.expect_response(lambda r: bool(pattern.search(r.url)), timeout=timeout) as info:
+                action()
+            result = info.value
+        except Exception:
+            result = None
+        self._record(step, started, result is not None)
+        return result
+
+    def url_change(self, url_before, step, timeout_ms=None):
+        """Wait for the page URL to differ from `url_before`."""
+        timeout = self._timeout(timeout_ms, step)
+        started = time.monotonic()
+        try:
+            self.page.wait_for_url(lambda u: u != url_before, timeout=timeout)
+            ok = True
+        except Exception:
+            ok = False
+        return self._record(step, started, ok)
+
+    def dom_quiet(self, step, quiet_ms=None, timeout_ms=None):
+        """Wait until the DOM has stopped changing for `quiet_ms`."""
+        timeout = self._timeout(timeout_ms, step)
+        started = time.monotonic()
+        args = [quiet_ms or self.QUIET_MS, timeout]
+        try:
+            ok = bool(self.page.evaluate(DOM_QUIET_JS, args))
+        except Exception:
+            # Navigation destroyed the execution context: wait for the new document, then retry once
+            try:
+                self.page.wait_for_load_state('domcontentloaded', timeout=timeout)
+                ok = bool(self.page.evaluate(DOM_QUIET_JS, args))
+            except Exception:
+                ok = False
+        return self._record(step, started, ok)
+
+    def settled(self, step, timeout_ms=None, quiet_ms=None):
+        """Wait for network idle (bounded) and then a quiet DOM: the page has finished updating."""
+        timeout = self._timeout(timeout_ms, step)
+        started = time.monotonic()
+        try:
+            self.page.wait_for_load_state('networkidle', timeout=min(timeout, self.NETWORK_IDLE_TIMEOUT_MS))
+        except Exception:
+            pass  # Long-polling/analytics can keep the network busy; the DOM check below decides
+        remaining = max(1000, timeout - int((time.monotonic() - started) * 1000))
+        ok = self.dom_quiet(step, quiet_ms=quiet_ms, timeout_ms=remaining)
+        # Report the whole settle (network + DOM) as one step
+        self.timings[-1] = (step, time.monotonic() - started, ok)
+        return ok
+
+    def summary(self):
+        """Print the slowest waits of this run."""
+        if not self.timings:
+            return
+        total = sum(t for _, t, _ in self.timings)
+        print(f"Waits: {len(self.timings)} totalling {total:.1f}s; slowest:")
+        for step, seconds, ok in sorted(self.timings, key=lambda x: -x[1])[:5]:
+            print(f"  {seconds:5.1f}s {'ok' if ok else 'timeout'}  {step}")
+
+
+def selector_on_pages(waiters, selector, step, timeout_ms=None, poll_ms=250):
+    """Wait for `selector` to be visible on several pages at once; returns one bool per waiter.
+
+    The sync API drives every page from this thread, so waiting on each page in turn would add up
+    the timeouts. This polls all pages until each shows the selector or the shared timeout (from
+    the first waiter) runs out, and records each page's time in its own waiter.
+    """
+    if not waiters:
+        return []
+    timeout = waiters[0]._timeout(timeout_ms, step)
+    for waiter in waiters[1:]:
+        waiter._timeout(timeout_ms, step)
+    started = time.monotonic()
+    results = [None] * len(waiters)
+    while True:
+        for i, waiter in enumerate(waiters):
+            if results[i] is None:
+                try:
+                    if waiter.page.locator(selector).first.is_visible():
+                        results[i] = waiter._record(step, started, True)
+                except Exception:
+                    pass  # Still navigating
+        pending = [waiter for waiter, ok in zip(waiters, results) if ok is None]
+        if not pending or (time.monotonic() - started) * 1000 >= timeout:
+            break
+        pending[0].page.wait_for_timeout(poll_ms)  # Lets Playwright process every page's events
+    return [waiter._record(step, started, False) if ok is None else ok for waiter, ok in zip(waiters, results)]
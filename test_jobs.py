@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Offline tests of the scrape job queue: claims, host exclusivity, leases, heartbeats, outcomes (SQLite)."""
+import os
+import json
+import tempfile
+from datetime import datetime, timedelta
+
+from database import init_db, get_session, ScrapeJob
+from jobs import (SCRAPE_JOB_MAX_ATTEMPTS, SCRAPE_HOST_DELAY_SECONDS, enqueue_scrape, claim_next_job, renew_lease, finish_job,
+                  expire_leases)
+
+
+def two_sessions():
+    """Two workers' sessions on one SQLite file (in-memory databases aren't shared between connections)."""
+    path = os.path.join(tempfile.mkdtemp(), 'jobs.db')
+    engine = init_db(path)
+    return get_session(engine), get_session(engine)
+
+
+def test_claim_oldest_and_reuse_active_job():
+    session, _ = two_sessions()
+    first, created = enqueue_scrape(session, 'Hills Road', host='hills.example')
+    again, created_again = enqueue_scrape(session, 'Hills Road', '2026-03-02', '2026-03-03', host='hills.example')
+    assert created and not created_again and again.id == first.id
+    assert not again.due_only
+    enqueue_scrape(session, 'Linton', host='linton.example')
+    job = claim_next_job(session, 'w1')
+    assert job.id == first.id and job.status == 'running' and job.worker == 'w1' and job.attempts == 1
+
+
+def test_one_job_per_host_across_workers():
+    a, b = two_sessions()
+    enqueue_scrape(a, 'Hills Road', host='legend.example')
+    enqueue_scrape(a, 'Trumpington', host='legend.example')
+    enqueue_scrape(a, 'Linton', host='linton.example')
+    assert claim_next_job(a, 'w1').facility_name == 'Hills Road'
+    assert claim_next_job(b, 'w2').facility_name == 'Linton'  # Trumpington waits for the host
+    assert claim_next_job(b, 'w2') is None
+
+
+def test_host_delay_across_workers():
+    a, b = two_sessions()
+    enqueue_scrape(a, 'Hills Road', host='legend.example')
+    job = claim_next_job(a, 'w1')
+    finish_job(a, job.id, 'w1', result={'success': True})
+    enqueue_scrape(a, 'Trumpington', host='legend.example')
+    assert claim_next_job(b, 'w2') is None  # Hills Road has only just finished on this host
+    job.finished_at = datetime.utcnow() - timedelta(seconds=SCRAPE_HOST_DELAY_SECONDS + 1)
+    a.commit()
+    assert claim_next_job(b, 'w2').facility_name == 'Trumpington'
+
+
+def test_required_tag():
+    session, _ = two_sessions()
+    job, _ = enqueue_scrape(session, 'Linton')
+    job.required_tag = 'home-ip'
+    session.commit()
+    assert claim_next_job(session, 'cloud') is None
+    assert claim_next_job(session, 'home', tags=('home-ip',)).id == job.id
+
+
+def test_heartbeat_only_for_holder():
+    a, b = two_sessions()
+    enqueue_scrape(a, 'Linton')
+    job = claim_next_job(a, 'w1')
+    before = job.lease_expires_at
+    assert renew_lease(a, job.id, 'w1')
+    assert not renew_lease(b, job.id, 'w2')
+    a.refresh(job)
+    assert job.lease_expires_at >= before
+
+
+def test_expired_lease_is_requeued_then_failed():
+    a, b = two_sessions()
+    enqueue_scrape(a, 'Linton')
+    job_id = claim_next_job(a, 'w1').id
+    for attempt in range(1, SCRAPE_JOB_MAX_ATTEMPTS + 1):
+        job = a.get(ScrapeJob, job_id)
+        a.refresh(job)
+        assert job.attempts == attempt
+        job.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)  # The worker stopped heartbeating
+        a.commit()
+        expire_leases(b)
+        a.refresh(job)
+        if attempt < SCRAPE_JOB_MAX_ATTEMPTS:
+            assert job.status == 'queued' and job.worker is None
+            assert claim_next_job(b, 'w2').id == job_id
+    assert job.status == 'failed' and job.active_facility is None
+
+
+def test_finish_records_outcome_and_frees_facility():
+    a, b = two_sessions()
+    enqueue_scrape(a, 'Linton')
+    job = claim_next_job(a, 'w1')
+    finish_job(b, job.id, 'w2', result={'success': True})  # Not the holder: ignored
+    a.refresh(job)
+    assert job.status == 'running'
+    finish_job(a, job.id, 'w1', result={'success': True, 'data': [1, 2], 'count': 2})
+    a.refresh(job)
+    assert job.status == 'succeeded' and job.active_facility is None
+    assert json.loads(job.result) == {'success': True, 'count': 2}
+    _, created = enqueue_scrape(a, 'Linton')
+    assert created
+
+    job = claim_next_job(a, 'w1')
+    finish_job(a, job.id, 'w1', result={'success': False, 'cached': True})
+    a.refresh(job)
+    assert job.status == 'skipped'
+    enqueue_scrape(a, 'Linton')
+    job = claim_next_job(a, 'w1')
+    finish_job(a, job.id, 'w1', error='boom')
+    a.refresh(job)
+    assert (job.status, job.error) == ('failed', 'boom')
+    assert a.query(ScrapeJob).count() == 3
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✓ {name}")
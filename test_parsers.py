@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Offline tests of the timetable parsers over the saved fixtures (no browser or network)."""
+from datetime import date
+
+from benchmarks.parsers import FORMATS, FIXTURE_DAY, load_fixture
+from scrapers.legend import badminton_cards, parse_slot_cards
+from scrapers.gladstone import parse_card_date, parse_court_cards
+
+
+def parsed(name):
+    for _, fixture_name, parse, _ in FORMATS:
+        if fixture_name == name:
+            return parse(load_fixture(fixture_name))
+    raise KeyError(name)
+
+
+def test_every_fixture_parses_to_slots():
+    for label, name, parse, _ in FORMATS:
+        rows = parse(load_fixture(name))
+        assert rows, label
+        for row in rows:
+            assert set(row) == {'date', 'day_name', 'start_time', 'end_time', 'court_number', 'is_available'}
+            assert row['date'].startswith('2026-03-'), (label, row)
+
+
+def test_legend_cards_one_row_per_free_court():
+    rows = parsed('legend_slot_cards.json')
+    seven = [r for r in rows if r['start_time'] == '07:00']
+    assert [r['court_number'] for r in seven] == ['Court 1', 'Court 2']  # "2 Slots"
+    eight = [r for r in rows if r['start_time'] == '08:00']
+    assert len(eight) == 1 and not eight[0]['is_available']  # "Full"
+
+
+def test_legend_payload_keeps_badminton_only():
+    rows = parsed('legend_timetable.json')
+    assert len({(r['date'], r['start_time']) for r in rows}) == 7 * 15
+
+
+def test_badminton_cards_filter():
+    texts = ['BADMINTON\n07:00\n2 Slots', 'SQUASH\n07:00\n1 Slot', 'Court hire 60 MINUTES\n08:00\nFull']
+    assert badminton_cards(texts) == [texts[0], texts[2]]
+    assert len(parse_slot_cards(badminton_cards(texts), '2026-03-02', 'Monday')) == 3
+
+
+def test_gladstone_cards_status():
+    rows = {(r['court_number'], r['start_time']): r['is_available'] for r in parsed('gladstone_cards.json')}
+    assert len(rows) == 6 * 15
+    assert rows[('Court 2', '07:00')] is True  # Book now
+    assert rows[('Court 3', '07:00')] is False  # This slot is unavailable
+    assert rows[('Court 1', '07:00')] is False  # Available to be booked on ...
+
+
+def test_gladstone_card_date():
+    assert parse_card_date('Court 1\n07:00 - 08:00\nMon 2nd Mar', FIXTURE_DAY) == ('2026-03-02', 'Monday')
+    assert parse_card_date('Court 1 Thu 1st Jan', date(2026, 12, 30)) == ('2027-01-01', 'Friday')
+    assert parse_card_date('Court 1 07:00 - 08:00', FIXTURE_DAY) == (None, None)
+    rows = parse_court_cards(['Court 4\n9:00 - 10:00\nBook now'] * 2, '2026-03-05', 'Thursday')
+    assert rows == [{'date': '2026-03-05', 'day_name': 'Thursday', 'start_time': '09:00', 'end_time': '10:00',
+                     'court_number': 'Court 4', 'is_available': True}]
+
+
+def test_linton_grid():
+    rows = parsed('linton_slots_grid.html')
+    assert len(rows) == 7 * 30
+    assert len({r['date'] for r in rows}) == 7
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✓ {name}")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Offline tests of the buffered availability-demand counts (in-memory SQLite)."""
+from sqlalchemy.orm import Session
+
+from database import init_db, get_session, Facility, AvailabilityDemand
+from scrape_scheduler import DemandBuffer
+
+
+def session_with_facility():
+    session = get_session(init_db(':memory:'))
+    session.add(Facility(name='Hills Road'))
+    session.commit()
+    return session
+
+
+def hits(session):
+    return {(r.date, r.hits) for r in session.query(AvailabilityDemand).all()}
+
+
+def test_demand_is_buffered_until_flush():
+    session = session_with_facility()
+    buffer = DemandBuffer(flush_seconds=3600)
+    for _ in range(3):
+        buffer.add('Hills Road', '2026-03-02')
+    buffer.add('Hills Road')
+    buffer.add('Nowhere')
+    assert not buffer.due() and hits(session) == set()
+    assert buffer.flush(session) == 4  # 'Nowhere' is not a facility
+    assert hits(session) == {('2026-03-02', 3), ('', 1)}
+    buffer.add('Hills Road', '2026-03-02')
+    buffer.flush(session)
+    assert hits(session) == {('2026-03-02', 4), ('', 1)}
+
+
+def test_failed_flush_keeps_counts():
+    buffer = DemandBuffer(flush_seconds=0)
+    buffer.add('Hills Road', '2026-03-02')
+    assert buffer.due()
+    try:
+        buffer.flush(Session())  # No database bound: the write fails
+    except Exception:
+        pass
+    else:
+        raise AssertionError('flush without a database succeeded')
+    assert sum(buffer.counts.values()) == 1
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✓ {name}")
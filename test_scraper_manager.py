@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Offline tests of ScraperManager: rate limits for date-range scrapes, cached data (in-memory SQLite)."""
+from datetime import datetime, timedelta
+
+from database import init_db, get_session, Facility, CourtAvailability
+from freshness import DateFreshness
+from scraper_manager import ScraperManager
+
+NAME = 'Hill Roads Sport and Tennis Centre'
+
+
+def manager(scraped_minutes_ago, count_today):
+    """A manager whose facility was last scraped `scraped_minutes_ago` minutes ago."""
+    sm = ScraperManager.__new__(ScraperManager)
+    sm.session = get_session(init_db(':memory:'))
+    now = datetime.utcnow()
+    sm.session.add(Facility(name=NAME, last_scraped_at=now - timedelta(minutes=scraped_minutes_ago),
+                            scrape_count_today=count_today, last_scrape_date=now.date().isoformat()))
+    sm.session.commit()
+    return sm
+
+
+def test_date_range_keeps_hourly_limit():
+    sm = manager(10, count_today=1)
+    day = datetime.now().date()
+    ok, reason = sm.should_scrape(NAME, dates=[day])
+    assert not ok and reason == 'Hourly limit reached'
+    sm = manager(55, count_today=1)  # Within the freshness slack of an hour
+    assert sm.should_scrape(NAME, dates=[day])[0]
+
+
+def test_date_range_cache_age_is_per_date():
+    sm = manager(120, count_today=0)
+    today = datetime.now().date()
+    tomorrow = today + timedelta(days=1)
+    DateFreshness(sm.session, NAME).record([today, tomorrow], datetime.utcnow() - timedelta(minutes=5))
+    ok, reason = sm.should_scrape(NAME, dates=[today, tomorrow])
+    assert not ok and reason.startswith('Cache fresh')
+    # One date never scraped (or old enough) is reason to scrape the span
+    assert sm.should_scrape(NAME, dates=[today, tomorrow + timedelta(days=1)])[0]
+
+
+def test_slots_report_when_their_date_was_scraped():
+    sm = manager(120, count_today=0)
+    facility = sm.session.query(Facility).filter_by(name=NAME).one()
+    today = datetime.now().date()
+    sm.session.add(CourtAvailability(facility_id=facility.id, date=today.isoformat(), start_time='07:00',
+                                     end_time='08:00', court_number='Court 1', is_available=True,
+                                     scraped_at=datetime.utcnow() - timedelta(days=2)))  # Unchanged since then
+    sm.session.commit()
+    assert sm._get_cached_data(NAME)[0]['scraped_at'] is None  # Date never recorded as scraped
+    checked = datetime.utcnow() - timedelta(minutes=5)
+    DateFreshness(sm.session, NAME).record([today], checked)
+    assert sm._get_cached_data(NAME)[0]['scraped_at'] == checked.isoformat()
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✓ {name}")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Offline tests of the diff-based availability storage (in-memory SQLite, no browser)."""
+from datetime import date
+
+from sqlalchemy.exc import IntegrityError
+
+from database import init_db, get_session, CourtAvailability
+from scrapers.date_range import ScrapeRange
+from scrapers.storage import store_availability
+
+TODAY = date(2026, 3, 2)
+
+
+def slot(day, start, court='Court 1', available=True):
+    return {'date': day, 'day_name': 'Monday', 'start_time': start, 'end_time': f"{int(start[:2]) + 1:02d}:00",
+            'court_number': court, 'is_available': available}
+
+
+def stored(session):
+    rows = session.query(CourtAvailability).order_by(CourtAvailability.date, CourtAvailability.start_time).all()
+    return {(r.date, r.court_number, r.start_time): (r.id, r.is_available) for r in rows}
+
+
+def test_only_changes_are_written():
+    session = get_session(init_db(':memory:'))
+    first = [slot('2026-03-02', '07:00'), slot('2026-03-02', '08:00'), slot('2026-03-03', '07:00')]
+    counts = store_availability(session, 1, ScrapeRange(7, today=TODAY), first)
+    assert (counts['inserted'], counts['updated'], counts['deleted']) == (3, 0, 0)
+    before = stored(session)
+
+    second = [slot('2026-03-02', '07:00'), slot('2026-03-02', '08:00', available=False), slot('2026-03-03', '09:00')]
+    counts = store_availability(session, 1, ScrapeRange(7, today=TODAY), second)
+    assert counts == {'slots': 3, 'inserted': 1, 'updated': 1, 'deleted': 1}
+    after = stored(session)
+    assert after[('2026-03-02', 'Court 1', '07:00')] == before[('2026-03-02', 'Court 1', '07:00')]  # Untouched
+    assert after[('2026-03-02', 'Court 1', '08:00')][1] is False
+    assert ('2026-03-03', 'Court 1', '07:00') not in after
+
+
+def test_partial_range_keeps_other_dates():
+    session = get_session(init_db(':memory:'))
+    store_availability(session, 1, ScrapeRange(7, today=TODAY),
+                       [slot('2026-03-02', '07:00'), slot('2026-03-03', '07:00')])
+    counts = store_availability(session, 1, ScrapeRange(7, '2026-03-03', '2026-03-03', today=TODAY), [])
+    assert counts['deleted'] == 1
+    assert list(stored(session)) == [('2026-03-02', 'Court 1', '07:00')]
+
+
+def test_single_court_and_duplicates():
+    session = get_session(init_db(':memory:'))
+    rows = [slot('2026-03-02', '07:00', court=None), slot('2026-03-02', '07:00', court=None)]
+    counts = store_availability(session, 1, ScrapeRange(7, today=TODAY), rows)
+    assert counts['inserted'] == 1
+    assert list(stored(session)) == [('2026-03-02', 'Court 1', '07:00')]
+
+
+def test_batch_shares_one_timestamp():
+    session = get_session(init_db(':memory:'))
+    rows = [slot('2026-03-02', f'{hour:02d}:00', court=f'Court {court}') for hour in range(7, 22) for court in (1, 2)]
+    store_availability(session, 1, ScrapeRange(7, today=TODAY), rows)
+    assert session.query(CourtAvailability.scraped_at).distinct().count() == 1
+
+
+def test_only_read_days_are_stored():
+    session = get_session(init_db(':memory:'))
+    store_availability(session, 1, ScrapeRange(7, today=TODAY),
+                       [slot('2026-03-02', '07:00'), slot('2026-03-03', '07:00'), slot('2026-03-04', '07:00')])
+    date_range = ScrapeRange(7, today=TODAY)
+    date_range.mark_read('2026-03-02')  # Read, no slots left: its rows go
+    date_range.mark_read(date(2026, 3, 3))
+    date_range.keep_read()  # 03-04 failed and the rest weren't reached: their rows stay
+    assert [d.isoformat() for d in date_range.dates] == ['2026-03-02', '2026-03-03']
+    counts = store_availability(session, 1, date_range, [slot('2026-03-03', '07:00')])
+    assert counts['deleted'] == 1
+    assert [key[0] for key in stored(session)] == ['2026-03-03', '2026-03-04']
+
+
+def test_unique_slot_constraint():
+    session = get_session(init_db(':memory:'))
+    for _ in range(2):
+        session.add(CourtAvailability(facility_id=1, date='2026-03-02', court_number='Court 1',
+                                      start_time='07:00', end_time='08:00'))
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+    else:
+        raise AssertionError('duplicate slot was stored')
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✓ {name}")
@@ -0,0 +1,125 @@
+"""Scrape worker: runs the jobs queued by the web app (python worker.py).
+
+Browsers only ever run here, never inside a web request. Up to SCRAPE_MAX_WORKERS jobs run at
+once. A job for a booking host is not claimed while another job runs there, or before the
+politeness delay since the last one has passed, on any worker. Any number of workers can share
+one database: each claimed job is leased and kept alive by a heartbeat (see jobs.py).
+SCRAPE_WORKER_TAGS lists the capability tags of this node, for facilities pinned with
+SCRAPE_FACILITY_TAGS.
+"""
+import os
+import socket
+import signal
+import logging
+import threading
+
+from database import init_db, get_session
+from jobs import SCRAPE_LEASE_SECONDS, claim_next_job, renew_lease, finish_job, expire_leases
+from scraper_manager import ScraperManager
+from scrape_orchestrator import ScrapeOrchestrator, facility_host
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCRAPE_WORKER_POLL_SECONDS = float(os.getenv('SCRAPE_WORKER_POLL_SECONDS', '5'))
+SCRAPE_WORKER_TAGS = [tag.strip() for tag in os.getenv('SCRAPE_WORKER_TAGS', '').split(',') if tag.strip()]
+
+
+class ScrapeWorker:
+    """Claims queued ScrapeJobs and runs them on a few threads until stopped."""
+
+    def __init__(self, manager_factory=ScraperManager, concurrency=None, tags=None):
+        self.orchestrator = ScrapeOrchestrator(manager_factory)
+        self.tags = SCRAPE_WORKER_TAGS if tags is None else list(tags)
+        self.concurrency = concurrency or self.orchestrator.max_workers
+        sm = manager_factory()
+        try:
+            self.scraper_classes = dict(sm.scrapers)
+        finally:
+            sm.close()
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.engine = init_db()
+        self.stopping = threading.Event()
+
+    def run_job(self, job):
+        """Run one claimed job and record its outcome."""
+        scraper_class = self.scraper_classes.get(job.facility_name)
+        host = facility_host(scraper_class) if scraper_class else job.facility_name
+        date_range = (job.start_date, job.end_date) if job.start_date or job.end_date else None
+        logger.info(f"Job {job.id}: {job.facility_name} (range={date_range}, due_only={job.due_only})")
+        result, error = None, None
+        finished = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job.id, finished), daemon=True)
+        heartbeat.start()
+        try:
+            result = self.orchestrator.scrape_one(job.facility_name, host, date_range, due_only=job.due_only)
+        except Exception as e:
+            error = str(e)
+        finally:
+            finished.set()
+            heartbeat.join()
+        session = get_session(self.engine)
+        try:
+            finish_job(session, job.id, self.worker_id, result, error)
+        finally:
+            session.close()
+
+    def _heartbeat(self, job_id, finished):
+        """Renew the job's lease every third of its length until the job finishes."""
+        session = get_session(self.engine)
+        try:
+            while not finished.wait(SCRAPE_LEASE_SECONDS / 3):
+                try:
+                    if not renew_lease(session, job_id, self.worker_id):
+                        logger.warning(f"Lost the lease on job {job_id}; another worker may run it again")
+                        return
+                except Exception as e:
+                    logger.error(f"Heartbeat for job {job_id} failed: {e}")
+                    session.rollback()
+        finally:
+            session.close()
+
+    def _loop(self):
+        session = get_session(self.engine)
+        try:
+            while not self.stopping.is_set():
+                try:
+                    job = claim_next_job(session, self.worker_id, self.tags)
+                except Exception as e:
+                    logger.error(f"Could not claim a job: {e}")
+                    session.rollback()
+                    job = None
+                if job is None:
+                    self.stopping.wait(SCRAPE_WORKER_POLL_SECONDS)
+                    continue
+                self.run_job(job)
+        finally:
+            session.close()
+
+    def start(self):
+        """Start the worker threads (daemon threads, for running inside another process)."""
+        session = get_session(self.engine)
+        try:
+            expire_leases(session)
+        finally:
+            session.close()
+        threads = [threading.Thread(target=self._loop, name=f'scrape-worker-{i}', daemon=True)
+                   for i in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        logger.info(f"Scrape worker {self.worker_id} started with {self.concurrency} threads, tags {self.tags}")
+        return threads
+
+    def run_forever(self):
+        """Run until SIGTERM/SIGINT; jobs in progress are finished first."""
+        signal.signal(signal.SIGTERM, lambda *_: self.stopping.set())
+        signal.signal(signal.SIGINT, lambda *_: self.stopping.set())
+        threads = self.start()
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=1)
+        logger.info("Scrape worker stopped")
+
+
+if __name__ == '__main__':
+    ScrapeWorker().run_forever()